@@ -0,0 +1,253 @@
+"""
+Local stand-ins for the Groq (OpenAI-compatible) and OpenAlex APIs, with
+configurable latency, decode rate and error injection.
+
+Run them on their own to benchmark a separately started server:
+
+    python -m benchmarks.fake_servers --llm-port 9101 --openalex-port 9102
+
+then start the app with GROQ_BASE_URL=http://127.0.0.1:9101/v1,
+OPENALEX_BASE_URL=http://127.0.0.1:9102 and any GROQ_API_KEY.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+from aiohttp import web
+
+class FakeServer:
+    """Shared start/stop and error injection for the fake upstream servers."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.logger = logging.getLogger(__name__)
+        self.counters = {"requests": 0, "errors_injected": 0}
+        self._runner = None
+        self.url = None
+
+    def routes(self):
+        raise NotImplementedError
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.add_routes(self.routes())
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def stats(self) -> dict:
+        return dict(self.counters)
+
+    def _injected_error(self):
+        """Return an error response for this request, or None to serve it normally."""
+        self.counters["requests"] += 1
+        if self.error_rate <= 0 or self.random.random() >= self.error_rate:
+            return None
+        self.counters["errors_injected"] += 1
+        # Half rate limiting (with Retry-After), half server errors
+        if self.random.random() < 0.5:
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                status=429, headers={"retry-after": "0.2"}
+            )
+        return web.json_response({"error": {"message": "Internal server error", "type": "server_error"}}, status=500)
+
+class FakeLLMServer(FakeServer):
+    """
+    OpenAI-compatible /v1/chat/completions. Each call waits `latency` seconds
+    (time to first token) and then decodes at `token_rate` tokens/second;
+    streams emit their chunks at that pace. Replies are shaped after the
+    prompt (query lists, JSON outlines, markdown reports) so the pipeline
+    exercises its real parsing paths.
+    """
+
+    def __init__(self, latency=0.2, token_rate=500.0, completion_tokens=400, error_rate=0.0, seed=None):
+        super().__init__(latency, error_rate, seed)
+        self.token_rate = token_rate
+        self.completion_tokens = completion_tokens
+        self.counters.update({"prompt_tokens": 0, "completion_tokens": 0, "streams": 0})
+
+    def routes(self):
+        return [web.post("/v1/chat/completions", self.chat_completions)]
+
+    async def chat_completions(self, request):
+        body = await request.json()
+        error = self._injected_error()
+        if error is not None:
+            await asyncio.sleep(self.latency / 4)
+            return error
+
+        prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+        max_tokens = body.get("max_tokens") or self.completion_tokens
+        text = self.reply(prompt, min(max_tokens, self.completion_tokens))
+        words = text.split(" ")
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(words), "total_tokens": len(prompt) // 4 + len(words)}
+        self.counters["prompt_tokens"] += usage["prompt_tokens"]
+        self.counters["completion_tokens"] += usage["completion_tokens"]
+
+        completion_id = f"chatcmpl-{self.counters['requests']}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+        await asyncio.sleep(self.latency)
+
+        if not body.get("stream"):
+            await asyncio.sleep(len(words) / self.token_rate)
+            return web.json_response({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        self.counters["streams"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        async def send(payload):
+            await response.write(f"data: {json.dumps(payload)}\n\n".encode())
+
+        chunk_words = 8
+        for i in range(0, len(words), chunk_words):
+            await asyncio.sleep(chunk_words / self.token_rate)
+            delta = " ".join(words[i:i + chunk_words]) + ("" if i + chunk_words >= len(words) else " ")
+            await send({
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            })
+        await send({
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [], "usage": usage,
+        })
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def reply(self, prompt: str, tokens: int) -> str:
+        topic = (re.findall(r"topic:?\s*'([^']*)'", prompt) or ["the topic"])[0]
+
+        if "research queries" in prompt:
+            return "\n".join(f"{i}. {topic} {aspect}" for i, aspect in enumerate(
+                ["fundamentals", "history", "applications", "common misconceptions", "recent research"], 1))
+        if "clarifying questions" in prompt or "follow-up questions" in prompt:
+            return "\n".join(f"{i}. What aspect of {topic} interests you most ({i})?" for i in range(1, 5))
+        if "question-answer pairs" in prompt:
+            return json.dumps({
+                "specific interests": ["applications"],
+                "prior knowledge level": "intermediate",
+                "preferred learning formats": ["examples"],
+                "specific applications": ["practice"],
+            })
+        if "Plan an educational report" in prompt:
+            return json.dumps([
+                {"title": title, "focus": f"{title} of {topic}", "sources": [i + 1]}
+                for i, title in enumerate(["Introduction", "Key Concepts", "Examples", "Conclusion", "Recommended Resources"])
+            ])
+        if '"insert_after"' in prompt:
+            ids = re.findall(r"^(\d+(?:\.\d+)*):", prompt, re.MULTILINE)
+            return json.dumps({"sections": ids[1:2] or ids[:1], "insert_after": None})
+
+        section = re.search(r'Start with the heading "(## [^"]+)"', prompt)
+        if section:
+            return f"{section.group(1)}\n\n{self._filler(tokens - 4)} [1]"
+        if "educational report" in prompt and "Generate a comprehensive" in prompt:
+            per_section = max(10, (tokens - 30) // 4)
+            return "\n\n".join(
+                [f"# {topic}"] +
+                [f"## {title}\n\n{self._filler(per_section)} [1]" for title in ["Introduction", "Key Concepts", "Examples", "Conclusion"]]
+            )
+        if "editing one section" in prompt:
+            heading = re.search(r"^(#{1,6} .*)$", prompt.split("Section:", 1)[-1], re.MULTILINE)
+            return f"{heading.group(1) if heading else '## Section'}\n\n{self._filler(tokens - 4)}"
+        return self._filler(tokens)
+
+    def _filler(self, tokens: int) -> str:
+        words = ["learning", "concept", "example", "research", "shows", "that", "students", "apply", "ideas", "in", "practice"]
+        return " ".join(words[i % len(words)] for i in range(max(1, tokens)))
+
+class FakeOpenAlexServer(FakeServer):
+    """OpenAlex /works search returning deterministic works, with ETag and Cache-Control headers."""
+
+    def __init__(self, latency=0.05, error_rate=0.0, max_age=3600, seed=None):
+        super().__init__(latency, error_rate, seed)
+        self.max_age = max_age
+
+    def routes(self):
+        return [web.get("/works", self.works)]
+
+    async def works(self, request):
+        error = self._injected_error()
+        await asyncio.sleep(self.latency)
+        if error is not None:
+            return error
+
+        search = request.query.get("search", "")
+        per_page = min(200, int(request.query.get("per_page", "25")))
+        etag = '"' + hashlib.sha1(f"{search}:{per_page}".encode()).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": f"max-age={self.max_age}"}
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+
+        terms = [term for term in re.findall(r"[A-Za-z0-9]+", search) if term not in ("OR", "AND", "NOT")]
+        work_ids = [int(hashlib.sha1(f"{search}:{i}".encode()).hexdigest()[:8], 16) for i in range(per_page)]
+        results = [
+            {
+                "id": f"https://openalex.org/W{work_ids[i]}",
+                "title": f"A study of {' '.join(terms[i % max(1, len(terms)):][:4]) or 'learning'} ({i + 1})",
+                "authorships": [{"author": {"display_name": f"Author {i + 1}"}}],
+                "host_venue": {"display_name": "Journal of Benchmarks"},
+                "publication_year": 2020 + i % 5,
+                "doi": f"https://doi.org/10.0000/bench.{work_ids[i]}",
+                "abstract_inverted_index": {term.lower(): [j] for j, term in enumerate(terms)},
+            }
+            for i in range(per_page)
+        ]
+        return web.json_response({"meta": {"count": len(results)}, "results": results}, headers=headers)
+
+async def _serve(args):
+    llm = FakeLLMServer(args.llm_latency, args.llm_token_rate, args.llm_completion_tokens, args.llm_error_rate)
+    openalex = FakeOpenAlexServer(args.openalex_latency, args.openalex_error_rate)
+    llm_url = await llm.start(args.host, args.llm_port)
+    openalex_url = await openalex.start(args.host, args.openalex_port)
+    print(f"GROQ_BASE_URL={llm_url}/v1")
+    print(f"OPENALEX_BASE_URL={openalex_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await llm.stop()
+        await openalex.stop()
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--llm-token-rate", type=float, default=500.0, help="Decoded tokens per second")
+    parser.add_argument("--llm-completion-tokens", type=int, default=400, help="Completion length cap")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of calls answered with 429/500")
+    parser.add_argument("--openalex-latency", type=float, default=0.05)
+    parser.add_argument("--openalex-error-rate", type=float, default=0.0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the fake Groq and OpenAlex servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--llm-port", type=int, default=9101)
+    parser.add_argument("--openalex-port", type=int, default=9102)
+    add_server_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
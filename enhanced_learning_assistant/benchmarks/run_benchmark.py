@@ -0,0 +1,313 @@
+"""
+Load test the API against local Groq/OpenAlex stand-ins and write the results
+as JSON, so runs can be compared between commits.
+
+    python -m benchmarks.run_benchmark --requests 50 --concurrency 10
+    python -m benchmarks.run_benchmark --compare benchmarks/results/baseline.json
+
+By default the app runs in this process (under uvicorn) next to the fake
+servers, so memory figures cover app + fakes + driver. Use --url to drive an
+already running server instead (start the fakes with benchmarks.fake_servers
+and point the server at them).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import aiohttp
+from benchmarks.fake_servers import FakeLLMServer, FakeOpenAlexServer, add_server_arguments
+
+SCENARIOS = ("topics", "reports", "modify")
+
+def percentile(values, p):
+    """Linearly interpolated percentile of `values` (p in 0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarise(latencies, errors, elapsed):
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": sum(latencies) / len(latencies) if latencies else None,
+        "max": max(latencies) if latencies else None,
+        "elapsed": elapsed,
+        "throughput_per_minute": len(latencies) * 60 / elapsed if elapsed else None,
+    }
+
+class MemorySampler:
+    """Samples this process's resident set size while the benchmark runs."""
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    @staticmethod
+    def rss_mb():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            import resource
+            # ru_maxrss is in KiB on Linux and bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak / (2**20 if sys.platform == "darwin" else 2**10)
+        except ImportError:
+            return None
+
+    def start(self):
+        async def sample():
+            while True:
+                value = self.rss_mb()
+                if value is not None:
+                    self.samples.append(value)
+                await asyncio.sleep(self.interval)
+        self._task = asyncio.create_task(sample())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        if not self.samples:
+            return None
+        return {"start_rss_mb": self.samples[0], "end_rss_mb": self.samples[-1], "peak_rss_mb": max(self.samples)}
+
+async def run_scenario(name, send, total, concurrency):
+    """Issue `total` requests through `send(index)` with `concurrency` workers."""
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                ok = await send(index)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.getLogger(__name__).warning(f"{name} request {index} failed: {e}")
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarise(latencies, errors, time.perf_counter() - started)
+
+async def drive(base_url, args):
+    topics = [f"Benchmark topic {i % args.topics}" for i in range(args.requests)]
+    report_ids = []
+    results = {}
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    async with aiohttp.ClientSession(base_url, timeout=timeout) as session:
+        async def post(path, payload):
+            async with session.post(path, json=payload) as response:
+                body = await response.json(content_type=None)
+                return response.status == 200, body
+
+        async def topic(index):
+            ok, _ = await post("/api/topics", {"topic": topics[index], "learning_objectives": "Understand the basics"})
+            return ok
+
+        async def report(index):
+            ok, body = await post("/api/reports", {
+                "topic": topics[index],
+                "learning_objectives": "Understand the basics",
+                "responses": ["Beginner", "Practical examples", "Short sections"],
+            })
+            if ok:
+                report_ids.append(body["id"])
+            return ok
+
+        async def modify(index):
+            report_id = report_ids[index % len(report_ids)]
+            ok, _ = await post(f"/api/reports/{report_id}/modify", {
+                "report_id": report_id,
+                "feedback": "Add a worked example to the key concepts",
+            })
+            return ok
+
+        senders = {"topics": topic, "reports": report, "modify": modify}
+        for name in args.scenarios:
+            if name == "modify" and not report_ids:
+                logging.getLogger(__name__).warning("Skipping modify: no reports were generated")
+                continue
+            results[name] = await run_scenario(name, senders[name], args.requests, args.concurrency)
+            print(format_summary(name, results[name]))
+    return results
+
+async def serve_app(env):
+    """Import and start the app in-process with uvicorn; returns (server, task, url)."""
+    os.environ.update(env)
+    import uvicorn
+    import main
+
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+async def wait_until_ready(base_url, timeout):
+    """Wait for /api/ready so warm-up isn't counted in the first requests (404 means an older server)."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{base_url}/api/ready") as response:
+                    if response.status in (200, 404):
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{base_url} was not ready after {timeout:.0f}s")
+            await asyncio.sleep(0.1)
+
+async def run(args):
+    memory = MemorySampler()
+    memory.start()
+    fakes = {}
+    server = task = None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            if args.url:
+                base_url = args.url.rstrip("/")
+            else:
+                fakes["llm"] = FakeLLMServer(args.llm_latency, args.llm_token_rate, args.llm_completion_tokens, args.llm_error_rate, seed=1)
+                fakes["openalex"] = FakeOpenAlexServer(args.openalex_latency, args.openalex_error_rate, seed=2)
+                llm_url = await fakes["llm"].start()
+                openalex_url = await fakes["openalex"].start()
+                server, task, base_url = await serve_app({
+                    "GROQ_API_KEY": os.getenv("GROQ_API_KEY", "benchmark"),
+                    "GROQ_BASE_URL": f"{llm_url}/v1",
+                    "OPENALEX_BASE_URL": openalex_url,
+                    "DATA_DIR": workdir,
+                    "REPORT_STORE_PATH": os.path.join(workdir, "reports.db"),
+                    "OPENALEX_CACHE_PATH": os.path.join(workdir, "openalex_cache.db"),
+                    "SESSION_STORE_PATH": os.path.join(workdir, "sessions.db"),
+                    # Pass a saved corpus with RESEARCH_OFFLINE=true for a fixed data set
+                    "RESEARCH_CORPUS_PATH": os.path.join(workdir, "research_corpus.db"),
+                    **dict(item.split("=", 1) for item in args.env),
+                })
+
+            await wait_until_ready(base_url, args.timeout)
+            started = time.perf_counter()
+            scenarios = await drive(base_url, args)
+            elapsed = time.perf_counter() - started
+        finally:
+            if server is not None:
+                server.should_exit = True
+                await task
+            for fake in fakes.values():
+                await fake.stop()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "elapsed": elapsed,
+        "scenarios": scenarios,
+        # Only meaningful in-process; with --url this is the driver alone
+        "memory": await memory.stop(),
+        "upstream": {name: fake.stats() for name, fake in fakes.items()},
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def format_summary(name, stats):
+    def ms(value):
+        return f"{value * 1000:8.1f}ms" if value is not None else "       n/a"
+    return (
+        f"{name:<8} n={stats['requests']:<5} errors={stats['errors']:<4} "
+        f"p50={ms(stats['p50'])} p95={ms(stats['p95'])} p99={ms(stats['p99'])} "
+        f"throughput={stats['throughput_per_minute'] or 0:8.1f}/min"
+    )
+
+def compare(result, baseline_path, threshold):
+    """Print changes against a baseline result; returns False if p95 or throughput regressed past `threshold`."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    ok = True
+    for name, stats in result["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for metric, worse_if_higher in (("p50", True), ("p95", True), ("p99", True), ("throughput_per_minute", False)):
+            if not before.get(metric) or stats.get(metric) is None:
+                continue
+            change = stats[metric] / before[metric] - 1
+            changes.append(f"{metric} {change:+.1%}")
+            regressed = change > threshold if worse_if_higher else change < -threshold
+            if regressed and metric in ("p95", "throughput_per_minute"):
+                ok = False
+        print(f"  {name:<8} " + ", ".join(changes))
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the learning assistant API with local stand-in upstreams")
+    parser.add_argument("--url", help="Drive an already running server instead of starting one in-process")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=20, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--topics", type=int, default=10**9, help="Distinct topics to cycle through (fewer means more cache hits)")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra app settings for in-process runs")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--fail-threshold", type=float, default=0.2, help="Relative p95/throughput regression that fails --compare")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # Some app loggers run at DEBUG; keep the console to warnings
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(logging.WARNING)
+    result = asyncio.run(run(args))
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"{time.strftime('%Y%m%d-%H%M%S')}-{result['commit'] or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+    if result["memory"]:
+        print(f"Peak RSS {result['memory']['peak_rss_mb']:.1f} MiB")
+
+    if args.compare and not compare(result, args.compare, args.fail_threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
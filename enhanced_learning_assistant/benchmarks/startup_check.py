@@ -0,0 +1,121 @@
+"""
+Measure cold-start time and fail if it regresses past a threshold:
+
+    python -m benchmarks.startup_check
+    python -m benchmarks.startup_check --runs 5 --max-import 0.8 --max-ready 10
+
+Each run uses a fresh interpreter. "import" is the time to import main;
+"listening" is from launching uvicorn until it answers GET /, and "ready" until
+GET /api/ready returns 200 (warm-up finished). No upstream calls are made, so
+any GROQ_API_KEY will do.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+def measure_import(env) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=APP_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def status(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+def measure_server(env, timeout: float) -> dict:
+    """Start uvicorn and time how long it takes to answer, then to report ready."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {"listening": None, "ready": None}
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            if result["listening"] is None and status(f"{base_url}/") == 200:
+                result["listening"] = time.perf_counter() - started
+            if result["listening"] is not None and status(f"{base_url}/api/ready") == 200:
+                result["ready"] = time.perf_counter() - started
+                break
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait()
+    return result
+
+def median(values):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's cold-start time against thresholds")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs; medians are compared")
+    parser.add_argument("--max-import", type=float, default=0.8, help="Maximum seconds to import main")
+    parser.add_argument("--max-listening", type=float, default=3.0, help="Maximum seconds until GET / answers")
+    parser.add_argument("--max-ready", type=float, default=15.0, help="Maximum seconds until /api/ready returns 200")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Give up on a server run after this many seconds")
+    parser.add_argument("--output", help="Also write the measurements to this JSON file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "startup-check")
+
+    runs = []
+    # Each run starts from empty databases, kept out of the app's data directory
+    with tempfile.TemporaryDirectory() as data_dir:
+        env.setdefault("DATA_DIR", data_dir)
+        for _ in range(args.runs):
+            run = {"import": measure_import(env)}
+            run.update(measure_server(env, args.timeout))
+            runs.append(run)
+
+    result = {
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "median": {metric: median(run[metric] for run in runs) for metric in ("import", "listening", "ready")},
+    }
+    limits = {"import": args.max_import, "listening": args.max_listening, "ready": args.max_ready}
+
+    ok = True
+    for metric, limit in limits.items():
+        value = result["median"][metric]
+        passed = value is not None and value <= limit
+        ok = ok and passed
+        shown = f"{value:.3f}s" if value is not None else "timed out"
+        print(f"{metric:<10} {shown:>10}  (limit {limit:.1f}s)  {'ok' if passed else 'REGRESSED'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({**result, "limits": limits, "ok": ok}, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,66 @@
 import os
+import json
+import time
+import uuid
 import asyncio
 import logging
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request, Response, Header
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List
-from src.services.llm_service import LLMService
-from src.services.citation_service import CitationService
-from src.core.research_engine import ResearchEngine
-from src.core.interactive_questioner import InteractiveQuestioner
-from src.core.report_generator import ReportGenerator
+from typing import List, Optional
+from src.core.job_queue import JobQueueFullError
+from src.core.report_sections import parse_sections
+from src.core.service_provider import ServiceProvider
+from src.services.llm_errors import LLM_ERROR_MESSAGES
+from src.services.metrics import registry, HTTP_REQUEST_LATENCY, HTTP_REQUESTS
+from src.services.tracing import new_trace_id, set_trace_id, trace_id_var, install_log_filter
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s'
 )
+install_log_filter()
 
-# Initialize services
-llm_service = LLMService()
-citation_service = CitationService()
-
-# Initialize core components
-research_engine = ResearchEngine(llm_service)
-interactive_questioner = InteractiveQuestioner(llm_service)
-report_generator = ReportGenerator(llm_service, citation_service)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Components are built and warmed up in the background so the server
+    # accepts connections straight away; /api/ready reports when it's done
+    services.start_warm_up()
+    try:
+        yield
+    finally:
+        await services.close()
 
 # Create FastAPI app
 app = FastAPI(
     title="Interactive Learning Assistant",
     description="AI-powered learning system that generates educational content",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Give every request a trace id (or reuse X-Request-Id) and record API metrics."""
+    trace_id = request.headers.get("X-Request-Id") or new_trace_id()
+    token = set_trace_id(trace_id)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Trace-Id"] = trace_id
+        return response
+    finally:
+        # Label by route template so report ids don't explode the label set
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_LATENCY.observe(time.perf_counter() - started, method=request.method, path=path)
+        HTTP_REQUESTS.inc(method=request.method, path=path, status=status)
+        trace_id_var.reset(token)
+
 # Define data models
 class TopicRequest(BaseModel):
     topic: str
@@ -43,93 +72,423 @@ class QuestionResponse(BaseModel):
 class ReportRequest(BaseModel):
     topic: str
     learning_objectives: str
-    responses: List[str]
+    # May be omitted when the answers were recorded in the session
+    responses: List[str] = []
+    # Session from /api/topics (also accepted as X-Session-Id); its stored
+    # questions and prefetched research are used if the topic matches
+    session_id: Optional[str] = None
+
+class SessionAnswers(BaseModel):
+    answers: List[str] = []
+    followup_answers: List[str] = []
 
 class ReportModificationRequest(BaseModel):
     report_id: str
     feedback: str
 
+class ReportBatchRequest(BaseModel):
+    items: List[ReportRequest]
+
+class ResearchCacheWarmRequest(BaseModel):
+    topics: List[TopicRequest]
+
 class Report(BaseModel):
     id: str
     title: str
     content: str
 
-# Store for reports (in-memory for prototype)
-reports_store = {}
+async def _research(request: ReportRequest):
+    """Run topic research and return the structured research data."""
+    # Pick up research prefetched by /api/topics for this session, if any
+    research_result = None
+    if request.session_id:
+        research_result = await services.research_prefetcher.take(
+            request.session_id,
+            request.topic,
+            request.learning_objectives
+        )
+
+    # Modify how research_data is extracted from the research engine result
+    if research_result is None:
+        research_result = await services.research_engine.research_topic(
+            request.topic,
+            request.learning_objectives
+        )
+
+    # Extract the structured research data for report generation
+    return research_result["structured_data"]
+
+async def _session_for(request: ReportRequest) -> Optional[dict]:
+    """The request's stored session, if it has one for the same topic."""
+    if not request.session_id:
+        return None
+    try:
+        session = await services.session_store.get(request.session_id)
+    except Exception as e:
+        logging.warning(f"Could not load session: {str(e)}")
+        return None
+    if session is None or (session["topic"], session["learning_objectives"]) != (request.topic, request.learning_objectives):
+        return None
+    return session
+
+async def _analyze_preferences(request: ReportRequest):
+    """Analyze the user's answers to the questions they were asked."""
+    session = await _session_for(request)
+    if session is None:
+        # Without a session, regenerate the initial questions (which may not
+        # match the ones the user saw) and analyze the answers against them
+        questions = services.interactive_questioner.clean_questions(
+            await services.interactive_questioner.generate_initial_questions(
+                request.topic,
+                request.learning_objectives
+            )
+        )
+        return await services.interactive_questioner.analyze_user_responses(
+            questions[:len(request.responses)],
+            request.responses
+        )
+
+    # Reuse the questions the user actually answered, follow-ups included,
+    # and the analysis itself if these answers were analyzed before. Each
+    # answer list is paired with its own question list, so missing initial
+    # answers never shift the follow-up answers onto other questions.
+    answers = list(request.responses) or session["answers"]
+    pairs = list(zip(session["questions"], answers)) + list(zip(session["followup_questions"], session["followup_answers"]))
+    previous = session.get("preferences")
+    if previous and previous.get("pairs") == [list(pair) for pair in pairs]:
+        return previous["analysis"]
+
+    analysis = await services.interactive_questioner.analyze_user_responses(
+        [question for question, _ in pairs],
+        [answer for _, answer in pairs]
+    )
+    if analysis != "{}" and analysis not in LLM_ERROR_MESSAGES:
+        await _update_session(request.session_id, preferences={"pairs": pairs, "analysis": analysis})
+    return analysis
+
+async def _update_session(session_id: str, **fields):
+    try:
+        return await services.session_store.update(session_id, **fields)
+    except Exception as e:
+        logging.warning(f"Could not update session: {str(e)}")
+        return None
+
+async def _store_report(request: ReportRequest, report_content: str, research_data) -> str:
+    """Store a generated report with its research data and return its id."""
+    # Generate a unique ID for the report
+    report_id = str(uuid.uuid4())
+
+    # Store the report, its section tree and research data
+    await services.report_store.put(report_id, {
+        "content": report_content,
+        "sections": parse_sections(report_content),
+        "topic": request.topic,
+        "learning_objectives": request.learning_objectives,
+        "research_data": research_data
+    })
+    if request.session_id:
+        await _update_session(request.session_id, last_report_id=report_id)
+    return report_id
+
+async def _build_report(request: ReportRequest, progress=lambda stage: None) -> Report:
+    """Run the full report pipeline, store the result and return it."""
+    progress("research")
+    research_data = await _research(request)
+
+    progress("analysis")
+    user_preferences = await _analyze_preferences(request)
+
+    # Generate the report
+    progress("generation")
+    report_content = await services.report_generator.generate_report(
+        request.topic,
+        request.learning_objectives,
+        research_data,
+        user_preferences
+    )
+
+    report_id = await _store_report(request, report_content, research_data)
+
+    return Report(
+        id=report_id,
+        title=f"Report on {request.topic}",
+        content=report_content
+    )
+
+async def _run_report_job(request: ReportRequest, progress):
+    report = await _build_report(request, progress)
+    return {"id": report.id, "title": report.title, "content": report.content}
+
+# Components (LLM client, research engine, report store, the bounded worker
+# pool for ?async=true reports, ...) are built on first use
+services = ServiceProvider(_run_report_job, report_job_stages=["research", "analysis", "generation"])
+
+def _with_session(request: ReportRequest, x_session_id: Optional[str]) -> ReportRequest:
+    if not request.session_id and x_session_id:
+        request.session_id = x_session_id
+    return request
+
+def _is_generation_error(questions: List[str], error_message: str) -> bool:
+    """Whether generated questions are really an error string (possibly split into lines)."""
+    text = "\n".join(questions).strip()
+    return not text or text == error_message or text in LLM_ERROR_MESSAGES
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @app.post("/api/topics", response_model=List[str])
-async def submit_topic(topic_request: TopicRequest):
+async def submit_topic(topic_request: TopicRequest, response: Response, x_session_id: Optional[str] = Header(None)):
     """
-    Submit a topic and learning objectives to get initial questions
+    Submit a topic and learning objectives to get initial questions.
+
+    This starts a session that keeps the questions (and later the answers
+    and follow-ups) and starts researching the topic in the background while
+    the user answers. The session id (X-Session-Id, generated if not sent) is
+    returned in the X-Session-Id header; pass it to /api/sessions/{id}/answers
+    and /api/reports.
     """
+    session_id = x_session_id or str(uuid.uuid4())
+    response.headers["X-Session-Id"] = session_id
+    try:
+        services.research_prefetcher.start(session_id, topic_request.topic, topic_request.learning_objectives)
+    except Exception as e:
+        logging.warning(f"Could not start research prefetch: {str(e)}")
+
     try:
-        questions = await interactive_questioner.generate_initial_questions(
+        questions = await services.interactive_questioner.generate_initial_questions(
             topic_request.topic,
             topic_request.learning_objectives
         )
-        return questions
     except Exception as e:
         logging.error(f"Error generating questions: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate questions")
 
-@app.post("/api/reports", response_model=Report)
-async def generate_report(request: ReportRequest, background_tasks: BackgroundTasks):
+    if _is_generation_error(questions, services.interactive_questioner.QUESTIONS_ERROR):
+        return questions
+
+    # Only the real questions are returned and kept, so the answers sent back
+    # (and analyzed by /api/reports) pair with the questions the user saw
+    questions = services.interactive_questioner.clean_questions(questions)
+    try:
+        await services.session_store.put(session_id, {
+            "topic": topic_request.topic,
+            "learning_objectives": topic_request.learning_objectives,
+            "questions": questions,
+            "answers": [],
+            "followup_questions": [],
+            "followup_answers": [],
+            "preferences": None,
+            "created_at": time.time()
+        })
+    except Exception as e:
+        logging.warning(f"Could not store session: {str(e)}")
+    return questions
+
+@app.get("/api/sessions/{session_id}")
+async def get_session(session_id: str):
     """
-    Generate an educational report based on the topic and user responses
+    A session's questions, answers, follow-up questions and analysis
+    """
+    session = await services.session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"id": session_id, **session}
+
+@app.post("/api/sessions/{session_id}/answers")
+async def answer_session(session_id: str, request: SessionAnswers):
+    """
+    Record answers to the session's questions and/or follow-up questions.
+    When initial answers are first recorded, follow-up questions are generated
+    from them (and from the prefetched research, if it has finished) and
+    stored with the session. /api/reports can then omit `responses`.
     """
     try:
-        # Modify how research_data is extracted from the research engine result
-        research_result = await research_engine.research_topic(
-            request.topic,
-            request.learning_objectives
-        )
+        session = await services.session_store.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
 
-        # Extract the structured research data for report generation
-        research_data = research_result["structured_data"]
+        fields = {}
+        if request.answers:
+            fields["answers"] = request.answers
+        if request.followup_answers:
+            fields["followup_answers"] = request.followup_answers
 
+        if request.answers and not session["followup_questions"]:
+            research = services.research_prefetcher.peek(session_id)
+            initial_answers = "\n".join(f"Q: {q}\nA: {a}" for q, a in zip(session["questions"], request.answers))
+            followups = await services.interactive_questioner.generate_followup_questions(
+                session["topic"],
+                session["learning_objectives"],
+                initial_answers,
+                research["synthesized_content"] if research else ""
+            )
+            if not _is_generation_error(followups, services.interactive_questioner.FOLLOWUP_ERROR):
+                fields["followup_questions"] = services.interactive_questioner.clean_questions(followups)
 
-        # Generate the same initial questions used during interaction
-        questions = await interactive_questioner.generate_initial_questions(
-            request.topic,
-            request.learning_objectives
+        session = await services.session_store.update(session_id, **fields)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+        return {"id": session_id, **session}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error recording session answers: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to record answers")
+
+@app.post("/api/reports", response_model=Report)
+async def generate_report(
+    request: ReportRequest,
+    background_tasks: BackgroundTasks,
+    async_mode: bool = Query(False, alias="async"),
+    priority: int = Query(10, description="Job priority when async; lower runs first"),
+    x_session_id: Optional[str] = Header(None)
+):
+    """
+    Generate an educational report based on the topic and user responses.
+    With ?async=true the report is queued and a job id is returned immediately.
+    """
+    request = _with_session(request, x_session_id)
+    if async_mode:
+        try:
+            report_jobs = await services.started_report_jobs()
+            job = report_jobs.submit(request, priority)
+        except JobQueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job["id"], "status": job["status"], "status_url": f"/api/jobs/{job['id']}"}
         )
 
-        # Analyze user responses (now correctly awaited)
-        user_preferences = await interactive_questioner.analyze_user_responses(
-            questions[:len(request.responses)],
-            request.responses
-)
+    try:
+        return await _build_report(request)
+    except Exception as e:
+        logging.error(f"Error generating report: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to generate report")
+
+@app.post("/api/reports/stream")
+async def stream_report(request: ReportRequest, x_session_id: Optional[str] = Header(None)):
+    """
+    Generate a report as a Server-Sent Events stream.
 
+    Emits "progress" events for each pipeline stage (research, analysis,
+    generation), "token" events with markdown as it is generated, a
+    "references" event with the appended References section, and finally
+    "done" with the stored report id.
+    """
+    request = _with_session(request, x_session_id)
 
-        # Generate the report
-        report_content = await report_generator.generate_report(
-            request.topic,
-            request.learning_objectives,
-            research_data,
-            user_preferences
-        )
+    async def events():
+        try:
+            yield _sse_event("progress", {"stage": "research"})
+            research_data = await _research(request)
 
-        # Generate a unique ID for the report
-        import uuid
-        report_id = str(uuid.uuid4())
+            yield _sse_event("progress", {"stage": "analysis"})
+            user_preferences = await _analyze_preferences(request)
 
-        # Store the report and research data
-        reports_store[report_id] = {
-            "content": report_content,
-            "topic": request.topic,
-            "learning_objectives": request.learning_objectives,
-            "research_data": research_data
-        }
+            yield _sse_event("progress", {"stage": "generation"})
+            async for event, text in services.report_generator.stream_report(
+                request.topic,
+                request.learning_objectives,
+                research_data,
+                user_preferences
+            ):
+                if event == "report":
+                    report_id = await _store_report(request, text, research_data)
+                else:
+                    yield _sse_event(event, {"text": text})
 
-        return Report(
-            id=report_id,
-            title=f"Report on {request.topic}",
-            content=report_content
-        )
+            yield _sse_event("done", {"id": report_id, "title": f"Report on {request.topic}"})
 
-    except Exception as e:
-        logging.error(f"Error generating report: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to generate report")
+        except Exception as e:
+            logging.error(f"Error streaming report: {str(e)}")
+            yield _sse_event("error", {"detail": "Failed to generate report"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/reports/batch")
+async def generate_report_batch(request: ReportBatchRequest):
+    """
+    Generate many reports together, streamed back as NDJSON.
+
+    Research is batched so overlapping topics share their source lookups, and
+    reports are generated with bounded concurrency. One line is emitted per
+    item as it finishes (in completion order, tagged with its index), followed
+    by a summary line.
+    """
+    items = request.items
+
+    async def results():
+        started = time.monotonic()
+        lines = asyncio.Queue()
+        # Reports (and preference analyses) generated at once by a single batch request
+        semaphore = asyncio.Semaphore(int(os.getenv("REPORT_BATCH_CONCURRENCY", "8")))
+
+        async def analyze(item):
+            async with semaphore:
+                return await _analyze_preferences(item)
+
+        # Preference analysis doesn't depend on research, so it runs alongside it
+        analyses = [asyncio.create_task(analyze(item)) for item in items]
+        tasks = []
+
+        async def generate(index, research):
+            item = items[index]
+            try:
+                research_data = research["structured_data"]
+                user_preferences = await analyses[index]
+                async with semaphore:
+                    report_content = await services.report_generator.generate_report(
+                        item.topic,
+                        item.learning_objectives,
+                        research_data,
+                        user_preferences
+                    )
+                report_id = await _store_report(item, report_content, research_data)
+                line = {"index": index, "status": "completed", "id": report_id,
+                        "title": f"Report on {item.topic}", "content": report_content}
+            except Exception as e:
+                logging.error(f"Error generating batch report for '{item.topic}': {str(e)}")
+                line = {"index": index, "status": "failed", "detail": "Failed to generate report"}
+            await lines.put(line)
+
+        async def schedule():
+            topics = [(item.topic, item.learning_objectives) for item in items]
+            scheduled = set()
+            try:
+                async for index, research in services.research_engine.research_topics(topics):
+                    scheduled.add(index)
+                    tasks.append(asyncio.create_task(generate(index, research)))
+            except Exception as e:
+                logging.error(f"Error researching report batch: {str(e)}")
+                for index in range(len(items)):
+                    if index not in scheduled:
+                        await lines.put({"index": index, "status": "failed", "detail": "Failed to generate report"})
+
+        scheduler = asyncio.create_task(schedule())
+        completed = 0
+        try:
+            for _ in items:
+                line = await lines.get()
+                completed += line["status"] == "completed"
+                yield json.dumps(line) + "\n"
+            elapsed = time.monotonic() - started
+            yield json.dumps({
+                "done": True,
+                "completed": completed,
+                "failed": len(items) - completed,
+                "elapsed": round(elapsed, 3),
+                "reports_per_minute": round(completed * 60 / elapsed, 2) if elapsed else None
+            }) + "\n"
+        finally:
+            for task in [scheduler, *analyses, *tasks]:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
 
 @app.post("/api/reports/{report_id}/modify", response_model=Report)
 async def modify_report(report_id: str, request: ReportModificationRequest):
@@ -137,20 +496,20 @@ async def modify_report(report_id: str, request: ReportModificationRequest):
     Modify an existing report based on feedback
     """
     try:
-        if report_id not in reports_store:
+        original_report = await services.report_store.get(report_id)
+        if original_report is None:
             raise HTTPException(status_code=404, detail="Report not found")
 
-        original_report = reports_store[report_id]
-
-        # Modify the report based on feedback
-        modified_content = await report_generator.modify_report(
+        # Regenerate only the sections the feedback affects
+        modified_content, sections = await services.report_generator.modify_report(
             original_report["content"],
             request.feedback,
-            original_report["research_data"]
+            original_report["research_data"],
+            original_report.get("sections")
         )
 
         # Update stored report
-        reports_store[report_id]["content"] = modified_content
+        await services.report_store.update(report_id, content=modified_content, sections=sections)
 
         return Report(
             id=report_id,
@@ -164,6 +523,153 @@ async def modify_report(report_id: str, request: ReportModificationRequest):
         logging.error(f"Error modifying report: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to modify report")
 
+# Handlers that read state the event loop mutates (job records, caches, waiter
+# heaps, metric samples) are async so they run on the loop, never in the
+# threadpool alongside it. Stats backed by SQLite stay sync so their queries
+# run in the threadpool under the store's own lock.
+@app.get("/api/jobs/stats")
+async def job_stats():
+    """
+    Queue depth and worker utilisation of the report job pool
+    """
+    return services.report_jobs.stats()
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status, per-stage progress and result of a queued report job
+    """
+    job = services.report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/sessions/store/stats")
+def session_store_stats():
+    """
+    Live sessions, their compressed size and lookup counters
+    """
+    return services.session_store.stats()
+
+@app.get("/api/reports/store/stats")
+async def report_store_stats():
+    """
+    Size and hot-tier hit rate of the report store
+    """
+    return await services.report_store.stats()
+
+def _require_research_cache():
+    if services.research_engine.cache is None:
+        raise HTTPException(status_code=404, detail="Research cache is disabled")
+    return services.research_engine.cache
+
+@app.get("/api/admin/research-cache")
+async def inspect_research_cache():
+    """
+    Research cache counters and the cached (topic, objectives) entries
+    """
+    cache = _require_research_cache()
+    return {"stats": cache.stats(), "entries": cache.entries()}
+
+@app.delete("/api/admin/research-cache")
+async def invalidate_research_cache(topic: Optional[str] = None, learning_objectives: Optional[str] = None):
+    """
+    Invalidate one entry, every entry for a topic, or the whole research cache
+    """
+    cache = _require_research_cache()
+    return {"invalidated": cache.invalidate(topic, learning_objectives)}
+
+@app.post("/api/admin/research-cache/warm", status_code=202)
+async def warm_research_cache(request: ResearchCacheWarmRequest):
+    """
+    Pre-warm the research cache; research runs in the background
+    """
+    _require_research_cache()
+    scheduled = [
+        services.research_engine.refresh_topic(item.topic, item.learning_objectives)
+        for item in request.topics
+    ]
+    return {"scheduled": sum(scheduled), "already_refreshing": len(scheduled) - sum(scheduled)}
+
+@app.get("/api/research-prefetch/stats")
+async def research_prefetch_stats():
+    """
+    Speculative research prefetches: in flight, used, skipped and expired
+    """
+    return services.research_prefetcher.stats()
+
+@app.get("/api/research-corpus/stats")
+def research_corpus_stats():
+    """
+    Items in the local research corpus, by source, and search counters
+    """
+    corpus = services.research_engine.corpus
+    if corpus is None:
+        return {"enabled": False}
+    return {"enabled": True, "offline": services.research_engine.offline, **corpus.stats()}
+
+@app.get("/api/video-transcripts/stats")
+async def video_transcript_stats():
+    """
+    Transcript segment cache size, hits and fetches of the video source
+    """
+    return services.research_engine.video_source.transcripts.stats()
+
+@app.get("/api/http-pool/stats")
+async def http_pool_stats():
+    """
+    Connection pool statistics for the shared HTTP client
+    """
+    return services.http_client.stats()
+
+@app.get("/api/citations/stats")
+async def citation_registry_stats():
+    """
+    Size and hit rate of the shared citation registry
+    """
+    return services.citation_service.registry.stats()
+
+@app.get("/api/llm-cache/stats")
+async def llm_cache_stats():
+    """
+    Hit/miss/eviction counters for the LLM response cache
+    """
+    if services.llm_service.cache is None:
+        return {"enabled": False}
+    return services.llm_service.cache.stats()
+
+@app.get("/api/llm-rate-limiter/stats")
+async def llm_rate_limiter_stats():
+    """
+    Adaptive concurrency limit, queue and throttling counters for LLM calls
+    """
+    return services.llm_service.rate_limiter.stats()
+
+@app.get("/api/llm-routes")
+async def llm_routes():
+    """
+    Model, endpoint and parameters per task type, with the hedge delay and
+    hedge counters of hedged tasks
+    """
+    return services.llm_service.routes()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics: pipeline stage latency, in-flight and error counts,
+    LLM calls and token usage, and API request latency
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/ready")
+async def readiness():
+    """
+    Readiness probe: 200 once warm-up (client creation, cache and tokenizer
+    loading, worker start) has finished, 503 with per-step status until then
+    """
+    status = services.readiness()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 @app.get("/")
 def root():
     return {"message": "🎓 Interactive Learning Assistant is up and running!"}
@@ -2,8 +2,15 @@ import logging
 import asyncio
 from typing import List
 from src.services.llm_service import LLMService
+from src.services.rate_limiter import PRIORITY_INTERACTIVE
+from src.services.llm_router import TASK_QUESTIONS, TASK_ANALYSIS
+from src.services.metrics import track_stage
 
 class InteractiveQuestioner:
+    # Returned as the only question when generation fails
+    QUESTIONS_ERROR = "An error occurred while generating questions."
+    FOLLOWUP_ERROR = "An error occurred while generating follow-up questions."
+
     def __init__(self, llm_service: LLMService):
         self.llm_service = llm_service
         self.logger = logging.getLogger(__name__)
@@ -18,14 +25,16 @@ class InteractiveQuestioner:
 
         try:
             self.logger.info("Calling LLM with prompt...")
-            response = await self.llm_service.generate_content(prompt)
+            # The user is waiting on these, so they go ahead of bulk report work
+            with track_stage("questioner", "initial_questions"):
+                response = await self.llm_service.generate_content(prompt, priority=PRIORITY_INTERACTIVE, task=TASK_QUESTIONS)
             self.logger.info("LLM call successful")
 
             # Return each question as a new line (split by '\n')
             return response.split('\n') if isinstance(response, str) else response
         except Exception as e:
             self.logger.error(f"Unexpected error: {e}")
-            return ["An error occurred while generating questions."]
+            return [self.QUESTIONS_ERROR]
 
     async def generate_followup_questions(self, topic: str, learning_objectives: str, initial_answers: str, research_data: str) -> List[str]:
         self.logger.info("Generating follow-up questions based on user responses")
@@ -44,11 +53,12 @@ class InteractiveQuestioner:
         """
 
         try:
-            response = await self.llm_service.generate_content(prompt)
+            with track_stage("questioner", "followup_questions"):
+                response = await self.llm_service.generate_content(prompt, priority=PRIORITY_INTERACTIVE, task=TASK_QUESTIONS)
             return self._parse_questions(response)
         except Exception as e:
             self.logger.error(f"Error generating follow-up questions: {e}")
-            return ["An error occurred while generating follow-up questions."]
+            return [self.FOLLOWUP_ERROR]
 
     async def analyze_user_responses(self, questions: List[str], answers: List[str]) -> str:
         self.logger.info("Analyzing user responses to customize learning content")
@@ -71,12 +81,20 @@ class InteractiveQuestioner:
         """
 
         try:
-            analysis = await self.llm_service.generate_content(prompt)
+            with track_stage("questioner", "response_analysis"):
+                analysis = await self.llm_service.generate_content(prompt, task=TASK_ANALYSIS)
             return self._parse_analysis(analysis)
         except Exception as e:
             self.logger.error(f"Error analyzing user responses: {e}")
             return "{}"
 
+    @staticmethod
+    def clean_questions(lines: List[str]) -> List[str]:
+        """The actual questions among generated lines, without blank lines or preamble."""
+        lines = [line.strip() for line in lines if line and line.strip()]
+        questions = [line for line in lines if line.endswith("?")]
+        return questions or lines
+
     def _parse_questions(self, questions_text: str) -> List[str]:
         return [q.strip() for q in questions_text.strip().split('\n') if q.strip()]
 
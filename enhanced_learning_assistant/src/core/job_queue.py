@@ -0,0 +1,160 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import itertools
+from collections import OrderedDict
+from typing import Awaitable, Callable, List
+from src.services.tracing import get_trace_id, set_trace_id
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+class ReportJobQueue:
+    """
+    Runs report jobs on a bounded pool of asyncio workers fed by a priority
+    queue. Lower priority numbers are processed first; equal priorities are
+    processed in submission order.
+
+    `handler(payload, progress)` does the actual work. It calls
+    `progress(stage)` as it enters each stage and returns the job result.
+    """
+
+    def __init__(self, handler: Callable[..., Awaitable], stages: List[str], workers=None, max_queue_size=None, history_limit=None):
+        self.handler = handler
+        self.stages = stages
+        self.logger = logging.getLogger(__name__)
+
+        self.num_workers = workers or int(os.getenv("REPORT_WORKERS", "4"))
+        self.max_queue_size = max_queue_size or int(os.getenv("REPORT_QUEUE_SIZE", "100"))
+        self.history_limit = history_limit or int(os.getenv("REPORT_JOB_HISTORY", "1000"))
+
+        self.jobs = OrderedDict()
+        self._queue = None
+        self._workers = []
+        self._sequence = itertools.count()
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at = None
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._started_at = time.monotonic()
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"report-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        self.logger.info(f"Started {self.num_workers} report workers")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.logger.info("Stopped report workers")
+
+    def submit(self, payload, priority: int = 10) -> dict:
+        """Queue a job and return its record. Raises JobQueueFullError when full."""
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+
+        job_id = str(uuid.uuid4())
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "priority": priority,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "stages": {stage: "pending" for stage in self.stages},
+            "result": None,
+            "error": None,
+            # Log lines from the job carry the trace id of the request that queued it
+            "trace_id": get_trace_id(),
+        }
+
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), job_id, payload))
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Report queue is full ({self.max_queue_size} jobs)")
+
+        self.jobs[job_id] = job
+        self._trim_history()
+        return job
+
+    def get(self, job_id: str):
+        """A snapshot of a job's record, or None; workers keep updating the original."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {**job, "stages": dict(job["stages"])}
+
+    def stats(self) -> dict:
+        statuses = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+        for job in self.jobs.values():
+            statuses[job["status"]] += 1
+
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "workers": self.num_workers,
+            "busy_workers": self._busy,
+            "utilisation": self._busy / self.num_workers if self.num_workers else 0.0,
+            "average_utilisation": self._busy_seconds / (uptime * self.num_workers) if uptime else 0.0,
+            "jobs": statuses,
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            priority, _, job_id, payload = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None:
+                self._queue.task_done()
+                continue
+
+            self._busy += 1
+            set_trace_id(job["trace_id"])
+            started = time.monotonic()
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            try:
+                job["result"] = await self.handler(payload, lambda stage: self._advance(job, stage))
+                for stage in self.stages:
+                    job["stages"][stage] = "completed"
+                job["status"] = "completed"
+            except asyncio.CancelledError:
+                job["status"] = "failed"
+                job["error"] = "Job cancelled during shutdown"
+                raise
+            except Exception as e:
+                self.logger.error(f"Report job {job_id} failed: {str(e)}")
+                job["status"] = "failed"
+                job["error"] = str(e)
+                for stage, state in job["stages"].items():
+                    if state == "running":
+                        job["stages"][stage] = "failed"
+            finally:
+                job["finished_at"] = time.time()
+                self._busy -= 1
+                self._busy_seconds += time.monotonic() - started
+                self._queue.task_done()
+
+    def _advance(self, job, stage):
+        """Mark `stage` as running and every stage before it as completed."""
+        for name in self.stages:
+            if name == stage:
+                job["stages"][name] = "running"
+                break
+            job["stages"][name] = "completed"
+
+    def _trim_history(self):
+        # Drop the oldest finished jobs; queued and running jobs are always kept
+        excess = len(self.jobs) - self.history_limit
+        if excess <= 0:
+            return
+        for job_id in [j["id"] for j in self.jobs.values() if j["status"] in ("completed", "failed")][:excess]:
+            del self.jobs[job_id]
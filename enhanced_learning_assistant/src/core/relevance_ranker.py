@@ -0,0 +1,59 @@
+import os
+import logging
+from typing import List
+
+class RelevanceRanker:
+    """
+    Scores research items against the topic and learning objectives and drops
+    near-duplicates, using one TF-IDF matrix for the whole batch.
+
+    Each kept item gets a "relevance" score (cosine similarity to the topic
+    and objectives) that later stages use to decide what goes into prompts.
+    """
+
+    def __init__(self, duplicate_threshold=None, min_relevance=None):
+        self.logger = logging.getLogger(__name__)
+        self.duplicate_threshold = duplicate_threshold or float(os.getenv("RESEARCH_DUPLICATE_THRESHOLD", "0.85"))
+        self.min_relevance = min_relevance if min_relevance is not None else float(os.getenv("RESEARCH_MIN_RELEVANCE", "0.0"))
+
+    def rank(self, items: List[dict], topic: str, learning_objectives: str) -> List[dict]:
+        """Return items ordered by relevance with near-duplicates removed."""
+        if len(items) < 2:
+            return items
+
+        try:
+            # Heavy imports are deferred until ranking is actually needed
+            import numpy as np
+            from sklearn.feature_extraction.text import TfidfVectorizer
+        except ImportError:
+            self.logger.warning("scikit-learn is not installed; research items are not ranked")
+            return items
+
+        texts = [f"{item.get('title', '')} {item.get('content', '')}" for item in items]
+        try:
+            vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+            matrix = vectorizer.fit_transform(texts + [f"{topic} {learning_objectives}"])
+        except ValueError:
+            # Nothing but stop words; there is nothing to rank on
+            return items
+
+        # Rows are L2-normalised, so dot products are cosine similarities
+        documents, query = matrix[:-1], matrix[-1]
+        relevance = (documents @ query.T).toarray().ravel()
+        similarity = (documents @ documents.T).toarray()
+
+        kept = []
+        for index in np.argsort(-relevance, kind="stable"):
+            if relevance[index] < self.min_relevance:
+                continue
+            if kept and similarity[index, kept].max() >= self.duplicate_threshold:
+                continue
+            kept.append(index)
+
+        self.logger.info(f"Ranked {len(items)} research items, kept {len(kept)} after removing near-duplicates")
+        ranked = []
+        for index in kept:
+            item = dict(items[index])
+            item["relevance"] = round(float(relevance[index]), 4)
+            ranked.append(item)
+        return ranked
@@ -1,5 +1,16 @@
-from src.services.llm_service import LLMService
+from src.services.llm_service import LLMService, LLM_ERROR_MESSAGES
 from src.services.citation_service import CitationService
+from src.services.context_packer import ContextPacker, ContextOverflowError
+from src.services.rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE
+from src.services.llm_router import TASK_ANALYSIS, TASK_REPORT
+from src.services.metrics import track_stage
+from src.core.report_sections import (
+    parse_sections, render_sections, walk_sections, find_section,
+    is_reference_section, contains_references, replace_section, insert_section_after
+)
+import os
+import re
+import asyncio
 import logging
 import json
 
@@ -10,55 +21,127 @@ class ReportGenerator:
         self.citation_service = citation_service
         self.logger = logging.getLogger(__name__)
 
-    def _condense_research_data(self, research_data, limit=2000): 
-        condensed = ""
-        for item in research_data:
-            section = f"Title: {item.get('title', '')}\nContent: {item.get('content', '')[:300]}\n\n"  
-            if len(condensed + section) > limit:
-                break
-            condensed += section
-        return condensed
+        # Token budgets, counted for the model report calls are routed to
+        self.packer = ContextPacker(llm_service.router.route(TASK_REPORT).model)
+        self.context_tokens = int(os.getenv("REPORT_CONTEXT_TOKENS", "1500"))
+        self.citation_tokens = int(os.getenv("REPORT_CITATION_TOKENS", "400"))
+        self.item_tokens = int(os.getenv("REPORT_ITEM_TOKENS", "120"))
+        self.report_max_tokens = int(os.getenv("REPORT_MAX_TOKENS", "4000"))
+
+        # "single" writes the whole report in one completion; "sections" writes
+        # a short outline first and then every section concurrently
+        self.generation_mode = os.getenv("REPORT_GENERATION_MODE", "single").lower()
+        self.outline_tokens = int(os.getenv("REPORT_OUTLINE_TOKENS", "400"))
+        self.section_tokens = int(os.getenv("REPORT_SECTION_TOKENS", "800"))
+        self.section_context_tokens = int(os.getenv("REPORT_SECTION_CONTEXT_TOKENS", "800"))
+        self.section_concurrency = int(os.getenv("REPORT_SECTION_CONCURRENCY", "6"))
+
+    def _condense_research_data(self, research_data, budget=None):
+        """
+        Pack the most valuable research items into a token budget. Returns the
+        condensed text and the items that fit.
+        """
+        return self.packer.pack(
+            [item for item in research_data if isinstance(item, dict)],
+            budget or self.context_tokens,
+            lambda item: f"Title: {item.get('title', '')}\nContent: {item.get('content', '')}\n\n",
+            item_max_tokens=self.item_tokens
+        )
 
     async def generate_report(self, topic, learning_objectives, research_data, user_preferences):
         """Generates an educational report based on research data and user preferences."""
-        MAX_CHARS = 2000
-        # Only truncate research items, not convert list to string!
-        if len(research_data) > 10:
-            self.logger.warning("Truncating research items to fit within token limit.")
-            research_data = research_data[:10]
-        
-        # Decode user preferences if necessary
-        if isinstance(user_preferences, str):
+        if self.generation_mode == "sections":
             try:
-                user_preferences = json.loads(user_preferences)
-            except json.JSONDecodeError:
-                self.logger.warning("Could not decode user preferences JSON.")
-                user_preferences = {}
-        
-        self.logger.info(f"Generating educational report for topic: {topic}")
-        self.logger.debug(f"User preferences: {user_preferences}")
+                with track_stage("report", "generation"):
+                    sections, citations = await self._start_sections(topic, learning_objectives, research_data, user_preferences)
+                    try:
+                        report_content = f"# {topic}\n\n" + "".join(await asyncio.gather(*sections))
+                    finally:
+                        for section in sections:
+                            section.cancel()
+                return self._format_report(report_content, citations)
+            except Exception as e:
+                self.logger.error(f"Error generating report: {str(e)}")
+                return "Content generation failed internally"
 
-        # Extract user preferences safely
-        knowledge_level = "intermediate"
-        interests = []
-        preferred_formats = []
-        
-        # Try to extract values with proper error handling
         try:
-            if isinstance(user_preferences, dict):
-                knowledge_level = user_preferences.get('prior knowledge level', 'intermediate')
-                interests = user_preferences.get('specific interests', [])
-                preferred_formats = user_preferences.get('preferred learning formats', [])
+            prompt, citations, max_tokens = self._build_report_prompt(topic, learning_objectives, research_data, user_preferences)
+
+            # Generate the report content using LLM - now correctly awaits the async function
+            with track_stage("report", "generation"):
+                report_content = await self.llm_service.generate_content(prompt, max_tokens, priority=PRIORITY_BULK, task=TASK_REPORT)
+            self.logger.debug(f"Raw report content: {report_content[:500]}...")
+
+            # Format the report with citations
+            final_report = self._format_report(report_content, citations)
+            return final_report
+
         except Exception as e:
-            self.logger.warning(f"Error extracting user preferences: {e}")
+            self.logger.error(f"Error generating report: {str(e)}")
+            return "Content generation failed internally"
 
-        # Condense research data and format citations
+    async def stream_report(self, topic, learning_objectives, research_data, user_preferences):
+        """
+        Streams the report as it is generated. Yields (event, text) pairs:
+        "token" for each markdown delta, then "references" with the appended
+        References section, then "report" with the final formatted report.
+        If formatting had to rewrite already-streamed content (e.g. dropping a
+        duplicate references section), "replace" carries the full report instead
+        of "references". In "sections" mode each section is emitted as one
+        "token" event, in order, as soon as it and the ones before it are done.
+        """
+        if self.generation_mode == "sections":
+            sections, citations = await self._start_sections(topic, learning_objectives, research_data, user_preferences)
+            chunks = [f"# {topic}\n\n"]
+            yield "token", chunks[0]
+            try:
+                for section in sections:
+                    chunks.append(await section)
+                    yield "token", chunks[-1]
+            finally:
+                for section in sections:
+                    section.cancel()
+            report_content = "".join(chunks)
+            final_report = self._format_report(report_content, citations)
+            yield "references", final_report[len(report_content):]
+            yield "report", final_report
+            return
+
+        prompt, citations, max_tokens = self._build_report_prompt(topic, learning_objectives, research_data, user_preferences)
+
+        chunks = []
+        with track_stage("report", "stream_generation"):
+            async for delta in self.llm_service.stream_content(prompt, max_tokens, priority=PRIORITY_BULK, task=TASK_REPORT):
+                chunks.append(delta)
+                yield "token", delta
+
+        report_content = "".join(chunks)
+        final_report = self._format_report(report_content, citations)
+        if final_report.startswith(report_content):
+            yield "references", final_report[len(report_content):]
+        else:
+            yield "replace", final_report
+        yield "report", final_report
+
+    def _build_report_prompt(self, topic, learning_objectives, research_data, user_preferences):
+        """
+        Builds the report generation prompt, the formatted citations and a
+        max_tokens that keeps prompt plus completion inside the context window.
+        """
+        knowledge_level, interests, preferred_formats = self._extract_preferences(user_preferences)
+        self.logger.info(f"Generating educational report for topic: {topic}")
+
+        # Condense research data and format citations for the items that fit
         try:
-            citations = self.citation_service.format_citations(research_data)
-            condensed_data = self._condense_research_data(research_data)
+            condensed_data, packed_items = self._condense_research_data(research_data)
+            if len(packed_items) < len(research_data):
+                self.logger.info(f"Packed {len(packed_items)}/{len(research_data)} research items into {self.context_tokens} tokens")
+            citations = self.citation_service.format_citations(packed_items)
+            prompt_citations = self.packer.pack_lines(citations, self.citation_tokens)
         except Exception as e:
             self.logger.error(f"Error formatting research data: {e}")
             citations = "Citation formatting failed."
+            prompt_citations = citations
             condensed_data = "Data condensing failed."
 
         # Construct the prompt for the LLM model
@@ -83,23 +166,175 @@ class ReportGenerator:
         7. Recommended additional resources
 
         Use markdown formatting for structure.
-        Include these citations appropriately: {citations[:500]}... (truncated)
+        Include these citations appropriately: {prompt_citations}
         """
 
+        max_tokens = self.packer.completion_budget(prompt, self.report_max_tokens)
         self.logger.debug(f"Final LLM prompt: {prompt[:500]}...")
+        return prompt, citations, max_tokens
 
+    def _extract_preferences(self, user_preferences):
+        """Return (knowledge level, interests, preferred formats) from the analysed preferences."""
+        # Decode user preferences if necessary
+        if isinstance(user_preferences, str):
+            try:
+                user_preferences = json.loads(user_preferences)
+            except json.JSONDecodeError:
+                self.logger.warning("Could not decode user preferences JSON.")
+                user_preferences = {}
+        
+        self.logger.debug(f"User preferences: {user_preferences}")
+
+        # Extract user preferences safely
+        knowledge_level = "intermediate"
+        interests = []
+        preferred_formats = []
+        
+        # Try to extract values with proper error handling
         try:
-            # Generate the report content using LLM - now correctly awaits the async function
-            report_content = await self.llm_service.generate_content(prompt, 4000)
-            self.logger.debug(f"Raw report content: {report_content[:500]}...")
+            if isinstance(user_preferences, dict):
+                knowledge_level = user_preferences.get('prior knowledge level', 'intermediate')
+                interests = user_preferences.get('specific interests', [])
+                preferred_formats = user_preferences.get('preferred learning formats', [])
+        except Exception as e:
+            self.logger.warning(f"Error extracting user preferences: {e}")
 
-            # Format the report with citations
-            final_report = self._format_report(report_content, citations)
-            return final_report
+        return knowledge_level, interests, preferred_formats
 
-        except Exception as e:
-            self.logger.error(f"Error generating report: {str(e)}")
-            return "Content generation failed internally"
+    async def _start_sections(self, topic, learning_objectives, research_data, user_preferences):
+        """
+        Outline the report, then start generating every section concurrently.
+        Returns the section tasks in report order and the formatted citations.
+        Every section cites by the numbers of one shared reference list.
+        """
+        knowledge_level, interests, preferred_formats = self._extract_preferences(user_preferences)
+        self.logger.info(f"Generating sectioned report for topic: {topic}")
+
+        # All sections draw on one packed set of sources so numbering is global
+        _, packed_items = self._condense_research_data(research_data, self.context_tokens * 2)
+        entries = self.citation_service.citation_entries(packed_items)
+        citations = self.citation_service.format_citations(packed_items)
+        sources = {number: item for number, (item, _) in enumerate(entries, 1)}
+
+        audience = (
+            f"Tailor it to a {knowledge_level} knowledge level. "
+            f"Focus on these specific interests: {', '.join(interests) if isinstance(interests, list) else str(interests)}. "
+            f"Include content in these preferred formats: {', '.join(preferred_formats) if isinstance(preferred_formats, list) else str(preferred_formats)}."
+        )
+        outline = await self._generate_outline(topic, learning_objectives, audience, sources)
+        self.logger.info(f"Generating {len(outline)} report sections concurrently")
+
+        semaphore = asyncio.Semaphore(self.section_concurrency)
+        titles = [section["title"] for section in outline]
+
+        async def write(index, section):
+            async with semaphore:
+                return await self._generate_section(topic, learning_objectives, audience, titles, index, section, sources)
+
+        tasks = [asyncio.create_task(write(index, section)) for index, section in enumerate(outline)]
+
+        # A failed section fails the whole report, so the others stop rather
+        # than spend rate-limit budget on a report nobody will get
+        def cancel_siblings(task):
+            if not task.cancelled() and task.exception() is not None:
+                for other in tasks:
+                    other.cancel()
+
+        for task in tasks:
+            task.add_done_callback(cancel_siblings)
+        return tasks, citations
+
+    async def _generate_outline(self, topic, learning_objectives, audience, sources):
+        """Ask for a short JSON outline; fall back to a standard structure if it can't be parsed."""
+        source_list = self.packer.pack_lines(
+            "\n".join(f"[{number}] {item.get('title', 'Untitled')}" for number, item in sources.items()),
+            self.context_tokens // 2
+        )
+        prompt = f"""
+Plan an educational report on the topic: '{topic}'
+that addresses these learning objectives: '{learning_objectives}'.
+{audience}
+
+Available sources:
+{source_list}
+
+Return a JSON list of 4-8 sections in reading order, starting with an introduction
+and ending with a conclusion and recommended additional resources. Each section is
+{{"title": "...", "focus": "one sentence on what it covers", "sources": [source numbers]}}.
+Respond with JSON only.
+"""
+        with track_stage("report", "outline"):
+            response = await self.llm_service.generate_content(prompt, self.outline_tokens, priority=PRIORITY_BULK, task=TASK_REPORT)
+        try:
+            match = re.search(r"\[.*\]", response, re.DOTALL)
+            outline = [
+                {
+                    "title": str(section["title"]).strip().lstrip("#").strip(),
+                    "focus": str(section.get("focus", "")),
+                    "sources": [int(n) for n in section.get("sources") or [] if int(n) in sources],
+                }
+                for section in json.loads(match.group(0))
+                if isinstance(section, dict) and section.get("title")
+            ]
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            self.logger.warning(f"Could not parse report outline: {e}")
+            outline = []
+
+        if not outline:
+            outline = [
+                {"title": "Introduction", "focus": "Why the topic matters and what the reader will learn", "sources": []},
+                {"title": "Key Concepts", "focus": "The core ideas, explained progressively", "sources": []},
+                {"title": "Examples and Applications", "focus": "Worked examples and real-world uses", "sources": []},
+                {"title": "Conclusion", "focus": "Summary of the key takeaways", "sources": []},
+                {"title": "Recommended Additional Resources", "focus": "Where to learn more", "sources": []},
+            ]
+        return outline
+
+    async def _generate_section(self, topic, learning_objectives, audience, titles, index, section, sources):
+        """Write one section from its own slice of the research, citing by global source number."""
+        numbers = {id(item): number for number, item in sources.items()}
+        render = lambda item: f"[{numbers[id(item)]}] {item.get('title', '')}: {item.get('content', '')}\n\n"
+
+        # Sources the outline assigned come first; the rest fill what is left of the budget
+        assigned = [sources[number] for number in dict.fromkeys(section["sources"])]
+        others = [item for number, item in sources.items() if number not in section["sources"]]
+        context, _ = self.packer.pack(assigned, self.section_context_tokens, render, item_max_tokens=self.item_tokens)
+        remaining = self.section_context_tokens - self.packer.counter.count(context)
+        extra, _ = self.packer.pack(others, remaining, render, item_max_tokens=self.item_tokens)
+
+        prompt = f"""
+You are writing section {index + 1} of {len(titles)} of an educational report on the topic: '{topic}'
+that addresses these learning objectives: '{learning_objectives}'.
+{audience}
+
+The full outline is:
+{chr(10).join(f"{i + 1}. {title}" for i, title in enumerate(titles))}
+
+Write only the section "{section['title']}": {section['focus']}
+Start with the heading "## {section['title']}" and use markdown. Do not repeat
+material that belongs to other sections and do not add a references list.
+Cite factual information with the bracketed source numbers below, e.g. [2].
+
+Sources:
+{context + extra}
+"""
+        try:
+            max_tokens = self.packer.completion_budget(prompt, self.section_tokens)
+        except ContextOverflowError as e:
+            self.logger.warning(f"Section '{section['title']}' skipped: {e}")
+            return ""
+        with track_stage("report", "section"):
+            text = await self.llm_service.generate_content(prompt, max_tokens, priority=PRIORITY_BULK, task=TASK_REPORT)
+        if not text or text in LLM_ERROR_MESSAGES:
+            self.logger.warning(f"Section '{section['title']}' could not be generated")
+            return ""
+
+        text = text.strip("\n")
+        # Drop any reference list the model added anyway; the report gets one at the end
+        text = re.split(r"^#{1,6}\s+(?:References|Citations)\s*$", text, flags=re.MULTILINE | re.IGNORECASE)[0].rstrip()
+        if not text.lstrip().startswith("#"):
+            text = f"## {section['title']}\n\n{text}"
+        return text + "\n\n"
 
     def _format_report(self, report_content, citations):
         """Format the report with proper structure and citations."""
@@ -128,31 +363,180 @@ class ReportGenerator:
         report_content += citations
         
         return report_content
-    async def modify_report(self, original_report, feedback, research_data):
-        """Modify an existing report based on user feedback."""
+    async def modify_report(self, original_report, feedback, research_data, sections=None):
+        """
+        Modify an existing report based on user feedback.
+
+        Only the sections the feedback affects are regenerated (concurrently)
+        and spliced back into the section tree; the References section is never
+        rewritten. Returns the modified report and its section tree.
+        """
         self.logger.info("Modifying report based on user feedback")
+        sections = sections or parse_sections(original_report)
+        editable = [
+            section for section in walk_sections(sections)
+            if section["heading"] and not is_reference_section(section)
+        ]
+        if not editable:
+            # Nothing to target; treat the whole report as one section
+            sections = [{"level": 0, "heading": "", "title": "", "body": original_report, "children": [], "id": "1"}]
+            editable = sections
+
+        with track_stage("report", "section_selection"):
+            section_ids, insert_after = await self._select_sections(editable, feedback)
+        self.logger.info(f"Regenerating sections {section_ids}" + (f", inserting after {insert_after}" if insert_after else ""))
+        condensed_data, _ = self._condense_research_data(research_data or [], self.context_tokens // 3)
+        outline = self._section_outline(editable)
+
+        async def rewrite(section_id):
+            section = find_section(sections, section_id)
+            return section_id, await self._rewrite_section(section, feedback, outline, condensed_data)
+
+        async def write_new(section_id):
+            return section_id, await self._write_new_section(find_section(sections, section_id), feedback, outline, condensed_data)
+
+        try:
+            with track_stage("report", "modification"):
+                rewrites = await asyncio.gather(
+                    *(rewrite(section_id) for section_id in section_ids),
+                    *([write_new(insert_after)] if insert_after else [])
+                )
+        except Exception as e:
+            self.logger.error(f"Error modifying report: {str(e)}")
+            return original_report, sections
+
+        new_section = rewrites.pop() if insert_after else None
+        for section_id, markdown in rewrites:
+            if markdown is not None:
+                keep_children = contains_references(find_section(sections, section_id))
+                replace_section(sections, section_id, markdown, keep_children)
+        if new_section is not None and new_section[1] is not None:
+            insert_section_after(sections, insert_after, new_section[1])
+
+        modified_report = render_sections(sections)
+        return modified_report, parse_sections(modified_report)
+
+    async def _select_sections(self, editable, feedback):
+        """
+        Pick the ids of the sections the feedback applies to, plus the id of a
+        section to insert a new one after (or None). Section titles quoted in
+        the feedback are used directly; otherwise the LLM chooses from the outline.
+        """
+        lowered = feedback.lower()
+        # The report title usually names the topic, which most feedback mentions,
+        # so sections wrapping the References or a whole H1 report never match by title
+        matchable = [
+            s for s in editable
+            if not contains_references(s) and not (s["level"] == 1 and s["children"])
+        ]
+        named = [s["id"] for s in matchable if len(s["title"]) >= 4 and s["title"].lower() in lowered]
+        if named:
+            # Prefer the most specific match when a subsection and its parent are both named
+            return [i for i in named if not any(o != i and o.startswith(f"{i}.") for o in named)], None
 
-        # Construct the prompt for modification
         prompt = f"""
-Modify this educational report:
+Here is the outline of an educational report, one section per line as "id: heading":
 
-{original_report[:1000]}... (truncated)
+{self._section_outline(editable)}
 
-Based on this user feedback:
+A reader gave this feedback:
 {feedback}
 
-And using this research data if needed:
-{research_data[:500]}... (truncated)
+Which sections must change to address it? Respond with JSON only, in the form
+{{"sections": ["<id>", ...], "insert_after": "<id or null>"}}
+Use "insert_after" only if the feedback asks for new content that belongs in a new section.
+"""
+        valid = {s["id"] for s in editable}
+        # New sections can't go after a section that ends with the References
+        insertable = {s["id"] for s in editable if not contains_references(s)}
+        try:
+            response = await self.llm_service.generate_content(prompt, 100, priority=PRIORITY_INTERACTIVE, task=TASK_ANALYSIS)
+            match = re.search(r"\{.*\}", response, re.DOTALL)
+            choice = json.loads(match.group(0)) if match else {}
+            section_ids = [str(i) for i in choice.get("sections") or [] if str(i) in valid]
+            insert_after = str(choice.get("insert_after")) if str(choice.get("insert_after")) in insertable else None
+        except (json.JSONDecodeError, AttributeError, TypeError) as e:
+            self.logger.warning(f"Could not parse section selection: {e}")
+            section_ids, insert_after = [], None
+
+        if not section_ids and not insert_after:
+            # No usable answer; fall back to rewriting every top-level content section
+            content = [s for s in editable if not contains_references(s)] or editable
+            top_level = min(s["id"].count(".") for s in content)
+            section_ids = [s["id"] for s in content if s["id"].count(".") == top_level]
+        return section_ids, insert_after
+
+    async def _rewrite_section(self, section, feedback, outline, condensed_data):
+        """
+        Regenerate one section with its subsections; None if generation failed.
+        A section that contains the References (e.g. the report title) only has
+        its own text regenerated.
+        """
+        if contains_references(section):
+            original = section["heading"] + section["body"]
+        else:
+            original = render_sections([section])
+        prompt = f"""
+You are editing one section of an educational report. The report outline is:
 
-Make targeted modifications that address the feedback while maintaining the
-report's overall structure and quality. Ensure all new information includes
-proper citations.
+{outline}
+
+Rewrite this section to address the feedback below. Keep its heading line and
+markdown heading levels, leave content the feedback does not concern unchanged,
+and cite any new information. Return only the rewritten section.
+
+Section:
+{original}
+
+Feedback:
+{feedback}
+
+Research data you may use:
+{condensed_data}
 """
+        desired = min(self.report_max_tokens, max(300, int(self.packer.counter.count(original) * 1.5)))
+        try:
+            max_tokens = self.packer.completion_budget(prompt, desired)
+        except ContextOverflowError as e:
+            self.logger.warning(f"Keeping section {section['id']} unchanged: {e}")
+            return None
+        markdown = await self.llm_service.generate_content(prompt, max_tokens, priority=PRIORITY_INTERACTIVE, task=TASK_REPORT)
+        if not markdown or markdown in LLM_ERROR_MESSAGES:
+            self.logger.warning(f"Keeping section {section['id']} unchanged; regeneration failed")
+            return None
+
+        markdown = markdown.strip("\n")
+        if section["heading"] and not markdown.lstrip().startswith("#"):
+            markdown = section["heading"].rstrip("\r\n") + "\n\n" + markdown
+        return markdown + "\n\n"
+
+    async def _write_new_section(self, after, feedback, outline, condensed_data):
+        """Write a new section to follow `after`; None if generation failed."""
+        prompt = f"""
+You are adding a new section to an educational report. The report outline is:
 
+{outline}
+
+Write the section that should follow section {after['id']} ("{after['title']}") to
+address this feedback:
+{feedback}
+
+Start with a markdown heading at level {max(after['level'], 2)}, cite new information,
+and return only the new section.
+
+Research data you may use:
+{condensed_data}
+"""
         try:
-            # Generate the modified report using LLM - now correctly awaits the async function
-            modified_report = await self.llm_service.generate_content(prompt, 4000)
-            return modified_report
-        except Exception as e:
-            self.logger.error(f"Error modifying report: {str(e)}")
-            return "Report modification failed internally"
\ No newline at end of file
+            max_tokens = self.packer.completion_budget(prompt, min(self.report_max_tokens, 800))
+        except ContextOverflowError as e:
+            self.logger.warning(f"New section not added: {e}")
+            return None
+        markdown = await self.llm_service.generate_content(prompt, max_tokens, priority=PRIORITY_INTERACTIVE, task=TASK_REPORT)
+        if not markdown or markdown in LLM_ERROR_MESSAGES:
+            self.logger.warning("New section could not be generated")
+            return None
+        return markdown.strip("\n") + "\n\n"
+
+    def _section_outline(self, sections):
+        return "\n".join(f"{s['id']}: {'  ' * max(0, s['level'] - 1)}{s['title']}" for s in sections)
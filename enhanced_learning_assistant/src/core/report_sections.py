@@ -0,0 +1,94 @@
+import re
+from typing import List, Optional
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+REFERENCE_TITLES = {"references", "citations"}
+
+def parse_sections(markdown: str) -> List[dict]:
+    """
+    Parse a markdown report into a tree of sections.
+
+    Each section is a dict with its raw "heading" line, heading "level" and
+    "title", the "body" text up to its first subsection, and its "children".
+    Text before the first heading becomes a level-0 section with an empty
+    heading. Rendering the tree gives back the original text exactly.
+    """
+    root = {"level": 0, "children": []}
+    preamble = {"level": 0, "heading": "", "title": "", "body": "", "children": []}
+    stack = [root]
+    current = preamble
+    in_fence = False
+
+    for line in markdown.splitlines(keepends=True):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line.rstrip("\r\n"))
+        if match is None:
+            current["body"] += line
+            continue
+
+        level = len(match.group(1))
+        current = {"level": level, "heading": line, "title": match.group(2), "body": "", "children": []}
+        while stack[-1]["level"] >= level:
+            stack.pop()
+        stack[-1]["children"].append(current)
+        stack.append(current)
+
+    sections = root["children"]
+    if preamble["body"]:
+        sections.insert(0, preamble)
+    number_sections(sections)
+    return sections
+
+def render_sections(sections: List[dict]) -> str:
+    return "".join(section["heading"] + section["body"] + render_sections(section["children"]) for section in sections)
+
+def number_sections(sections: List[dict], prefix: str = ""):
+    """Assign outline ids ("1", "1.2", ...) by position in the tree."""
+    for i, section in enumerate(sections, 1):
+        section["id"] = f"{prefix}{i}"
+        number_sections(section["children"], f"{section['id']}.")
+
+def walk_sections(sections: List[dict]):
+    """Yield every section in document order."""
+    for section in sections:
+        yield section
+        yield from walk_sections(section["children"])
+
+def find_section(sections: List[dict], section_id: str) -> Optional[dict]:
+    return next((section for section in walk_sections(sections) if section["id"] == section_id), None)
+
+def is_reference_section(section: dict) -> bool:
+    return section["title"].strip().lower() in REFERENCE_TITLES
+
+def contains_references(section: dict) -> bool:
+    return any(is_reference_section(child) for child in walk_sections(section["children"]))
+
+def replace_section(sections: List[dict], section_id: str, markdown: str, keep_children: bool = False) -> bool:
+    """
+    Swap a section for new markdown, including its subsections unless
+    `keep_children` is set. Ids are not renumbered.
+    """
+    for siblings in _sibling_lists(sections):
+        for i, section in enumerate(siblings):
+            if section["id"] == section_id:
+                siblings[i] = {"level": section["level"], "heading": "", "title": section["title"], "body": markdown,
+                               "children": section["children"] if keep_children else [], "id": section_id}
+                return True
+    return False
+
+def insert_section_after(sections: List[dict], section_id: str, markdown: str) -> bool:
+    """Insert new markdown directly after a section and its subsections."""
+    for siblings in _sibling_lists(sections):
+        for i, section in enumerate(siblings):
+            if section["id"] == section_id:
+                siblings.insert(i + 1, {"level": section["level"], "heading": "", "title": "",
+                                        "body": markdown, "children": [], "id": f"{section_id}+"})
+                return True
+    return False
+
+def _sibling_lists(sections):
+    yield sections
+    for section in sections:
+        yield from _sibling_lists(section["children"])
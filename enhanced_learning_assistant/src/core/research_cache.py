@@ -0,0 +1,163 @@
+import os
+import copy
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from src.services.single_flight import SingleFlight
+
+class ResearchCache:
+    """
+    Stale-while-revalidate cache of research results keyed on the normalised
+    (topic, learning objectives) pair.
+
+    Entries younger than `ttl` are served as-is. Older entries are still served
+    immediately, but trigger one background refresh. Entries older than
+    `max_stale` are treated as misses and recomputed inline.
+    """
+
+    def __init__(self, ttl=None, max_stale=None, max_entries=None):
+        self.logger = logging.getLogger(__name__)
+
+        self.ttl = ttl or float(os.getenv("RESEARCH_CACHE_TTL", "3600"))
+        self.max_stale = max_stale or float(os.getenv("RESEARCH_CACHE_MAX_STALE", "86400"))
+        self.max_entries = max_entries or int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "256"))
+
+        self._entries = OrderedDict()
+        self._refreshing = {}
+        self._single_flight = SingleFlight("research")
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(topic: str, learning_objectives: str):
+        def normalise(text):
+            return " ".join((text or "").lower().split())
+        return normalise(topic), normalise(learning_objectives)
+
+    async def get_or_compute(self, topic: str, learning_objectives: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+        key = self.make_key(topic, learning_objectives)
+        entry = self._entries.get(key)
+        age = time.time() - entry["created_at"] if entry else None
+
+        if entry is not None and age < self.ttl:
+            self._counters["hits"] += 1
+            return self._serve(key, entry)
+
+        if entry is not None and age < self.max_stale:
+            self._counters["stale_hits"] += 1
+            self.schedule_refresh(topic, learning_objectives, compute)
+            return self._serve(key, entry)
+
+        self._counters["misses"] += 1
+        result = await self._single_flight.do(key, lambda: self._compute_and_store(key, topic, learning_objectives, compute))
+        return copy.deepcopy(result)
+
+    def get_fresh(self, topic: str, learning_objectives: str) -> Optional[dict]:
+        """Return a copy of the entry if it is still fresh, without computing anything."""
+        key = self.make_key(topic, learning_objectives)
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry["created_at"] >= self.ttl:
+            self._counters["misses"] += 1
+            return None
+        self._counters["hits"] += 1
+        return self._serve(key, entry)
+
+    def store(self, topic: str, learning_objectives: str, value: dict):
+        """Cache research computed outside get_or_compute (e.g. by a batch run)."""
+        self._store(self.make_key(topic, learning_objectives), topic, learning_objectives, value)
+
+    def schedule_refresh(self, topic: str, learning_objectives: str, compute: Callable[[], Awaitable[dict]]) -> bool:
+        """Recompute an entry in the background. Returns False if one is already running."""
+        key = self.make_key(topic, learning_objectives)
+        if key in self._refreshing:
+            return False
+
+        async def refresh():
+            try:
+                await self._single_flight.do(key, lambda: self._compute_and_store(key, topic, learning_objectives, compute))
+                self._counters["refreshes"] += 1
+            except Exception as e:
+                self._counters["refresh_failures"] += 1
+                self.logger.error(f"Background research refresh failed for '{topic}': {str(e)}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+        return True
+
+    def invalidate(self, topic: Optional[str] = None, learning_objectives: Optional[str] = None) -> int:
+        """Drop one entry, every entry for a topic, or (with no topic) everything."""
+        if topic is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+
+        normalised_topic = self.make_key(topic, "")[0]
+        if learning_objectives is not None:
+            keys = [self.make_key(topic, learning_objectives)]
+        else:
+            keys = [key for key in self._entries if key[0] == normalised_topic]
+
+        removed = 0
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    def entries(self) -> list:
+        now = time.time()
+        return [
+            {
+                "topic": entry["topic"],
+                "learning_objectives": entry["learning_objectives"],
+                "age": now - entry["created_at"],
+                "stale": now - entry["created_at"] >= self.ttl,
+                "hits": entry["hits"],
+                "items": len(entry["value"].get("structured_data", [])),
+                "refreshing": key in self._refreshing,
+            }
+            for key, entry in self._entries.items()
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "max_stale": self.max_stale,
+            "refreshing": len(self._refreshing),
+            **self._counters,
+        }
+
+    async def close(self):
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _serve(self, key, entry):
+        entry["hits"] += 1
+        self._entries.move_to_end(key)
+        # Callers annotate and slice the research data, so never hand out the cached copy
+        return copy.deepcopy(entry["value"])
+
+    async def _compute_and_store(self, key, topic, learning_objectives, compute):
+        value = await compute()
+        self._store(key, topic, learning_objectives, value)
+        return value
+
+    def _store(self, key, topic, learning_objectives, value):
+        # Failed research comes back without any structured data; don't pin that in the cache
+        if value.get("structured_data"):
+            self._entries[key] = {
+                "topic": topic,
+                "learning_objectives": learning_objectives,
+                "value": value,
+                "created_at": time.time(),
+                "hits": 0,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
@@ -1,32 +1,188 @@
 from src.data.sources.web_source import WebSource
 from src.data.sources.video_source import VideoSource
 from src.data.sources.academic_source import AcademicSource
-from src.services.llm_service import LLMService
+from src.services.llm_service import LLMService, LLM_ERROR_MESSAGES
+from src.services.context_packer import ContextPacker
+from src.services.rate_limiter import PRIORITY_BULK
+from src.services.llm_router import TASK_QUERY_GENERATION, TASK_SYNTHESIS
+from src.services.metrics import track_stage, record_stage_error, RESEARCH_CORPUS_QUERIES
+from src.data.research_corpus import create_research_corpus
+from src.core.research_cache import ResearchCache
+from src.core.relevance_ranker import RelevanceRanker
+import os
+import re
+import asyncio
 import logging
+from typing import List, Tuple
 
 class ResearchEngine:
-    def __init__(self, llm_service):
-        self.web_source = WebSource()
-        self.video_source = VideoSource()
-        self.academic_source = AcademicSource()
+    def __init__(self, llm_service, http_client=None, research_cache=None, research_corpus=None):
+        self.web_source = WebSource(http_client)
+        self.video_source = VideoSource(http_client)
+        self.academic_source = AcademicSource(http_client)
         self.llm_service = llm_service
         self.logger = logging.getLogger(__name__)
 
-    async def research_topic(self, topic, learning_objectives):
+        if research_cache is None and os.getenv("RESEARCH_CACHE_ENABLED", "true").lower() == "true":
+            research_cache = ResearchCache()
+        self.cache = research_cache
+
+        # Local corpus of everything fetched before, searched ahead of the
+        # sources; they are only called when local recall is below
+        # RESEARCH_CORPUS_MIN_RECALL, and never in offline mode
+        self.corpus = research_corpus if research_corpus is not None else create_research_corpus()
+        self.offline = os.getenv("RESEARCH_OFFLINE", "false").lower() == "true"
+        self.corpus_min_recall = float(os.getenv("RESEARCH_CORPUS_MIN_RECALL", "0.8"))
+        self.corpus_min_results = int(os.getenv("RESEARCH_CORPUS_MIN_RESULTS", "2"))
+
+        enabled = os.getenv("RESEARCH_RANKING_ENABLED", "true").lower() == "true"
+        self.ranker = RelevanceRanker() if enabled else None
+
+        # Synthesis: "single" prompt, "map_reduce" over token-bounded chunks, or
+        # "auto" to use map-reduce only when a single prompt would not fit the
+        # window of the model synthesis calls are routed to
+        self.packer = ContextPacker(llm_service.router.route(TASK_SYNTHESIS).model)
+        self.synthesis_mode = os.getenv("RESEARCH_SYNTHESIS_MODE", "auto").lower()
+        self.synthesis_chunk_tokens = int(os.getenv("RESEARCH_SYNTHESIS_CHUNK_TOKENS", "2500"))
+        self.synthesis_summary_tokens = int(os.getenv("RESEARCH_SYNTHESIS_SUMMARY_TOKENS", "300"))
+        self.synthesis_concurrency = int(os.getenv("RESEARCH_SYNTHESIS_CONCURRENCY", "4"))
+
+        # Batch research searches the sources in chunks of unique queries
+        self.batch_query_chunk = int(os.getenv("RESEARCH_BATCH_QUERY_CHUNK", "20"))
+        self.batch_fetch_concurrency = int(os.getenv("RESEARCH_BATCH_FETCH_CONCURRENCY", "4"))
+
+    async def research_topic(self, topic, learning_objectives, use_cache=True):
         """Conducts comprehensive research on a given topic."""
+        if self.cache is None or not use_cache:
+            return await self._research_topic(topic, learning_objectives)
+
+        return await self.cache.get_or_compute(
+            topic,
+            learning_objectives,
+            lambda: self._research_topic(topic, learning_objectives)
+        )
+
+    def refresh_topic(self, topic, learning_objectives):
+        """Recompute a topic's cached research in the background."""
+        if self.cache is None:
+            return False
+        return self.cache.schedule_refresh(
+            topic,
+            learning_objectives,
+            lambda: self._research_topic(topic, learning_objectives)
+        )
+
+    async def research_topics(self, topics: List[Tuple[str, str]], use_cache=True):
+        """
+        Research many (topic, learning_objectives) pairs as one batch, yielding
+        (index, result) as each topic finishes.
+
+        Topics with a fresh cache entry are served straight from the cache. For
+        the rest, queries are generated for every topic up front and the
+        sources are searched once per unique query, in chunks, so overlapping
+        topics share their lookups. Each topic is ranked and synthesised as
+        soon as the chunks holding its queries are in.
+        """
+        cache = self.cache if use_cache else None
+        pending = []
+        for index, (topic, learning_objectives) in enumerate(topics):
+            cached = cache.get_fresh(topic, learning_objectives) if cache is not None else None
+            if cached is not None:
+                yield index, cached
+            else:
+                pending.append((index, topic, learning_objectives))
+        if not pending:
+            return
+
+        query_lists = await asyncio.gather(*(
+            self._generate_research_queries(topic, learning_objectives)
+            for _, topic, learning_objectives in pending
+        ))
+
+        # Assign each unique query to a chunk, in topic order, and remember
+        # which chunks every topic depends on. Queries differing only in
+        # numbering, case or spacing are fetched once, as the first spelling seen.
+        chunks = [[]]
+        chunk_of = {}
+        canonical = {}
+        for queries in query_lists:
+            for query in queries:
+                key = self._query_key(query)
+                if key in canonical:
+                    continue
+                if len(chunks[-1]) >= self.batch_query_chunk:
+                    chunks.append([])
+                chunks[-1].append(query)
+                canonical[key] = query
+                chunk_of[query] = len(chunks) - 1
+        query_lists = [[canonical[self._query_key(query)] for query in queries] for queries in query_lists]
+
+        total = sum(len(queries) for queries in query_lists)
+        self.logger.info(
+            f"Batch research for {len(pending)} topics: {total} queries, "
+            f"{len(chunk_of)} unique in {len(chunks)} chunks"
+        )
+
+        semaphore = asyncio.Semaphore(self.batch_fetch_concurrency)
+
+        async def fetch(chunk):
+            async with semaphore:
+                combined = await self._gather_sources(chunk)
+            # Index each source's results by the query that produced them
+            by_query = {}
+            for key, data in combined.items():
+                for item in data:
+                    by_query.setdefault(key, {}).setdefault(item.get("query"), []).append(item)
+            return by_query
+
+        fetches = [asyncio.create_task(fetch(chunk)) for chunk in chunks if chunk]
+
+        async def finish(index, topic, learning_objectives, queries):
+            try:
+                fetched = await asyncio.gather(*(fetches[i] for i in sorted({chunk_of[q] for q in queries})))
+                combined = self._combine_research_data(*(
+                    [dict(item) for query in dict.fromkeys(queries) for results in fetched
+                     for item in results.get(key, {}).get(query, [])]
+                    for key in ("web_data", "video_data", "academic_data")
+                ))
+                with track_stage("research", "ranking"):
+                    combined = self._rank_research_data(combined, topic, learning_objectives)
+                with track_stage("research", "synthesis"):
+                    result = await self._synthesize_research(combined, topic, learning_objectives)
+            except Exception as e:
+                self.logger.error(f"Batch research failed for '{topic}': {str(e)}")
+                result = {
+                    "synthesized_content": "Research synthesis could not be completed due to technical limitations.",
+                    "structured_data": []
+                }
+            if cache is not None:
+                cache.store(topic, learning_objectives, result)
+            return index, result
+
+        tasks = [
+            asyncio.create_task(finish(index, topic, learning_objectives, queries))
+            for (index, topic, learning_objectives), queries in zip(pending, query_lists)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks + fetches:
+                task.cancel()
+
+    async def _research_topic(self, topic, learning_objectives):
+        """Runs the research pipeline without consulting the cache."""
         self.logger.info(f"Starting research on topic: {topic}")
         
         # Create research queries based on topic and objectives
         research_queries = await self._generate_research_queries(topic, learning_objectives)  # Await the call
         
-        # Gather information from different sources
-        web_data = await self.web_source.gather_information(research_queries)
-        video_data = await self.video_source.gather_information(research_queries)
-        academic_data = await self.academic_source.gather_information(research_queries)
-        
-        # Combine and synthesize the research data
-        combined_data = self._combine_research_data(web_data, video_data, academic_data)
-        synthesized_research = await self._synthesize_research(combined_data, topic, learning_objectives)  # Await the synthesis
+        # Gather information from all sources and synthesize it
+        combined_data = await self._gather_sources(research_queries)
+        with track_stage("research", "ranking"):
+            combined_data = self._rank_research_data(combined_data, topic, learning_objectives)
+        with track_stage("research", "synthesis"):
+            synthesized_research = await self._synthesize_research(combined_data, topic, learning_objectives)  # Await the synthesis
         
         return synthesized_research
     
@@ -40,12 +196,74 @@ class ResearchEngine:
         """
         
         # Await the LLM service to get the generated queries
-        queries = await self.llm_service.generate_content(prompt)  # Await the LLM response
+        with track_stage("research", "query_generation"):
+            queries = await self.llm_service.generate_content(prompt, priority=PRIORITY_BULK, task=TASK_QUERY_GENERATION)  # Await the LLM response
         return self._parse_queries(queries)
     
+    async def _gather_sources(self, queries):
+        """Gather from all sources concurrently and combine the results."""
+        web_data, video_data, academic_data = await asyncio.gather(
+            self._gather_from_source(self.web_source, queries),
+            self._gather_from_source(self.video_source, queries),
+            self._gather_from_source(self.academic_source, queries)
+        )
+        return self._combine_research_data(web_data, video_data, academic_data)
+
+    async def _gather_from_source(self, source, queries):
+        """Gather from a single source, degrading to no results if it fails."""
+        try:
+            with track_stage("research", f"source_{source.name}"):
+                if self.corpus is None:
+                    return [] if self.offline else await source.gather_information(queries)
+                return await self._gather_with_corpus(source, queries)
+        except Exception as e:
+            self.logger.error(f"{source.__class__.__name__} failed: {str(e)}")
+            return []
+
+    async def _gather_with_corpus(self, source, queries):
+        """
+        Search the local corpus first. A query is covered when it has at least
+        corpus_min_results good local matches; if the share of covered queries
+        is below corpus_min_recall, the uncovered ones go to the source and
+        its results are added to the corpus.
+        """
+        try:
+            local = await self.corpus.search_many(queries, source.name)
+        except Exception as e:
+            self.logger.error(f"Research corpus search failed: {str(e)}")
+            local = {}
+
+        results, missing = [], []
+        for query in queries:
+            hits = local.get(query, [])
+            results.extend(hits)
+            if sum(self.corpus.matches(item, query) for item in hits) < self.corpus_min_results:
+                missing.append(query)
+
+        recall = 1 - len(missing) / len(queries) if queries else 1.0
+        if self.offline or recall >= self.corpus_min_recall:
+            RESEARCH_CORPUS_QUERIES.inc(len(queries), source=source.name, served_from="corpus")
+            self.logger.info(f"{source.name}: {len(queries)} queries served from the local corpus (recall {recall:.0%})")
+            return results
+
+        RESEARCH_CORPUS_QUERIES.inc(len(queries) - len(missing), source=source.name, served_from="corpus")
+        RESEARCH_CORPUS_QUERIES.inc(len(missing), source=source.name, served_from="source")
+        fetched = await source.gather_information(missing)
+        try:
+            await self.corpus.add(fetched)
+        except Exception as e:
+            self.logger.error(f"Could not add {source.name} results to the research corpus: {str(e)}")
+        return results + fetched
+    
     def _parse_queries(self, queries_text):
         """Parse the generated queries into a list."""
         return [q.strip() for q in queries_text.split('\n') if q.strip()]
+
+    @staticmethod
+    def _query_key(query) -> str:
+        """Dedupe key for a generated query: without list numbering or bullets, case-folded, spaces collapsed."""
+        query = re.sub(r"^\s*(?:\d+[.)]|[-*\u2022])\s*", "", str(query))
+        return " ".join(query.casefold().split())
     
     def _combine_research_data(self, web_data, video_data, academic_data):
         """Combine research data from different sources."""
@@ -55,6 +273,21 @@ class ResearchEngine:
             "academic_data": academic_data
         }
     
+    def _rank_research_data(self, combined_data, topic, learning_objectives):
+        """Order each source's items by relevance and drop near-duplicates across all sources."""
+        if self.ranker is None:
+            return combined_data
+
+        # Rank all sources in one batch so duplicates across sources are caught too
+        items = []
+        for key, data in combined_data.items():
+            items.extend({**item, "_source_key": key} for item in data if isinstance(item, dict))
+
+        ranked = {key: [item for item in data if not isinstance(item, dict)] for key, data in combined_data.items()}
+        for item in self.ranker.rank(items, topic, learning_objectives):
+            ranked[item.pop("_source_key")].append(item)
+        return ranked
+    
     async def _synthesize_research(self, combined_data, topic, learning_objectives):
         """Synthesize the research data into a coherent form."""
         try:
@@ -70,8 +303,12 @@ class ResearchEngine:
             identifies patterns across sources, and addresses the learning objectives.
             """
             
-            # Await the LLM service to get the synthesized content
-            synthesized_content = await self.llm_service.generate_content(prompt)  # Await the content synthesis
+            fits = self.packer.counter.count(prompt) + self.synthesis_summary_tokens <= self.packer.context_window
+            if self.synthesis_mode == "map_reduce" or (self.synthesis_mode == "auto" and not fits):
+                synthesized_content = await self._map_reduce_synthesis(combined_data, topic, learning_objectives)
+            else:
+                # Await the LLM service to get the synthesized content
+                synthesized_content = await self.llm_service.generate_content(prompt, priority=PRIORITY_BULK, task=TASK_SYNTHESIS)  # Await the content synthesis
             
             # Return a structured format compatible with CitationService
             structured_data = []
@@ -122,8 +359,85 @@ class ResearchEngine:
             }
         except Exception as e:
             self.logger.error(f"Error in synthesis: {str(e)}")
+            record_stage_error("research", "synthesis")
             # If synthesis fails, return minimal structured data
             return {
                 "synthesized_content": "Research synthesis could not be completed due to technical limitations.",
                 "structured_data": []
             }
+
+    async def _map_reduce_synthesis(self, combined_data, topic, learning_objectives):
+        """
+        Summarise token-bounded chunks of research items concurrently (map),
+        then merge the partial summaries (reduce), recursively if they do not
+        fit in a single reduce prompt.
+        """
+        items = [item for data in combined_data.values() for item in data if isinstance(item, dict)]
+        texts = [
+            f"[{item.get('source_type', 'source')}] {item.get('title', '')}\n{item.get('content', '')}"
+            for item in items
+        ]
+        chunks = self._chunk_texts(texts, self.synthesis_chunk_tokens)
+        self.logger.info(f"Map-reduce synthesis over {len(items)} items in {len(chunks)} chunks")
+
+        semaphore = asyncio.Semaphore(self.synthesis_concurrency)
+
+        async def summarise(chunk):
+            prompt = f"""
+            Summarise the key information in these research excerpts about the topic: '{topic}'
+            as it relates to these learning objectives: '{learning_objectives}'.
+            Keep concrete facts, definitions and examples, and note which sources agree or differ.
+
+            {chunk}
+            """
+            async with semaphore:
+                return await self.llm_service.generate_content(prompt, self.synthesis_summary_tokens, priority=PRIORITY_BULK, task=TASK_SYNTHESIS)
+
+        summaries = await asyncio.gather(*(summarise(chunk) for chunk in chunks))
+        return await self._reduce_summaries(list(summaries), topic, learning_objectives, semaphore)
+
+    async def _reduce_summaries(self, summaries, topic, learning_objectives, semaphore):
+        """Merge partial summaries into one synthesis."""
+        # Drop chunks whose summary failed rather than feeding error text forward
+        summaries = [s for s in summaries if s and s not in LLM_ERROR_MESSAGES]
+        if not summaries:
+            return "Research synthesis could not be completed due to technical limitations."
+
+        groups = self._chunk_texts(summaries, self.synthesis_chunk_tokens)
+
+        async def reduce(group):
+            prompt = f"""
+            Merge these partial research summaries into one coherent synthesis that addresses
+            the topic: '{topic}' and these learning objectives: '{learning_objectives}'.
+            Highlight key information, identify patterns across sources and remove repetition.
+
+            {group}
+            """
+            async with semaphore:
+                return await self.llm_service.generate_content(prompt, self.synthesis_summary_tokens, priority=PRIORITY_BULK, task=TASK_SYNTHESIS)
+
+        # A group that no longer shrinks the input is reduced as-is to guarantee termination
+        if len(groups) == 1 or len(groups) >= len(summaries):
+            return await reduce(groups[0] if len(groups) == 1 else self.packer.counter.truncate(
+                "\n\n".join(summaries), self.synthesis_chunk_tokens
+            ))
+
+        partials = await asyncio.gather(*(reduce(group) for group in groups))
+        return await self._reduce_summaries(list(partials), topic, learning_objectives, semaphore)
+
+    def _chunk_texts(self, texts, budget):
+        """Group texts into chunks of at most `budget` tokens, truncating any single oversized text."""
+        chunks = []
+        current = []
+        used = 0
+        for text in texts:
+            text = self.packer.counter.truncate(text, budget)
+            tokens = self.packer.counter.count(text)
+            if current and used + tokens > budget:
+                chunks.append("\n\n".join(current))
+                current, used = [], 0
+            current.append(text)
+            used += tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
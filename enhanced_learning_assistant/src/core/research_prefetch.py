@@ -0,0 +1,145 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from src.core.research_cache import ResearchCache
+
+class ResearchPrefetcher:
+    """
+    Starts topic research speculatively when questions are generated, so it
+    runs while the user answers them. Results are kept per session until the
+    report request for that session picks them up, finished or still running.
+
+    At most `max_in_flight` prefetches run at once (further ones are skipped)
+    and at most `max_sessions` are kept, oldest dropped first. Prefetches not
+    picked up within `ttl` seconds are cancelled and dropped by a timer, so
+    they don't outlive their TTL when no further requests arrive.
+    """
+
+    def __init__(self, research_engine, max_in_flight=None, max_sessions=None, ttl=None):
+        self.logger = logging.getLogger(__name__)
+        self.research_engine = research_engine
+        self.enabled = os.getenv("RESEARCH_PREFETCH_ENABLED", "true").lower() == "true"
+        self.max_in_flight = max_in_flight or int(os.getenv("RESEARCH_PREFETCH_MAX_IN_FLIGHT", "16"))
+        self.max_sessions = max_sessions or int(os.getenv("RESEARCH_PREFETCH_MAX_SESSIONS", "64"))
+        self.ttl = ttl or float(os.getenv("RESEARCH_PREFETCH_TTL", "900"))
+        self._sessions = OrderedDict()
+        self._counters = {"started": 0, "skipped": 0, "used": 0, "used_in_flight": 0, "mismatched": 0, "failed": 0, "expired": 0}
+
+    def start(self, session_id: str, topic: str, learning_objectives: str) -> bool:
+        """Start prefetching research for a session. Returns False if skipped."""
+        if not self.enabled:
+            return False
+        self._expire()
+        key = ResearchCache.make_key(topic, learning_objectives)
+
+        previous = self._sessions.get(session_id)
+        if previous is not None:
+            if previous["key"] == key:
+                return True
+            self._discard(session_id)
+
+        if self.in_flight() >= self.max_in_flight:
+            self._counters["skipped"] += 1
+            self.logger.info(f"Skipping research prefetch for '{topic}': {self.max_in_flight} already in flight")
+            return False
+
+        task = asyncio.create_task(self.research_engine.research_topic(topic, learning_objectives), name=f"prefetch-{session_id}")
+        task.add_done_callback(self._log_failure)
+        expiry = asyncio.get_running_loop().call_later(self.ttl, self._expire_session, session_id, task)
+        self._sessions[session_id] = {"key": key, "task": task, "expiry": expiry, "created_at": time.monotonic()}
+        while len(self._sessions) > self.max_sessions:
+            self._discard(next(iter(self._sessions)))
+            self._counters["expired"] += 1
+        self._counters["started"] += 1
+        self.logger.info(f"Prefetching research for '{topic}' (session {session_id})")
+        return True
+
+    async def take(self, session_id: str, topic: str, learning_objectives: str):
+        """
+        Return the session's prefetched research, waiting for it if it is still
+        running, or None if there is none for this topic or it failed.
+        """
+        self._expire()
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return None
+        entry["expiry"].cancel()
+        if entry["key"] != ResearchCache.make_key(topic, learning_objectives):
+            self._counters["mismatched"] += 1
+            entry["task"].cancel()
+            return None
+
+        task = entry["task"]
+        self._counters["used" if task.done() else "used_in_flight"] += 1
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if task.cancelled() or task.exception() is not None:
+            # Failures are logged by _log_failure; the caller researches inline
+            return None
+        return task.result()
+
+    def peek(self, session_id: str):
+        """The session's prefetched research if it has finished successfully, without taking it."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        task = entry["task"]
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+
+    def in_flight(self) -> int:
+        return sum(1 for entry in self._sessions.values() if not entry["task"].done())
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        # Entries are in creation order, so stop at the first one still young enough
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if entry["created_at"] > cutoff:
+                break
+            self._discard(session_id)
+            self._counters["expired"] += 1
+
+    def _expire_session(self, session_id: str, task: asyncio.Task):
+        entry = self._sessions.get(session_id)
+        # The session may have been taken or restarted with a new prefetch since
+        if entry is not None and entry["task"] is task:
+            self._discard(session_id)
+            self._counters["expired"] += 1
+
+    def _discard(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            entry["expiry"].cancel()
+            entry["task"].cancel()
+
+    def _log_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self._counters["failed"] += 1
+            self.logger.warning(f"Research prefetch failed: {task.exception()}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sessions": len(self._sessions),
+            "in_flight": self.in_flight(),
+            "max_in_flight": self.max_in_flight,
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+            **self._counters,
+        }
+
+    async def close(self):
+        entries = list(self._sessions.values())
+        self._sessions.clear()
+        for entry in entries:
+            entry["expiry"].cancel()
+            entry["task"].cancel()
+        tasks = [entry["task"] for entry in entries]
+        await asyncio.gather(*tasks, return_exceptions=True)
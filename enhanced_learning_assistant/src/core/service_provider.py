@@ -0,0 +1,245 @@
+import time
+import asyncio
+import threading
+import logging
+import importlib
+
+# Modules behind the components; importing them (openai in particular) is
+# most of the app's start-up cost, so warm-up does it off the event loop
+COMPONENT_MODULES = (
+    "src.services.llm_service",
+    "src.services.citation_service",
+    "src.services.http_client",
+    "src.core.research_engine",
+    "src.core.research_prefetch",
+    "src.core.interactive_questioner",
+    "src.core.report_generator",
+    "src.data.report_store",
+    "src.data.session_store",
+    "src.data.research_corpus",
+)
+
+class ServiceProvider:
+    """
+    Builds the app's components on first use instead of at import time, so
+    importing main is cheap and a missing GROQ_API_KEY doesn't stop the app
+    from starting (it shows up in /api/ready and in failed requests instead).
+
+    warm_up() builds everything in the background once the app has started;
+    requests that arrive earlier build what they need themselves.
+    """
+
+    def __init__(self, report_job_handler, report_job_stages):
+        self.logger = logging.getLogger(__name__)
+        self._report_job_handler = report_job_handler
+        self._report_job_stages = report_job_stages
+        self._components = {}
+        # Sync endpoints run in the threadpool, so building can race the event loop;
+        # reentrant because components build their dependencies
+        self._lock = threading.RLock()
+        self._env_loaded = False
+        self._warm_up_task = None
+        self._warm_up_started = None
+        self._warm_up_elapsed = None
+        self._steps = {}
+
+    def load_env(self):
+        """Load .env into the environment once, before any component reads its settings."""
+        if not self._env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            self._env_loaded = True
+
+    def get(self, name: str):
+        """Return a component if it has been built, without building it."""
+        return self._components.get(name)
+
+    def _provide(self, name: str, build):
+        component = self._components.get(name)
+        if component is None:
+            with self._lock:
+                component = self._components.get(name)
+                if component is None:
+                    self.load_env()
+                    component = self._components[name] = build()
+        return component
+
+    @property
+    def llm_service(self):
+        def build():
+            from src.services.llm_service import LLMService
+            return LLMService()
+        return self._provide("llm_service", build)
+
+    @property
+    def citation_service(self):
+        def build():
+            from src.services.citation_service import CitationService
+            return CitationService()
+        return self._provide("citation_service", build)
+
+    @property
+    def http_client(self):
+        def build():
+            from src.services.http_client import HTTPClientManager
+            return HTTPClientManager()
+        return self._provide("http_client", build)
+
+    @property
+    def research_engine(self):
+        def build():
+            from src.core.research_engine import ResearchEngine
+            return ResearchEngine(self.llm_service, self.http_client)
+        return self._provide("research_engine", build)
+
+    @property
+    def research_prefetcher(self):
+        def build():
+            from src.core.research_prefetch import ResearchPrefetcher
+            return ResearchPrefetcher(self.research_engine)
+        return self._provide("research_prefetcher", build)
+
+    @property
+    def interactive_questioner(self):
+        def build():
+            from src.core.interactive_questioner import InteractiveQuestioner
+            return InteractiveQuestioner(self.llm_service)
+        return self._provide("interactive_questioner", build)
+
+    @property
+    def report_generator(self):
+        def build():
+            from src.core.report_generator import ReportGenerator
+            return ReportGenerator(self.llm_service, self.citation_service)
+        return self._provide("report_generator", build)
+
+    @property
+    def report_store(self):
+        def build():
+            from src.data.report_store import create_report_store
+            return create_report_store()
+        return self._provide("report_store", build)
+
+    @property
+    def session_store(self):
+        def build():
+            from src.data.session_store import create_session_store
+            return create_session_store()
+        return self._provide("session_store", build)
+
+    @property
+    def report_jobs(self):
+        def build():
+            from src.core.job_queue import ReportJobQueue
+            return ReportJobQueue(self._report_job_handler, stages=self._report_job_stages)
+        return self._provide("report_jobs", build)
+
+    async def started_report_jobs(self):
+        """The report job queue, with its workers running."""
+        jobs = self.report_jobs
+        await jobs.start()
+        return jobs
+
+    def start_warm_up(self):
+        """Run warm_up() in the background; progress is reported by readiness()."""
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.create_task(self.warm_up(), name="warm-up")
+        return self._warm_up_task
+
+    async def warm_up(self):
+        """
+        Import, build and start every component. A failed step is logged and
+        recorded, and the remaining steps still run.
+        """
+        self._warm_up_started = time.monotonic()
+        steps = [
+            ("settings", lambda: asyncio.to_thread(self.load_env)),
+            ("imports", lambda: asyncio.to_thread(self._import_components)),
+            ("llm_client", lambda: self.llm_service),
+            ("http_pool", lambda: self.http_client.start()),
+            ("report_store", lambda: self.report_store),
+            ("session_store", lambda: self.session_store),
+            ("research_engine", lambda: self.research_engine),
+            ("research_prefetcher", lambda: self.research_prefetcher),
+            ("tokenizer", self._load_tokenizers),
+            ("questioner", lambda: self.interactive_questioner),
+            ("report_generator", lambda: self.report_generator),
+            ("report_jobs", self.started_report_jobs),
+        ]
+        for name, step in steps:
+            started = time.monotonic()
+            self._steps[name] = {"status": "running"}
+            try:
+                result = step()
+                if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+                    await result
+                self._steps[name] = {"status": "done", "seconds": round(time.monotonic() - started, 3)}
+            except Exception as e:
+                self.logger.error(f"Warm-up step '{name}' failed: {e}")
+                self._steps[name] = {"status": "failed", "seconds": round(time.monotonic() - started, 3), "error": str(e)}
+            # Let requests in between steps
+            await asyncio.sleep(0)
+
+        self._warm_up_elapsed = time.monotonic() - self._warm_up_started
+        failed = [name for name, step in self._steps.items() if step["status"] == "failed"]
+        if failed:
+            self.logger.warning(f"Warm-up finished in {self._warm_up_elapsed:.2f}s with failed steps: {', '.join(failed)}")
+        else:
+            self.logger.info(f"Warm-up finished in {self._warm_up_elapsed:.2f}s")
+
+    def _import_components(self):
+        for module in COMPONENT_MODULES:
+            importlib.import_module(module)
+
+    async def _load_tokenizers(self):
+        # Only the token counters that have been built; whichever loads first
+        # warms tiktoken's encoding cache for the rest
+        for name in ("research_engine", "report_generator"):
+            component = self.get(name)
+            packer = getattr(component, "packer", None)
+            if packer is not None:
+                await asyncio.to_thread(packer.counter.load)
+
+    @property
+    def ready(self) -> bool:
+        return (
+            self._warm_up_elapsed is not None
+            and all(step["status"] == "done" for step in self._steps.values())
+        )
+
+    def readiness(self) -> dict:
+        """Whether warm-up has finished successfully, with per-step status and timings."""
+        if self._warm_up_started is None:
+            elapsed = None
+        else:
+            elapsed = self._warm_up_elapsed if self._warm_up_elapsed is not None else time.monotonic() - self._warm_up_started
+        return {
+            "ready": self.ready,
+            "warm_up_finished": self._warm_up_elapsed is not None,
+            "elapsed": round(elapsed, 3) if elapsed is not None else None,
+            "steps": dict(self._steps),
+        }
+
+    async def close(self):
+        """Stop and close whichever components were built."""
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+            await asyncio.gather(self._warm_up_task, return_exceptions=True)
+
+        if self.get("report_jobs") is not None:
+            await self.get("report_jobs").stop()
+        if self.get("research_prefetcher") is not None:
+            await self.get("research_prefetcher").close()
+        research_engine = self.get("research_engine")
+        if research_engine is not None and research_engine.cache is not None:
+            await research_engine.cache.close()
+        if research_engine is not None and research_engine.corpus is not None:
+            await research_engine.corpus.close()
+        if research_engine is not None and research_engine.academic_source.response_cache is not None:
+            research_engine.academic_source.response_cache.close()
+        if self.get("http_client") is not None:
+            await self.get("http_client").close()
+        if self.get("report_store") is not None:
+            await self.get("report_store").close()
+        if self.get("session_store") is not None:
+            await self.get("session_store").close()
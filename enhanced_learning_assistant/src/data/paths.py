@@ -0,0 +1,20 @@
+import os
+
+# enhanced_learning_assistant/, whatever directory the server was started from
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def data_dir() -> str:
+    """DATA_DIR (default "data"), resolved against the package root when relative."""
+    return os.path.join(PACKAGE_ROOT, os.getenv("DATA_DIR", "data"))
+
+def data_path(env_name: str, filename: str = None) -> str:
+    """
+    The database path configured by `env_name`, or `filename` in the data
+    directory when unset. Relative paths are resolved against the package
+    root rather than the working directory; an empty value (or no default)
+    is returned as "" so callers can treat it as disabled.
+    """
+    path = os.getenv(env_name)
+    if path is None:
+        return os.path.join(data_dir(), filename) if filename else ""
+    return os.path.join(PACKAGE_ROOT, path) if path else ""
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from src.data.paths import data_path
+
+class ReportStore(ABC):
+    """Storage interface for generated reports and their research data."""
+
+    @abstractmethod
+    async def get(self, report_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def put(self, report_id: str, report: dict):
+        ...
+
+    @abstractmethod
+    async def update(self, report_id: str, **fields) -> Optional[dict]:
+        """Merge `fields` into a stored report and return the updated report."""
+
+    @abstractmethod
+    async def delete(self, report_id: str):
+        ...
+
+    @abstractmethod
+    async def stats(self) -> dict:
+        ...
+
+    async def close(self):
+        pass
+
+class SQLiteReportStore(ReportStore):
+    """
+    Reports stored as JSON rows in a local SQLite database. The database runs
+    in WAL mode so several uvicorn workers can share the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reports "
+            "(id TEXT PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.logger.info(f"Report store opened at {path}")
+
+    async def get(self, report_id):
+        row = await asyncio.to_thread(self._fetch, "SELECT data, version FROM reports WHERE id = ?", report_id)
+        if row is None:
+            return None
+        report = json.loads(row[0])
+        report["_version"] = row[1]
+        return report
+
+    async def get_version(self, report_id) -> Optional[int]:
+        row = await asyncio.to_thread(self._fetch, "SELECT version FROM reports WHERE id = ?", report_id)
+        return row[0] if row else None
+
+    async def put(self, report_id, report):
+        data = self._dumps(report)
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO reports (id, data, version, updated_at) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data, version = version + 1, updated_at = excluded.updated_at",
+            (report_id, data, time.time())
+        )
+
+    async def update(self, report_id, **fields):
+        return await asyncio.to_thread(self._update, report_id, fields)
+
+    async def delete(self, report_id):
+        await asyncio.to_thread(self._execute, "DELETE FROM reports WHERE id = ?", (report_id,))
+
+    async def close(self):
+        with self._lock:
+            self._db.close()
+
+    async def stats(self):
+        count = await asyncio.to_thread(self._count)
+        return {"backend": "sqlite", "path": self.path, "reports": count}
+
+    @staticmethod
+    def _dumps(report):
+        return json.dumps({k: v for k, v in report.items() if k != "_version"}, default=str)
+
+    def _fetch(self, sql, report_id):
+        with self._lock:
+            return self._db.execute(sql, (report_id,)).fetchone()
+
+    def _execute(self, sql, params):
+        with self._lock:
+            self._db.execute(sql, params)
+
+    def _count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def _update(self, report_id, fields):
+        # Read-modify-write inside one write transaction so concurrent workers
+        # cannot interleave their updates
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT data, version FROM reports WHERE id = ?", (report_id,)).fetchone()
+                if row is None:
+                    self._db.execute("ROLLBACK")
+                    return None
+                report = json.loads(row[0])
+                report.update(fields)
+                self._db.execute(
+                    "UPDATE reports SET data = ?, version = ?, updated_at = ? WHERE id = ?",
+                    (self._dumps(report), row[1] + 1, time.time(), report_id)
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        report["_version"] = row[1] + 1
+        return report
+
+class CachedReportStore(ReportStore):
+    """
+    Bounded in-memory LRU hot tier in front of a persistent store.
+
+    Hot entries are revalidated against the backend's version number on every
+    read, so a report modified by another worker is never served stale, while
+    the (potentially large) report body is only loaded when it has changed.
+    """
+
+    def __init__(self, backend: SQLiteReportStore, max_entries=None):
+        self.backend = backend
+        self.max_entries = max_entries or int(os.getenv("REPORT_STORE_HOT_SIZE", "128"))
+        self._hot = OrderedDict()
+        self._counters = {"hot_hits": 0, "hot_misses": 0, "evictions": 0}
+
+    async def get(self, report_id):
+        report = self._hot.get(report_id)
+        version = await self.backend.get_version(report_id)
+        if version is None:
+            self._hot.pop(report_id, None)
+            return None
+
+        if report is not None and report["_version"] == version:
+            self._hot.move_to_end(report_id)
+            self._counters["hot_hits"] += 1
+            return dict(report)
+
+        self._counters["hot_misses"] += 1
+        report = await self.backend.get(report_id)
+        if report is not None:
+            self._remember(report_id, report)
+            return dict(report)
+        return None
+
+    async def put(self, report_id, report):
+        await self.backend.put(report_id, report)
+        # Let the next read load the stored version rather than guessing it
+        self._hot.pop(report_id, None)
+
+    async def update(self, report_id, **fields):
+        report = await self.backend.update(report_id, **fields)
+        if report is None:
+            self._hot.pop(report_id, None)
+            return None
+        self._remember(report_id, report)
+        return dict(report)
+
+    async def delete(self, report_id):
+        self._hot.pop(report_id, None)
+        await self.backend.delete(report_id)
+
+    async def close(self):
+        self._hot.clear()
+        await self.backend.close()
+
+    async def stats(self):
+        return {
+            **await self.backend.stats(),
+            "hot_entries": len(self._hot),
+            "hot_max_entries": self.max_entries,
+            **self._counters,
+        }
+
+    def _remember(self, report_id, report):
+        self._hot[report_id] = report
+        self._hot.move_to_end(report_id)
+        while len(self._hot) > self.max_entries:
+            self._hot.popitem(last=False)
+            self._counters["evictions"] += 1
+
+def create_report_store() -> ReportStore:
+    """Build the report store configured by REPORT_STORE_PATH."""
+    return CachedReportStore(SQLiteReportStore(data_path("REPORT_STORE_PATH", "reports.db")))
@@ -0,0 +1,151 @@
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from src.data.sources.academic_source import STOPWORDS
+from src.services.citation_registry import citation_registry
+from src.data.paths import data_path
+
+class ResearchCorpus:
+    """
+    Persistent local corpus of every research item fetched from the sources,
+    searchable through a SQLite FTS5 index over titles and content.
+
+    Items are keyed like citations (DOI, canonical URL), so a source found
+    again replaces its earlier copy. Searches return the best bm25 matches of
+    one source type; an item counts towards recall when it contains at least
+    `min_match` of the query's terms. The oldest items are pruned beyond
+    `max_items`.
+    """
+
+    def __init__(self, path: str, max_items=None, results_per_query=None, min_match=None):
+        self.path = path
+        self.max_items = max_items or int(os.getenv("RESEARCH_CORPUS_MAX_ITEMS", "50000"))
+        self.results_per_query = results_per_query or int(os.getenv("RESEARCH_CORPUS_RESULTS_PER_QUERY", "5"))
+        self.min_match = min_match or float(os.getenv("RESEARCH_CORPUS_MIN_MATCH", "0.6"))
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._counters = {"searches": 0, "added": 0, "pruned": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items "
+            "(id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, source_type TEXT NOT NULL, data TEXT NOT NULL, added_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS items_added_at ON items (added_at)")
+        # Row ids match items.id; porter stemming so "learners" finds "learning"
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(title, content, tokenize='porter unicode61')"
+        )
+        self.logger.info(f"Research corpus opened at {path}")
+
+    @staticmethod
+    def terms(text) -> List[str]:
+        # Drop list numbering ("1. ...") that generated queries come with
+        text = re.sub(r"^\s*\d+[.)]\s*", "", str(text or ""))
+        return list(dict.fromkeys(
+            word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS and len(word) > 1
+        ))
+
+    async def search_many(self, queries: List[str], source_type: str) -> Dict[str, List[dict]]:
+        """Return {query: matching items of `source_type`}, each item tagged with its query."""
+        return await asyncio.to_thread(self._search_many, queries, source_type)
+
+    def matches(self, item: dict, query: str) -> bool:
+        """Whether `item` contains enough of the query's terms to count towards recall."""
+        terms = self.terms(query)
+        if not terms:
+            return False
+        words = set(self.terms(f"{item.get('title', '')} {item.get('content', '')}"))
+        return sum(term in words for term in terms) / len(terms) >= self.min_match
+
+    async def add(self, items: List[dict]):
+        """Index research items, replacing earlier copies of the same source."""
+        items = [item for item in items if isinstance(item, dict) and item.get("source_type")]
+        if items:
+            await asyncio.to_thread(self._add, items)
+
+    async def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT source_type, COUNT(*) FROM items GROUP BY source_type").fetchall()
+        return {
+            "path": self.path,
+            "items": sum(count for _, count in rows),
+            "items_by_source": dict(rows),
+            "max_items": self.max_items,
+            **self._counters,
+        }
+
+    def _search_many(self, queries, source_type):
+        results = {}
+        with self._lock:
+            for query in queries:
+                terms = self.terms(query)
+                if not terms:
+                    results[query] = []
+                    continue
+                match = " OR ".join(f'"{term}"' for term in terms)
+                rows = self._db.execute(
+                    "SELECT items.data FROM items_fts JOIN items ON items.id = items_fts.rowid "
+                    "WHERE items_fts MATCH ? AND items.source_type = ? ORDER BY items_fts.rank LIMIT ?",
+                    (match, source_type, self.results_per_query)
+                ).fetchall()
+                results[query] = [{**json.loads(data), "query": query} for (data,) in rows]
+                self._counters["searches"] += 1
+        return results
+
+    def _add(self, items):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for item in items:
+                    key = citation_registry.key_for(item)
+                    data = json.dumps({k: v for k, v in item.items() if k != "query"}, default=str)
+                    row = self._db.execute("SELECT id FROM items WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        item_id = self._db.execute(
+                            "INSERT INTO items (key, source_type, data, added_at) VALUES (?, ?, ?, ?)",
+                            (key, item["source_type"], data, now)
+                        ).lastrowid
+                    else:
+                        item_id = row[0]
+                        self._db.execute("UPDATE items SET data = ?, added_at = ? WHERE id = ?", (data, now, item_id))
+                        self._db.execute("DELETE FROM items_fts WHERE rowid = ?", (item_id,))
+                    self._db.execute(
+                        "INSERT INTO items_fts (rowid, title, content) VALUES (?, ?, ?)",
+                        (item_id, str(item.get("title", "")), str(item.get("content", "")))
+                    )
+                self._prune()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        self._counters["added"] += len(items)
+
+    def _prune(self):
+        excess = self._db.execute("SELECT COUNT(*) FROM items").fetchone()[0] - self.max_items
+        if excess <= 0:
+            return
+        ids = [row[0] for row in self._db.execute("SELECT id FROM items ORDER BY added_at LIMIT ?", (excess,))]
+        self._db.executemany("DELETE FROM items_fts WHERE rowid = ?", [(i,) for i in ids])
+        self._db.executemany("DELETE FROM items WHERE id = ?", [(i,) for i in ids])
+        self._counters["pruned"] += len(ids)
+
+def create_research_corpus() -> Optional[ResearchCorpus]:
+    """Build the corpus configured by RESEARCH_CORPUS_PATH (empty disables it)."""
+    path = data_path("RESEARCH_CORPUS_PATH", "research_corpus.db")
+    return ResearchCorpus(path) if path else None
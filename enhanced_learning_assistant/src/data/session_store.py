@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import zlib
+import asyncio
+import logging
+import sqlite3
+import threading
+from typing import Optional
+from src.data.paths import data_path
+
+class SessionStore:
+    """
+    Interactive sessions (questions, answers, follow-ups and the preference
+    analysis) stored in SQLite, so every uvicorn worker sees the session
+    created by /api/topics. Each session is one zlib-compressed JSON row that
+    expires `ttl` seconds after it was last written.
+    """
+
+    def __init__(self, path: str, ttl=None):
+        self.path = path
+        self.ttl = ttl or float(os.getenv("SESSION_TTL", "3600"))
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._counters = {"created": 0, "hits": 0, "misses": 0, "purged": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions "
+            "(id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+        self._purge()
+        self.logger.info(f"Session store opened at {path}")
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        """Return a live session, or None if it doesn't exist or has expired."""
+        session = await asyncio.to_thread(self._get, session_id)
+        self._counters["hits" if session is not None else "misses"] += 1
+        return session
+
+    async def put(self, session_id: str, session: dict):
+        await asyncio.to_thread(self._put, session_id, session)
+        self._counters["created"] += 1
+
+    async def update(self, session_id: str, **fields) -> Optional[dict]:
+        """Merge `fields` into a live session, extend its expiry and return it."""
+        return await asyncio.to_thread(self._update, session_id, fields)
+
+    async def delete(self, session_id: str):
+        await asyncio.to_thread(self._execute, "DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    async def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions WHERE expires_at > ?", (time.time(),)
+            ).fetchone()
+        return {"path": self.path, "ttl": self.ttl, "sessions": count, "stored_bytes": size, **self._counters}
+
+    @staticmethod
+    def _dumps(session: dict) -> bytes:
+        return zlib.compress(json.dumps(session, separators=(",", ":"), default=str).encode())
+
+    @staticmethod
+    def _loads(data: bytes) -> dict:
+        return json.loads(zlib.decompress(data))
+
+    def _get(self, session_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+        return self._loads(row[0]) if row else None
+
+    def _put(self, session_id, session):
+        self._execute(
+            "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+            (session_id, self._dumps(session), time.time() + self.ttl)
+        )
+        self._maybe_purge()
+
+    def _update(self, session_id, fields):
+        # Read-modify-write in one write transaction, as in the report store
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._db.execute(
+                    "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (session_id, now)
+                ).fetchone()
+                if row is None:
+                    self._db.execute("ROLLBACK")
+                    return None
+                session = self._loads(row[0])
+                session.update(fields)
+                self._db.execute(
+                    "UPDATE sessions SET data = ?, expires_at = ? WHERE id = ?",
+                    (self._dumps(session), now + self.ttl, session_id)
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return session
+
+    def _execute(self, sql, params):
+        with self._lock:
+            self._db.execute(sql, params)
+
+    def _maybe_purge(self):
+        # Expired rows are never served; deleting them now and then keeps the file small
+        if time.time() - self._last_purge > 60:
+            self._purge()
+
+    def _purge(self):
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+        self._last_purge = time.time()
+        if deleted:
+            self._counters["purged"] += deleted
+            self.logger.info(f"Purged {deleted} expired sessions")
+
+def create_session_store() -> SessionStore:
+    """Build the session store configured by SESSION_STORE_PATH."""
+    return SessionStore(data_path("SESSION_STORE_PATH", "sessions.db"))
@@ -1,51 +1,133 @@
-import aiohttp
-import logging
+import os
+import re
 from typing import List
+from src.data.sources.base_source import BaseSource
+from src.services.http_cache import HTTPResponseCache
+from src.data.paths import data_path
 
-class AcademicSource:
-    def __init__(self):
-        self.base_url = "https://api.openalex.org/works"
-        self.logger = logging.getLogger(__name__)
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "their", "to", "what", "which", "with", "why"
+}
+
+class AcademicSource(BaseSource):
+    def __init__(self, http_client=None, **limits):
+        super().__init__("academic", http_client, **limits)
+        # Overridable so benchmarks can point at a local stand-in
+        self.base_url = os.getenv("OPENALEX_BASE_URL", "https://api.openalex.org").rstrip("/") + "/works"
+        # Identifies us to OpenAlex's polite pool when set
+        self.mailto = os.getenv("OPENALEX_MAILTO")
+        # Number of queries merged into one OR search; 1 sends one request per query
+        self.batch_size = max(1, int(os.getenv("OPENALEX_BATCH_SIZE", "1")))
+        # On-disk HTTP cache for OpenAlex responses; set the path empty to disable
+        cache_path = data_path("OPENALEX_CACHE_PATH", "openalex_cache.db")
+        self.response_cache = HTTPResponseCache(cache_path) if cache_path else None
         
     async def gather_information(self, queries: List[str], max_papers=3):
         """Gather information from OpenAlex based on queries."""
+        return await self._coalesce(
+            (tuple(queries), max_papers),
+            lambda: self._gather(queries, max_papers)
+        )
+    
+    async def _gather(self, queries: List[str], max_papers):
+        """Run the searches behind gather_information."""
         self.logger.info(f"Gathering academic information for {len(queries)} queries")
-        all_results = []
 
-        async with aiohttp.ClientSession() as session:
-            for query in queries:
-                try:
-                    paper_results = await self._search_papers(session, query, max_papers)
-                    all_results.extend(paper_results)
-                except Exception as e:
-                    self.logger.error(f"Error searching OpenAlex for '{query}': {str(e)}")
+        async with self.http_client.session_scope() as session:
+            if self.batch_size > 1 and len(queries) > 1:
+                batches = {}
+                for i in range(0, len(queries), self.batch_size):
+                    group = queries[i:i + self.batch_size]
+                    batches[self._batch_search_string(group)] = group
+                all_results = await self._run_queries(
+                    list(batches),
+                    lambda search: self._search_batch(session, search, batches[search], max_papers)
+                )
+            else:
+                all_results = await self._run_queries(
+                    queries,
+                    lambda query: self._search_papers(session, query, max_papers)
+                )
 
         return self._process_results(all_results)
     
     async def _search_papers(self, session, query: str, max_papers: int):
         """Search OpenAlex for academic papers."""
-        url = f"{self.base_url}?search={query}&per_page={max_papers}"
-        async with session.get(url) as response:
-            if response.status != 200:
-                raise Exception(f"OpenAlex API error: {response.status}")
-            data = await response.json()
-            results = []
-
-            for item in data.get("results", []):
-                authors = [a["author"]["display_name"] for a in item.get("authorships", [])]
-                results.append({
-                    "id": item["id"],
-                    "title": item["title"],
-                    "authors": authors,
-                    "journal": item["host_venue"]["display_name"] if item.get("host_venue") else "Unknown Journal",
-                    "year": item["publication_year"],
-                    "doi": item["doi"] or "N/A",
-                    "url": item["id"],
-                    "abstract": item.get("abstract", "Abstract not available."),
-                    "query": query
-                })
-
-            return results
+        works = await self._fetch_works(session, query, max_papers)
+        return [self._parse_work(item, query) for item in works]
+
+    async def _search_batch(self, session, search: str, queries: List[str], max_papers: int):
+        """
+        Search OpenAlex once for several queries joined with OR, then split the
+        hits back per query by term overlap with each work's title and abstract.
+        A query that none of the merged hits match is searched on its own.
+        """
+        works = await self._fetch_works(session, search, min(200, max_papers * len(queries) * 2))
+        work_terms = [self._work_terms(item) for item in works]
+
+        results = []
+        for query in queries:
+            query_terms = self._terms(query)
+            scored = [(len(query_terms & terms), i) for i, terms in enumerate(work_terms)]
+            scored.sort(key=lambda pair: -pair[0])
+            matched = [works[i] for score, i in scored if score > 0][:max_papers]
+
+            if matched:
+                results.extend(self._parse_work(item, query) for item in matched)
+            else:
+                results.extend(await self._search_papers(session, query, max_papers))
+
+        return results
+
+    async def _fetch_works(self, session, search: str, per_page: int):
+        """Fetch one page of OpenAlex works, through the response cache if enabled."""
+        params = {"search": search, "per_page": per_page}
+        if self.mailto:
+            params["mailto"] = self.mailto
+
+        if self.response_cache is not None:
+            status, data = await self.response_cache.get_json(session, self.base_url, params)
+        else:
+            async with session.get(self.base_url, params=params) as response:
+                status = response.status
+                data = await response.json() if status == 200 else None
+
+        if status != 200:
+            raise Exception(f"OpenAlex API error: {status}")
+        return data.get("results", [])
+
+    def _parse_work(self, item, query):
+        authors = [a["author"]["display_name"] for a in item.get("authorships", [])]
+        return {
+            "id": item["id"],
+            "title": item["title"],
+            "authors": authors,
+            "journal": item["host_venue"]["display_name"] if item.get("host_venue") else "Unknown Journal",
+            "year": item["publication_year"],
+            "doi": item["doi"] or "N/A",
+            "url": item["id"],
+            "abstract": item.get("abstract", "Abstract not available."),
+            "query": query
+        }
+
+    def _batch_search_string(self, queries: List[str]) -> str:
+        # Strip characters and operators that would change the boolean query
+        def clean(query):
+            query = re.sub(r'^\s*\d+[.)]\s*', "", query)
+            query = re.sub(r'[()"]', " ", query)
+            query = re.sub(r'\b(AND|OR|NOT)\b', lambda m: m.group(1).lower(), query)
+            return " ".join(query.split())
+        return " OR ".join(f"({clean(query)})" for query in queries)
+
+    @staticmethod
+    def _terms(text) -> set:
+        return {word for word in re.findall(r"[a-z0-9]+", (text or "").lower()) if word not in STOPWORDS and len(word) > 2}
+
+    def _work_terms(self, item) -> set:
+        # OpenAlex ships abstracts as an inverted index; its keys are the words
+        words = " ".join((item.get("abstract_inverted_index") or {}).keys())
+        return self._terms(f"{item.get('title') or ''} {item.get('abstract') or ''} {words}")
 
     def _process_results(self, results):
         """Process and structure academic paper results."""
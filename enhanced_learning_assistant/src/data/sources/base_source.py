@@ -0,0 +1,80 @@
+import os
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+from src.services.http_client import HTTPClientManager
+from src.services.single_flight import SingleFlight
+from src.services.metrics import track_stage
+
+class BaseSource:
+    """Common query fan-out shared by the research data sources."""
+
+    def __init__(self, name: str, http_client: HTTPClientManager = None, max_concurrency=None, query_timeout=None, source_timeout=None):
+        self.name = name
+        self.logger = logging.getLogger(self.__class__.__module__)
+        # Without a shared (started) manager each call gets its own session
+        self.http_client = http_client or HTTPClientManager()
+        self.single_flight = SingleFlight(f"{name}-source")
+
+        # Limits can be tuned per source (e.g. WEB_SOURCE_MAX_CONCURRENCY) or
+        # for all sources at once (SOURCE_MAX_CONCURRENCY).
+        self.max_concurrency = max_concurrency or int(self._setting("MAX_CONCURRENCY", "4"))
+        self.query_timeout = query_timeout or float(self._setting("QUERY_TIMEOUT", "10"))
+        self.source_timeout = source_timeout or float(self._setting("TIMEOUT", "30"))
+
+    def _setting(self, key: str, default: str) -> str:
+        return os.getenv(f"{self.name.upper()}_SOURCE_{key}", os.getenv(f"SOURCE_{key}", default))
+
+    async def _coalesce(self, key, factory: Callable[[], Awaitable[list]]) -> list:
+        """
+        Share one gather between concurrent callers asking for the same thing.
+        Every caller gets its own copy of the item dicts so later stages can
+        annotate them without affecting each other.
+        """
+        results = await self.single_flight.do(key, factory)
+        return [dict(item) for item in results]
+
+    async def _run_queries(self, queries: List[str], search: Callable[[str], Awaitable[list]]) -> list:
+        """
+        Run `search` for every query concurrently, bounded by `max_concurrency`.
+
+        Each query is limited to `query_timeout` seconds and the whole fan-out to
+        `source_timeout` seconds. Queries that fail or time out are logged and
+        skipped, so the caller always gets whatever results did come back.
+        """
+        if not queries:
+            return []
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(query):
+            async with semaphore:
+                try:
+                    with track_stage("source", self.name):
+                        return await asyncio.wait_for(search(query), self.query_timeout)
+                except asyncio.TimeoutError:
+                    self.logger.warning(f"{self.name} search timed out for query '{query}'")
+                except Exception as e:
+                    self.logger.error(f"Error searching {self.name} for query '{query}': {str(e)}")
+                return []
+
+        tasks = [asyncio.create_task(run(query)) for query in queries]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.source_timeout)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if pending:
+            self.logger.warning(
+                f"{self.name} source timed out after {self.source_timeout}s; "
+                f"returning partial results ({len(done)}/{len(tasks)} queries)"
+            )
+
+        # Keep results in query order regardless of completion order
+        results = []
+        for task in tasks:
+            if task in done:
+                results.extend(task.result())
+        return results
@@ -0,0 +1,112 @@
+import os
+import re
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, List, Tuple
+from src.services.single_flight import SingleFlight
+from src.data.sources.academic_source import STOPWORDS
+
+# Sentence ends a segment may be cut after
+SENTENCE_END = re.compile(r"[.!?]\s+")
+
+def _terms(text: str) -> frozenset:
+    return frozenset(word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS and len(word) > 2)
+
+class TranscriptPipeline:
+    """
+    Fetches video transcripts concurrently (at most `max_concurrency` at a
+    time) and splits them into sentence-bounded segments as their chunks
+    stream in, so a full transcript is never held as one string.
+
+    Segments are cached per video id in an LRU bounded by `cache_bytes`, and
+    concurrent requests for the same video share one fetch, so a video found
+    through several queries is fetched and processed once. excerpt() returns
+    only the segments most relevant to a query.
+    """
+
+    def __init__(self, fetch_chunks: Callable[[str], AsyncIterator[str]], max_concurrency=None,
+                 segment_chars=None, max_segments=None, cache_bytes=None):
+        self.logger = logging.getLogger(__name__)
+        self.fetch_chunks = fetch_chunks
+        self.max_concurrency = max_concurrency or int(os.getenv("VIDEO_TRANSCRIPT_CONCURRENCY", "8"))
+        self.segment_chars = segment_chars or int(os.getenv("VIDEO_TRANSCRIPT_SEGMENT_CHARS", "600"))
+        self.max_segments = max_segments or int(os.getenv("VIDEO_TRANSCRIPT_MAX_SEGMENTS", "3"))
+        self.cache_bytes = cache_bytes or int(float(os.getenv("VIDEO_TRANSCRIPT_CACHE_MB", "32")) * 2**20)
+        self._semaphore = None
+        self._single_flight = SingleFlight("transcripts")
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._counters = {"hits": 0, "fetches": 0, "failures": 0, "evictions": 0}
+
+    async def excerpt(self, video_id: str, query: str) -> str:
+        """The transcript segments most relevant to `query`, in transcript order ("" if unavailable)."""
+        try:
+            segments = await self.segments(video_id)
+        except Exception as e:
+            self._counters["failures"] += 1
+            self.logger.error(f"Transcript for video {video_id} failed: {str(e)}")
+            return ""
+        return " … ".join(self.relevant(segments, query))
+
+    async def segments(self, video_id: str) -> List[Tuple[str, frozenset]]:
+        """All (text, terms) segments of a video's transcript, from the cache if possible."""
+        segments = self._cache.get(video_id)
+        if segments is not None:
+            self._counters["hits"] += 1
+            self._cache.move_to_end(video_id)
+            return segments
+        return await self._single_flight.do(video_id, lambda: self._fetch(video_id))
+
+    def relevant(self, segments: List[Tuple[str, frozenset]], query: str) -> List[str]:
+        """Pick up to max_segments segments sharing the most terms with `query`; the opening one if none do."""
+        if not segments:
+            return []
+        terms = _terms(query)
+        scored = [(len(terms & segment_terms), index) for index, (_, segment_terms) in enumerate(segments)]
+        best = sorted((item for item in scored if item[0] > 0), key=lambda item: (-item[0], item[1]))[:self.max_segments]
+        indexes = sorted(index for _, index in best) or [0]
+        return [segments[index][0] for index in indexes]
+
+    def stats(self) -> dict:
+        return {
+            "cached_videos": len(self._cache),
+            "cached_bytes": self._cached_bytes,
+            "cache_bytes": self.cache_bytes,
+            "max_concurrency": self.max_concurrency,
+            **self._counters,
+        }
+
+    async def _fetch(self, video_id):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            self._counters["fetches"] += 1
+            segments = [(text, _terms(text)) async for text in self._segment(self.fetch_chunks(video_id))]
+        self._remember(video_id, segments)
+        return segments
+
+    async def _segment(self, chunks: AsyncIterator[str]):
+        """Yield segments of about segment_chars, cut after a sentence where possible, as chunks arrive."""
+        buffer = ""
+        async for chunk in chunks:
+            buffer += chunk
+            while len(buffer) >= self.segment_chars:
+                window = buffer[:self.segment_chars]
+                ends = [match.end() for match in SENTENCE_END.finditer(window) if match.end() >= self.segment_chars // 2]
+                cut = ends[-1] if ends else (window.rfind(" ") + 1 or self.segment_chars)
+                segment, buffer = buffer[:cut].strip(), buffer[cut:]
+                if segment:
+                    yield segment
+        if buffer.strip():
+            yield buffer.strip()
+
+    def _remember(self, video_id, segments):
+        if video_id in self._cache:
+            return
+        self._cache[video_id] = segments
+        self._cached_bytes += sum(len(text) for text, _ in segments)
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= sum(len(text) for text, _ in evicted)
+            self._counters["evictions"] += 1
@@ -1,37 +1,51 @@
 import os
-import aiohttp
-import logging
+import asyncio
 from typing import List
+from src.data.sources.base_source import BaseSource
+from src.data.sources.transcript_pipeline import TranscriptPipeline
 
-class VideoSource:
-    def __init__(self):
+# Size of the pieces simulated transcripts are streamed in
+TRANSCRIPT_CHUNK_CHARS = 2048
+
+class VideoSource(BaseSource):
+    def __init__(self, http_client=None, **limits):
+        super().__init__("video", http_client, **limits)
         self.api_key = os.getenv("YOUTUBE_API_KEY")
         self.base_url = "https://www.googleapis.com/youtube/v3/search"
-        self.logger = logging.getLogger(__name__)
+        # Shared by all queries, so a video is fetched and segmented once
+        self.transcripts = TranscriptPipeline(self._stream_transcript)
         
     async def gather_information(self, queries: List[str], max_videos=3):
         """Gather information from video sources based on queries."""
+        return await self._coalesce(
+            (tuple(queries), max_videos),
+            lambda: self._gather(queries, max_videos)
+        )
+    
+    async def _gather(self, queries: List[str], max_videos):
+        """Run the searches behind gather_information."""
         self.logger.info(f"Gathering video information for {len(queries)} queries")
         
-        all_results = []
-        
-        async with aiohttp.ClientSession() as session:
-            for query in queries:
-                try:
-                    # For prototype, we'll simulate video search and transcript retrieval
-                    video_results = await self._simulate_video_search(query, max_videos)
-                    
-                    for video in video_results:
-                        # In production, we would fetch actual transcripts
-                        transcript = await self._simulate_transcript_retrieval(video["id"])
-                        video["transcript"] = transcript
-                        all_results.append(video)
-                        
-                except Exception as e:
-                    self.logger.error(f"Error searching for video query '{query}': {str(e)}")
+        # Searches are simulated for now; real ones go through self.http_client.session_scope()
+        all_results = await self._run_queries(
+            queries,
+            lambda query: self._search_with_transcripts(query, max_videos)
+        )
         
         return self._process_results(all_results)
     
+    async def _search_with_transcripts(self, query, max_videos):
+        """Search videos for a single query and attach the transcript excerpts relevant to it."""
+        # For prototype, we'll simulate video search and transcript retrieval
+        video_results = await self._simulate_video_search(query, max_videos)
+
+        # Transcripts are fetched concurrently; only the relevant segments are kept
+        excerpts = await asyncio.gather(*(self.transcripts.excerpt(video["id"], query) for video in video_results))
+        for video, excerpt in zip(video_results, excerpts):
+            video["transcript"] = excerpt
+
+        return video_results
+    
     async def _simulate_video_search(self, query, max_videos):
         """Simulate video search results for prototype purposes."""
         # In production, this would make actual YouTube API calls
@@ -43,13 +57,21 @@ class VideoSource:
                 "id": f"vid{i+1}_{query.replace(' ', '_')}",
                 "title": f"Sample video {i+1} for {query}",
                 "channel": f"Educational Channel {i+1}",
-                "url": f"https://youtube.com/watch?v=sample{i+1}",
+                # Distinct per query, as real results would be (citations dedupe by URL)
+                "url": f"https://youtube.com/watch?v=vid{i+1}_{query.replace(' ', '_')}",
                 "published": "2023-01-01",
                 "query": query
             })
         
         return results
     
+    async def _stream_transcript(self, video_id):
+        """Yield a video's transcript in chunks, as a streamed download would."""
+        # In production, read the transcript response with iter_chunked()
+        transcript = await self._simulate_transcript_retrieval(video_id)
+        for start in range(0, len(transcript), TRANSCRIPT_CHUNK_CHARS):
+            yield transcript[start:start + TRANSCRIPT_CHUNK_CHARS]
+
     async def _simulate_transcript_retrieval(self, video_id):
         """Simulate transcript retrieval for prototype purposes."""
         # In production, this would use YouTube's transcript API or similar
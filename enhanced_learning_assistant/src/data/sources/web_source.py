@@ -1,29 +1,30 @@
 import os
-import aiohttp
-import logging
 from typing import List
+from src.data.sources.base_source import BaseSource
 
-class WebSource:
-    def __init__(self):
+class WebSource(BaseSource):
+    def __init__(self, http_client=None, **limits):
+        super().__init__("web", http_client, **limits)
         self.api_key = os.getenv("SERPER_API_KEY")
         self.base_url = "https://serpapi.com/search"
-        self.logger = logging.getLogger(__name__)
         
     async def gather_information(self, queries: List[str], num_results=5):
         """Gather information from web sources based on queries."""
+        return await self._coalesce(
+            (tuple(queries), num_results),
+            lambda: self._gather(queries, num_results)
+        )
+    
+    async def _gather(self, queries: List[str], num_results):
+        """Run the searches behind gather_information."""
         self.logger.info(f"Gathering web information for {len(queries)} queries")
         
-        all_results = []
-        
-        async with aiohttp.ClientSession() as session:
-            for query in queries:
-                try:
-                    # In production, use actual API
-                    # For prototype, we'll simulate API responses
-                    results = await self._simulate_search(query, num_results)
-                    all_results.extend(results)
-                except Exception as e:
-                    self.logger.error(f"Error searching for query '{query}': {str(e)}")
+        # In production, use actual API (through self.http_client.session_scope())
+        # For prototype, we'll simulate API responses
+        all_results = await self._run_queries(
+            queries,
+            lambda query: self._simulate_search(query, num_results)
+        )
         
         return self._process_results(all_results)
     
@@ -36,7 +37,8 @@ class WebSource:
         for i in range(num_results):
             results.append({
                 "title": f"Sample web result {i+1} for {query}",
-                "link": f"https://example.com/result{i+1}",
+                # Distinct per query, as real results would be (citations dedupe by URL)
+                "link": f"https://example.com/{'-'.join(query.lower().split())}/result{i+1}",
                 "snippet": f"This is a sample snippet for query '{query}' with relevant information about the topic.",
                 "source": "web",
                 "query": query
@@ -0,0 +1,128 @@
+import os
+import re
+import logging
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+CITATION_STYLES = ("numbered", "apa", "mla")
+
+# Placeholders sources use when a field is missing; never a usable key
+_MISSING = {"", "n/a", "unknown doi", "unknown url", "none"}
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|fbclid|gclid|ref|ref_src)$", re.IGNORECASE)
+
+class CitationRegistry:
+    """
+    Process-wide registry of cited sources, keyed by DOI or canonical URL.
+
+    Each source is stored once with its citation pre-rendered in every style,
+    so the same paper found by several queries (or used by several reports)
+    becomes one reference and is formatted only the first time it is seen.
+    Least recently used entries are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries=None):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries or int(os.getenv("CITATION_REGISTRY_MAX_ENTRIES", "10000"))
+        self._entries = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def normalise_doi(doi) -> str:
+        doi = _DOI_PREFIX.sub("", str(doi or "").strip()).lower()
+        return "" if doi in _MISSING else doi
+
+    @staticmethod
+    def canonical_url(url) -> str:
+        """Lower-case scheme and host, no "www.", fragment, tracking parameters or trailing slash."""
+        url = str(url or "").strip()
+        if url.lower() in _MISSING:
+            return ""
+        parts = urlsplit(url)
+        if not parts.netloc:
+            return url
+        host = parts.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k)]
+        # youtu.be/<id> and youtube.com/watch?v=<id> are the same video
+        if host == "youtu.be":
+            host, path, query = "youtube.com", "/watch", [("v", parts.path.strip("/"))]
+        else:
+            path = parts.path.rstrip("/")
+        return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, urlencode(sorted(query)), ""))
+
+    def key_for(self, item: dict) -> str:
+        doi = self.normalise_doi(item.get("doi"))
+        if doi:
+            return f"doi:{doi}"
+        url = self.canonical_url(item.get("url"))
+        if url:
+            return f"url:{url}"
+        title = " ".join(str(item.get("title", "")).lower().split())
+        return f"title:{item.get('source_type')}:{title}"
+
+    def register(self, item: dict) -> dict:
+        """Return the registry entry for `item`, rendering its citations the first time it is seen."""
+        key = self.key_for(item)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._counters["hits"] += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self._counters["misses"] += 1
+        entry = self._entries[key] = {"key": key, "source_type": item.get("source_type"), "styles": self._render(item)}
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+        return entry
+
+    def _render(self, item: dict) -> dict:
+        source_type = item.get("source_type")
+        title = item.get("title", "Untitled")
+        url = item.get("url", "")
+
+        if source_type == "web":
+            url = url or "Unknown URL"
+            return {
+                "numbered": f"{title}. Retrieved from {url}.",
+                "apa": f"{title}. (n.d.). Retrieved from {url}",
+                "mla": f"\"{title}.\" Web, {url}.",
+            }
+
+        if source_type == "video":
+            creator = item.get("creator", "Unknown Creator")
+            published = item.get("published_date", "n.d.")
+            return {
+                "numbered": f"{creator}. ({published}). {title} [Video]. YouTube. {url}.",
+                "apa": f"{creator}. ({published}). *{title}* [Video]. YouTube. {url}",
+                "mla": f"{creator}. \"{title}.\" *YouTube*, {published}, {url}.",
+            }
+
+        # Academic
+        authors = item.get("authors", ["Unknown"])
+        if not isinstance(authors, str):
+            authors = ", ".join(authors)
+        year = item.get("year", "n.d.")
+        journal = item.get("journal", "Unknown Journal")
+        doi = item.get("doi", "Unknown DOI")
+        doi_id = self.normalise_doi(doi)
+        return {
+            # Sources may ship their own citation; keep it as the numbered form
+            "numbered": item.get("citation") or f"{authors}. ({year}). {title}. {journal}. DOI: {doi}.",
+            "apa": f"{authors} ({year}). {title}. *{journal}*." + (f" https://doi.org/{doi_id}" if doi_id else ""),
+            "mla": f"{authors}. \"{title}.\" *{journal}*, {year}" + (f", doi:{doi_id}." if doi_id else "."),
+        }
+
+    def stats(self) -> dict:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            **self._counters,
+            "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+        }
+
+# Shared by every CitationService in the process
+citation_registry = CitationRegistry()
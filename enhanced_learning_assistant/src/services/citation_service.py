@@ -1,78 +1,75 @@
+import os
 import logging
+from src.services.citation_registry import CitationRegistry, CITATION_STYLES, citation_registry
+
+# Reference list order: grouped by source type, first appearance within each
+SOURCE_TYPE_ORDER = ("web", "video", "academic")
 
 class CitationService:
-    def __init__(self):
+    def __init__(self, registry: CitationRegistry = None, style=None):
         self.logger = logging.getLogger(__name__)
-        
-    def format_citations(self, research_data):
+        self.registry = registry or citation_registry
+        self.style = (style or os.getenv("CITATION_STYLE", "numbered")).lower()
+        if self.style not in CITATION_STYLES:
+            self.logger.warning(f"Unknown CITATION_STYLE '{self.style}', using numbered")
+            self.style = "numbered"
+
+    def format_citations(self, research_data, style=None):
         """Format citations from research data in an appropriate style."""
         self.logger.info("Formatting citations from research data")
-        
+
         # Handle empty or None research_data
         if not research_data:
             self.logger.warning("Empty research data provided for citation formatting")
             return "No citations available."
-            
-        citations = []
-        
+
         try:
-            # Process web sources
-            web_sources = [item for item in research_data if isinstance(item, dict) and item.get("source_type") == "web"]
-            for source in web_sources:
-                try:
-                    title = source.get('title', 'Untitled')
-                    url = source.get('url', 'Unknown URL')
-                    citation = f"{title}. Retrieved from {url}."
-                    citations.append(citation)
-                except Exception as e:
-                    self.logger.error(f"Error formatting web citation: {e}")
-            
-            # Process video sources
-            video_sources = [item for item in research_data if isinstance(item, dict) and item.get("source_type") == "video"]
-            for source in video_sources:
-                try:
-                    creator = source.get('creator', 'Unknown Creator') 
-                    published_date = source.get('published_date', 'n.d.')
-                    title = source.get('title', 'Untitled')
-                    url = source.get('url', '')
-                    citation = f"{creator}. ({published_date}). {title} [Video]. YouTube. {url}."
-                    citations.append(citation)
-                except Exception as e:
-                    self.logger.error(f"Error formatting video citation: {e}")
-            
-            # Process academic sources
-            academic_sources = [item for item in research_data if isinstance(item, dict) and item.get("source_type") == "academic"]
-            for source in academic_sources:
-                try:
-                    if "citation" in source:
-                        citations.append(source["citation"])
-                    else:
-                        authors_list = source.get("authors", ["Unknown"])
-                        # Handle both string and list authors
-                        if isinstance(authors_list, str):
-                            authors = authors_list
-                        else:
-                            authors = ", ".join(authors_list)
-                        year = source.get('year', 'n.d.')
-                        title = source.get('title', 'Untitled')
-                        journal = source.get('journal', 'Unknown Journal')
-                        doi = source.get('doi', 'Unknown DOI')
-                        citation = f"{authors}. ({year}). {title}. {journal}. DOI: {doi}."
-                        citations.append(citation)
-                except Exception as e:
-                    self.logger.error(f"Error formatting academic citation: {e}")
-            
+            entries = self.citation_entries(research_data, style)
+
             # Format as numbered references
-            if not citations:
+            if not entries:
                 self.logger.warning("No citations were generated from the research data")
                 return "No citations available."
-                
-            formatted_citations = []
-            for i, citation in enumerate(citations, 1):
-                formatted_citations.append(f"{i}. {citation}")
-            
-            return "\n".join(formatted_citations)
-            
+
+            return "\n".join(f"{i}. {citation}" for i, (_, citation) in enumerate(entries, 1))
+
         except Exception as e:
             self.logger.error(f"Unexpected error in citation formatting: {e}")
-            return "Citation formatting error occurred."
\ No newline at end of file
+            return "Citation formatting error occurred."
+
+    def citation_entries(self, research_data, style=None):
+        """
+        Return (item, citation) pairs in reference-list order, so entry i is
+        cited as [i + 1] wherever format_citations' numbering is used.
+
+        One pass over the research data: each source is looked up in the
+        citation registry, and sources sharing a DOI or URL are listed once
+        (the first item found stands for them).
+        """
+        if not research_data:
+            return []
+        style = (style or self.style).lower()
+        if style not in CITATION_STYLES:
+            style = "numbered"
+
+        groups = {source_type: [] for source_type in SOURCE_TYPE_ORDER}
+        seen = set()
+        duplicates = 0
+        for item in research_data:
+            if not isinstance(item, dict) or item.get("source_type") not in groups:
+                continue
+            try:
+                entry = self.registry.register(item)
+            except Exception as e:
+                self.logger.error(f"Error formatting {item.get('source_type')} citation: {e}")
+                continue
+            if entry["key"] in seen:
+                duplicates += 1
+                continue
+            seen.add(entry["key"])
+            groups[item["source_type"]].append((item, entry["styles"][style]))
+
+        if duplicates:
+            self.logger.info(f"Merged {duplicates} duplicate citations")
+
+        return [pair for source_type in SOURCE_TYPE_ORDER for pair in groups[source_type]]
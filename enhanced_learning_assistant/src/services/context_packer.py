@@ -0,0 +1,149 @@
+import os
+import re
+import logging
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+# Context windows of the Groq models we run against; LLM_CONTEXT_WINDOW overrides
+MODEL_CONTEXT_WINDOWS = {
+    "llama3-8b-8192": 8192,
+    "llama3-70b-8192": 8192,
+    "llama-3.1-8b-instant": 131072,
+    "llama-3.3-70b-versatile": 131072,
+    "mixtral-8x7b-32768": 32768,
+    "gemma2-9b-it": 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+class ContextOverflowError(Exception):
+    """Raised when a prompt leaves less room in the context window than the completion needs."""
+
+class TokenCounter:
+    """
+    Counts model tokens. Uses tiktoken's cl100k_base encoding when tiktoken is
+    installed (Llama 3's tokenizer is tiktoken-based and counts within a few
+    percent of it); otherwise falls back to a conservative estimate.
+
+    The encoding is loaded on first use (or by load() during app warm-up),
+    since importing tiktoken and reading its BPE ranks is slow.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._encoding = None
+        self._loaded = False
+
+    def load(self):
+        """Load the tiktoken encoding, if available. Safe to call more than once."""
+        if self._loaded:
+            return self._encoding
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            self._encoding = None
+            self.logger.info("tiktoken not available; estimating token counts")
+        self._loaded = True
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self.load()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        # Roughly 4 characters per token for English, but never fewer tokens
+        # than words and punctuation marks
+        return max((len(text) + 3) // 4, len(re.findall(r"\w+|[^\w\s]", text)))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most `max_tokens` tokens."""
+        if max_tokens <= 0 or not text:
+            return ""
+        encoding = self.load()
+        if encoding is not None:
+            tokens = encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+        if self.count(text) <= max_tokens:
+            return text
+        # Shrink proportionally, then trim until the estimate fits
+        cut = text[:max(1, len(text) * max_tokens // self.count(text))]
+        while cut and self.count(cut) > max_tokens:
+            cut = cut[:int(len(cut) * 0.9)]
+        return cut
+
+class ContextPacker:
+    """Fills token budgets with the most valuable research items for a model."""
+
+    def __init__(self, model: str, context_window=None):
+        self.model = model
+        self.counter = TokenCounter()
+        # An empty LLM_CONTEXT_WINDOW (as in the README's .env example) means unset
+        self.context_window = context_window or int(
+            os.getenv("LLM_CONTEXT_WINDOW") or MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+        )
+
+    def pack(self, items: list, budget: int, render: Callable[[dict], str], item_max_tokens=None) -> Tuple[str, list]:
+        """
+        Render items in value order until `budget` tokens are used, and return
+        the packed text together with the items that made it in. Each item is
+        rendered and counted once, so packing is linear in the number of items.
+        """
+        parts = []
+        packed = []
+        used = 0
+        for item in self.order_by_value(items):
+            text = render(item)
+            if item_max_tokens:
+                text = self.counter.truncate(text, item_max_tokens)
+            tokens = self.counter.count(text)
+            if used + tokens > budget:
+                continue
+            parts.append(text)
+            packed.append(item)
+            used += tokens
+        return "".join(parts), packed
+
+    def pack_lines(self, text: str, budget: int) -> str:
+        """Keep whole lines of `text` (e.g. numbered citations) within `budget` tokens."""
+        kept = []
+        used = 0
+        for line in text.splitlines():
+            tokens = self.counter.count(line) + 1
+            if used + tokens > budget:
+                break
+            kept.append(line)
+            used += tokens
+        return "\n".join(kept)
+
+    def completion_budget(self, prompt: str, desired: int, minimum: int = 256, margin: int = 64) -> int:
+        """
+        Pick max_tokens so prompt plus completion fit the context window, never
+        asking for more than `desired`. Raises ContextOverflowError when fewer
+        than `minimum` tokens are left, rather than asking for more than fits.
+        """
+        available = self.context_window - self.counter.count(prompt) - margin
+        if available < min(minimum, desired):
+            raise ContextOverflowError(
+                f"Prompt leaves {max(available, 0)} of {self.context_window} tokens for the completion; {min(minimum, desired)} needed"
+            )
+        return min(desired, available)
+
+    @staticmethod
+    def order_by_value(items: List[dict]) -> List[dict]:
+        """
+        Highest-value first. Items scored by the ranking stage are ordered by
+        their "relevance"; otherwise source types are interleaved so one source
+        cannot crowd the others out of the budget.
+        """
+        if any(isinstance(item, dict) and "relevance" in item for item in items):
+            return sorted(items, key=lambda item: -item.get("relevance", 0.0))
+
+        by_source = OrderedDict()
+        for item in items:
+            by_source.setdefault(item.get("source_type"), []).append(item)
+        ordered = []
+        queues = list(by_source.values())
+        for i in range(max((len(q) for q in queues), default=0)):
+            ordered.extend(q[i] for q in queues if i < len(q))
+        return ordered
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+class HTTPResponseCache:
+    """
+    On-disk cache for JSON GET responses that honours HTTP caching headers.
+
+    Freshness comes from Cache-Control max-age (or Expires), falling back to
+    `default_ttl` when the server sends neither. Stale entries that carry an
+    ETag or Last-Modified are revalidated with a conditional request, so an
+    unchanged resource costs a 304 instead of a full download. Responses
+    marked no-store are never written; no-cache responses are stored but
+    always revalidated.
+    """
+
+    def __init__(self, path: str, default_ttl=None):
+        self.path = path
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("HTTP_CACHE_DEFAULT_TTL", "86400"))
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS http_cache "
+                "(key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT, expires_at REAL NOT NULL)"
+            )
+
+    async def get_json(self, session, url: str, params: dict = None):
+        """
+        GET `url` through the cache. Returns (status, data); data is the decoded
+        JSON body for a 200 (or a revalidated cache entry) and None otherwise.
+        """
+        key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+        entry = await asyncio.to_thread(self._load, key)
+        now = time.time()
+
+        if entry is not None and entry["expires_at"] > now:
+            self._counters["hits"] += 1
+            return 200, json.loads(entry["body"])
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 304 and entry is not None:
+                self._counters["revalidated"] += 1
+                _, expires_at = self._freshness(response.headers, now)
+                await asyncio.to_thread(self._touch, key, expires_at)
+                return 200, json.loads(entry["body"])
+
+            self._counters["misses"] += 1
+            if response.status != 200:
+                return response.status, None
+
+            body = await response.text()
+            store, expires_at = self._freshness(response.headers, now)
+            if store:
+                await asyncio.to_thread(
+                    self._save, key, body,
+                    response.headers.get("ETag"), response.headers.get("Last-Modified"), expires_at
+                )
+                self._counters["stores"] += 1
+            return 200, json.loads(body)
+
+    def stats(self) -> dict:
+        return {"path": self.path, **self._counters}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _freshness(self, headers, now):
+        """Return (storable, expires_at) for a response's caching headers."""
+        directives = {}
+        for part in headers.get("Cache-Control", "").split(","):
+            name, _, value = part.strip().partition("=")
+            if name:
+                directives[name.lower()] = value.strip('"')
+
+        if "no-store" in directives:
+            return False, now
+        if "no-cache" in directives:
+            return True, now
+        if "max-age" in directives:
+            try:
+                return True, now + int(directives["max-age"]) - int(headers.get("Age", "0") or 0)
+            except ValueError:
+                pass
+        if "Expires" in headers:
+            try:
+                return True, parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return True, now
+        return True, now + self.default_ttl
+
+    def _load(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, expires_at FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "expires_at": row[3]}
+
+    def _save(self, key, body, etag, last_modified, expires_at):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO http_cache (key, body, etag, last_modified, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, expires_at)
+            )
+
+    def _touch(self, key, expires_at):
+        with self._lock, self._db:
+            self._db.execute("UPDATE http_cache SET expires_at = ? WHERE key = ?", (expires_at, key))
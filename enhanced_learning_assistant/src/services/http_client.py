@@ -0,0 +1,137 @@
+import os
+import time
+import logging
+import aiohttp
+from contextlib import asynccontextmanager
+
+class HTTPClientManager:
+    """Owns the pooled aiohttp session shared by all data sources."""
+
+    def __init__(self, limit=None, limit_per_host=None, dns_cache_ttl=None, keepalive_timeout=None, request_timeout=None):
+        self.logger = logging.getLogger(__name__)
+
+        self.limit = limit or int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.limit_per_host = limit_per_host or int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+        self.dns_cache_ttl = dns_cache_ttl or int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+        self.keepalive_timeout = keepalive_timeout or float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+        self.request_timeout = request_timeout or float(os.getenv("HTTP_REQUEST_TIMEOUT", "30"))
+
+        self.session = None
+        self._connector = None
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._counters = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+            "queued": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    @property
+    def started(self) -> bool:
+        return self.session is not None and not self.session.closed
+
+    async def start(self):
+        """Create the shared connector and session. Safe to call more than once."""
+        if self.started:
+            return
+
+        self._connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self.session = aiohttp.ClientSession(
+            connector=self._connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            trace_configs=[self._build_trace_config()]
+        )
+        self._reset_counters()
+        self.logger.info(
+            f"HTTP pool started (limit={self.limit}, per_host={self.limit_per_host}, "
+            f"dns_ttl={self.dns_cache_ttl}s, keepalive={self.keepalive_timeout}s)"
+        )
+
+    async def close(self):
+        """Close the shared session and every pooled connection."""
+        if self.session is not None:
+            await self.session.close()
+            self.logger.info("HTTP pool closed")
+        self.session = None
+        self._connector = None
+
+    @asynccontextmanager
+    async def session_scope(self):
+        """
+        Yield the shared session, or a short-lived one if the pool has not
+        been started (e.g. when a source is used outside the FastAPI app).
+        """
+        if self.started:
+            yield self.session
+            return
+
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.request_timeout)) as session:
+            yield session
+
+    def stats(self) -> dict:
+        """Return a snapshot of pool usage for sizing the pool under load."""
+        active = idle = 0
+        if self._connector is not None and not self._connector.closed:
+            # aiohttp does not expose these publicly; read them defensively
+            active = len(getattr(self._connector, "_acquired", ()))
+            idle = sum(len(conns) for conns in getattr(self._connector, "_conns", {}).values())
+
+        counters = dict(self._counters)
+        waits = counters["queued"]
+        return {
+            "started": self.started,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "active_connections": active,
+            "idle_connections": idle,
+            **counters,
+            "wait_time_avg": counters["wait_time_total"] / waits if waits else 0.0,
+        }
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self._counters["requests"] += 1
+
+        async def on_queued_start(session, ctx, params):
+            ctx.queued_at = time.perf_counter()
+
+        async def on_queued_end(session, ctx, params):
+            waited = time.perf_counter() - getattr(ctx, "queued_at", time.perf_counter())
+            self._counters["queued"] += 1
+            self._counters["wait_time_total"] += waited
+            self._counters["wait_time_max"] = max(self._counters["wait_time_max"], waited)
+
+        async def on_connection_create_end(session, ctx, params):
+            self._counters["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._counters["connections_reused"] += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self._counters["dns_cache_hits"] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self._counters["dns_cache_misses"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
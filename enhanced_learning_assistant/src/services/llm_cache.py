@@ -0,0 +1,134 @@
+import os
+import time
+import json
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+from src.data.paths import data_path
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM completions.
+
+    Entries live in a bounded in-memory LRU with a TTL and, when `db_path` is
+    set, in a SQLite table that survives restarts. Memory misses fall through
+    to disk and are promoted back into memory on a hit.
+    """
+
+    def __init__(self, max_entries=None, ttl=None, db_path=None):
+        self.logger = logging.getLogger(__name__)
+
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+        self.ttl = ttl or float(os.getenv("LLM_CACHE_TTL", "3600"))
+        self.db_path = db_path or data_path("LLM_CACHE_DB_PATH") or None
+
+        self._memory = OrderedDict()
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if self.db_path:
+            self._open_db()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        payload = json.dumps([model, prompt, max_tokens, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return value
+            del self._memory[key]
+            self._counters["expirations"] += 1
+
+        if self._db is not None:
+            try:
+                row = await asyncio.to_thread(self._db_get, key, now)
+            except sqlite3.Error as e:
+                # A locked or corrupt disk tier is a miss, not a failed LLM call
+                self.logger.error(f"Failed to read LLM cache entry from disk: {e}")
+                row = None
+            if row is not None:
+                value, expires_at = row
+                self._remember(key, value, expires_at)
+                self._counters["hits"] += 1
+                self._counters["disk_hits"] += 1
+                return value
+
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        if self._db is not None:
+            try:
+                await asyncio.to_thread(self._db_set, key, value, expires_at)
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to write LLM cache entry to disk: {e}")
+
+    async def clear(self):
+        self._memory.clear()
+        if self._db is not None:
+            await asyncio.to_thread(self._db_execute, "DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "enabled": True,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "disk": self.db_path,
+            **self._counters,
+            "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _open_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db_execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        # Drop anything that expired while the process was down
+        self._db_execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        self.logger.info(f"LLM cache disk tier opened at {self.db_path}")
+
+    def _db_execute(self, sql, params=()):
+        with self._db_lock, self._db:
+            self._db.execute(sql, params)
+
+    def _db_get(self, key, now):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        return row
+
+    def _db_set(self, key, value, expires_at):
+        self._db_execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
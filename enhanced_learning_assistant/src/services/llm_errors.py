@@ -0,0 +1,5 @@
+# Returned by LLMService in place of content when generation fails. Kept free
+# of imports so callers can check for them without loading the OpenAI client.
+API_ERROR_MESSAGE = "LLM service encountered an API error."
+GENERATION_FAILED_MESSAGE = "Content generation failed. Please try again later."
+LLM_ERROR_MESSAGES = (API_ERROR_MESSAGE, GENERATION_FAILED_MESSAGE)
@@ -0,0 +1,134 @@
+import os
+import json
+import logging
+
+# Task types callers pass to LLMService; each can be routed separately
+TASK_DEFAULT = "default"
+TASK_QUERY_GENERATION = "query_generation"
+TASK_QUESTIONS = "questions"
+TASK_ANALYSIS = "analysis"
+TASK_SYNTHESIS = "synthesis"
+TASK_REPORT = "report"
+TASKS = (TASK_DEFAULT, TASK_QUERY_GENERATION, TASK_QUESTIONS, TASK_ANALYSIS, TASK_SYNTHESIS, TASK_REPORT)
+
+class LLMRoute:
+    """Model, endpoint and sampling parameters for one task type, plus its optional hedge target."""
+
+    def __init__(self, task, model, base_url, api_key, temperature, params=None, hedge=None):
+        self.task = task
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.temperature = temperature
+        self.params = params or {}
+        self.hedge = hedge
+
+    def describe(self) -> dict:
+        """The route without its API keys."""
+        hedge = None
+        if self.hedge is not None:
+            hedge = {k: v for k, v in self.hedge.items() if k != "api_key"}
+        return {
+            "model": self.model,
+            "endpoint": self.base_url,
+            "temperature": self.temperature,
+            "params": self.params,
+            "hedge": hedge,
+        }
+
+class LLMRouter:
+    """
+    Maps task types to routes. The table comes from LLM_ROUTES, a JSON object
+    (inline, or the path of a .json file) keyed by task type:
+
+        {
+          "questions": {"temperature": 0.5,
+                        "hedge": {"endpoint": "https://backup.example/v1", "percentile": 90}},
+          "report": {"model": "llama3-70b-8192", "params": {"top_p": 0.9}},
+          "analysis": {"temperature": 0.2}
+        }
+
+    Entry fields: model, endpoint, api_key_env (name of the variable holding
+    the key; keys never go in the table), temperature, params (extra request
+    fields) and hedge. Missing fields fall back to the "default" entry, then to
+    GROQ_MODEL / GROQ_BASE_URL / GROQ_API_KEY at temperature 0.7.
+
+    hedge: true hedges against the route's own endpoint; an object may set
+    endpoint, model, api_key_env, percentile (of the task's recent latencies
+    after which the backup is sent, default 95), initial_delay (seconds, used
+    until enough latencies are recorded, default 2) and min_delay (default 0.25).
+    """
+
+    def __init__(self, model: str, base_url: str, api_key: str, temperature: float, table: dict = None):
+        self.logger = logging.getLogger(__name__)
+        self.table = table or {}
+        unknown = set(self.table) - set(TASKS)
+        if unknown:
+            self.logger.warning(f"LLM_ROUTES has unknown task types: {', '.join(sorted(unknown))}")
+
+        self._base = {"model": model, "endpoint": base_url, "api_key": api_key, "temperature": temperature}
+        self._routes = {task: self._build(task) for task in set(TASKS) | set(self.table)}
+
+    @classmethod
+    def from_env(cls, model: str, base_url: str, api_key: str, temperature: float) -> "LLMRouter":
+        return cls(model, base_url, api_key, temperature, cls._load_table(os.getenv("LLM_ROUTES", "")))
+
+    @staticmethod
+    def _load_table(value: str) -> dict:
+        value = value.strip()
+        if not value:
+            return {}
+        try:
+            if not value.startswith("{"):
+                with open(value) as f:
+                    return json.load(f)
+            return json.loads(value)
+        except (OSError, ValueError) as e:
+            logging.getLogger(__name__).error(f"Ignoring LLM_ROUTES, it could not be read: {e}")
+            return {}
+
+    def route(self, task: str = None) -> LLMRoute:
+        return self._routes.get(task or TASK_DEFAULT, self._routes[TASK_DEFAULT])
+
+    def describe(self) -> dict:
+        return {task: route.describe() for task, route in sorted(self._routes.items())}
+
+    def _build(self, task: str) -> LLMRoute:
+        entry = {**self.table.get(TASK_DEFAULT, {}), **self.table.get(task, {})}
+        model = entry.get("model", self._base["model"])
+        base_url = entry.get("endpoint", self._base["endpoint"])
+        api_key = self._api_key(entry.get("api_key_env"))
+
+        hedge = entry.get("hedge")
+        if hedge is True:
+            hedge = {}
+        if isinstance(hedge, dict):
+            hedge = {
+                "endpoint": hedge.get("endpoint", base_url),
+                "model": hedge.get("model", model),
+                "api_key": self._api_key(hedge.get("api_key_env")) if hedge.get("api_key_env") else api_key,
+                "percentile": float(hedge.get("percentile", 95)),
+                "initial_delay": float(hedge.get("initial_delay", 2.0)),
+                "min_delay": float(hedge.get("min_delay", 0.25)),
+            }
+        else:
+            hedge = None
+
+        return LLMRoute(
+            task,
+            model,
+            base_url,
+            api_key,
+            float(entry.get("temperature", self._base["temperature"])),
+            dict(entry.get("params", {})),
+            hedge,
+        )
+
+    def _api_key(self, env_name):
+        if not env_name:
+            return self._base["api_key"]
+        key = os.getenv(env_name)
+        if not key:
+            self.logger.error(f"{env_name} is not set; using GROQ_API_KEY for that route")
+            return self._base["api_key"]
+        return key
@@ -1,10 +1,19 @@
 import logging
 import os
-from dotenv import load_dotenv
-from openai import AsyncOpenAI, OpenAIError
-
-# Load environment variables from .env file
-load_dotenv()
+import time
+import random
+import asyncio
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator
+from openai import AsyncOpenAI, OpenAIError, RateLimitError, APIConnectionError, InternalServerError
+from src.services.llm_cache import LLMCache
+from src.services.llm_errors import API_ERROR_MESSAGE, GENERATION_FAILED_MESSAGE, LLM_ERROR_MESSAGES
+from src.services.single_flight import SingleFlight
+from src.services.rate_limiter import AdaptiveRateLimiter, PRIORITY_DEFAULT
+from src.services.llm_router import LLMRouter, LLMRoute
+from src.services.metrics import LLM_REQUEST_LATENCY, LLM_IN_FLIGHT, LLM_REQUESTS, LLM_TOKENS, LLM_CACHE_HITS, LLM_HEDGED_REQUESTS
 
 class LLMService:
     def __init__(self):
@@ -13,6 +22,7 @@ class LLMService:
 
         self.api_key = os.getenv("GROQ_API_KEY")
         self.model = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+        self.temperature = 0.7
 
         if not self.api_key:
             self.logger.error("GROQ_API_KEY is not set. Please check your .env file.")
@@ -20,39 +30,359 @@ class LLMService:
         else:
             self.logger.debug(f"GROQ_API_KEY loaded: {self.api_key[:4]}***")
 
+        # Overridable so benchmarks can point at a local stand-in
+        self.base_url = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+        self._clients = {}
         try:
-            self.client = AsyncOpenAI(
-                api_key=self.api_key,
-                base_url="https://api.groq.com/openai/v1"
-            )
+            self.client = self._client_for(self.base_url, self.api_key)
         except Exception as e:
             self.logger.exception("Failed to initialize AsyncOpenAI client")
             raise
 
-    async def generate_content(self, prompt: str, max_tokens: int = 300) -> str:
+        # Per-task models, endpoints and parameters (LLM_ROUTES); GROQ_MODEL everywhere by default
+        self.router = LLMRouter.from_env(self.model, self.base_url, self.api_key, self.temperature)
+        # Recent primary-call latencies of hedged tasks, from which their hedge delay is taken
+        self.hedge_window = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+        self.hedge_min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self._latencies = defaultdict(lambda: deque(maxlen=self.hedge_window))
+        self._hedge_counters = defaultdict(lambda: {"hedged": 0, "primary_won": 0, "backup_won": 0})
+
+        # Response caching is opt-in since it trades sampling variety for latency
+        self.cache = LLMCache() if os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true" else None
+        self.single_flight = SingleFlight("llm")
+
+        # Client-side rate limiting and retries with jittered exponential backoff
+        self.rate_limiter = AdaptiveRateLimiter()
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+
+    async def generate_content(self, prompt: str, max_tokens: int = 300, use_cache: bool = True, priority: int = PRIORITY_DEFAULT, task: str = None) -> str:
         """
         Generate content using Groq's LLM via OpenAI-compatible client.
+
+        Identical (model, prompt, max_tokens, temperature) requests already in
+        flight are coalesced into one upstream call, and served from the response
+        cache when it is enabled. Pass use_cache=False to always make a fresh call.
+        Calls are admitted by the rate limiter in `priority` order (lower first).
+        `task` (one of the TASK_* types) selects the model, endpoint and
+        parameters from the routing table, and whether slow calls are hedged.
         """
+        route = self.router.route(task)
+        if not use_cache:
+            return await self._generate(prompt, max_tokens, None, priority, route)
+
+        cache_key = self._cache_key(route, prompt, max_tokens)
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("LLM cache hit")
+                LLM_CACHE_HITS.inc(model=route.model)
+                return cached
+
+        return await self.single_flight.do(
+            cache_key,
+            lambda: self._generate(prompt, max_tokens, cache_key, priority, route)
+        )
+
+    async def _generate(self, prompt: str, max_tokens: int, cache_key, priority: int, route: LLMRoute) -> str:
+        """Make a single upstream completion call, hedged if the route asks for it."""
         try:
-            self.logger.info(f"Using model: {self.model}")
+            self.logger.info(f"Using model: {route.model} ({route.task})")
             self.logger.debug(f"Prompt: {prompt[:200]}...")
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            request = dict(
+                model=route.model,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=max_tokens
+                temperature=route.temperature,
+                max_tokens=max_tokens,
+                **route.params
             )
-
-            generated_text = response.choices[0].message.content
+            estimated_tokens = self._estimate_tokens(prompt, max_tokens)
+            if route.hedge is not None:
+                generated_text = await self._hedged(route, priority, estimated_tokens, request)
+            else:
+                generated_text = await self._complete(self._client_for(route.base_url, route.api_key), priority, estimated_tokens, request)
             self.logger.info("LLM generation successful")
             self.logger.debug(f"Output: {generated_text[:300]}")
 
+            # Only successful completions are cached, never the error strings below
+            if self.cache is not None and cache_key is not None and generated_text:
+                await self.cache.set(cache_key, generated_text)
+
             return generated_text
 
         except OpenAIError:
             self.logger.exception("OpenAI/Groq API error")
-            return "LLM service encountered an API error."
+            return API_ERROR_MESSAGE
         except Exception:
             self.logger.exception("Unexpected error during content generation")
-            return "Content generation failed. Please try again later."
+            return GENERATION_FAILED_MESSAGE
+
+    async def stream_content(self, prompt: str, max_tokens: int = 300, use_cache: bool = True, priority: int = PRIORITY_DEFAULT, task: str = None) -> AsyncIterator[str]:
+        """
+        Stream generated content as it is decoded, using the OpenAI-compatible
+        stream=True API. Yields text deltas; a cached response is yielded whole.
+        Streams follow the task's route but are never hedged, since the first
+        deltas have already been yielded by the time a hedge would be sent.
+        """
+        route = self.router.route(task)
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._cache_key(route, prompt, max_tokens)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("LLM cache hit")
+                LLM_CACHE_HITS.inc(model=route.model)
+                yield cached
+                return
+
+        chunks = []
+        try:
+            self.logger.info(f"Streaming from model: {route.model} ({route.task})")
+            self.logger.debug(f"Prompt: {prompt[:200]}...")
+
+            # The admission slot is held until the stream has been fully read
+            async with self._completion(
+                priority,
+                self._estimate_tokens(prompt, max_tokens),
+                self._client_for(route.base_url, route.api_key),
+                model=route.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=route.temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **route.params
+            ) as stream:
+                usage = None
+                async for chunk in stream:
+                    # Usage arrives on the final chunk (Groq reports it under x_groq)
+                    usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+                self._record_usage(usage, route.model)
+
+            self.logger.info("LLM streaming generation successful")
+
+        except OpenAIError:
+            self.logger.exception("OpenAI/Groq API error")
+            yield API_ERROR_MESSAGE
+            return
+        except Exception:
+            self.logger.exception("Unexpected error during content streaming")
+            yield GENERATION_FAILED_MESSAGE
+            return
+
+        if cache_key is not None and chunks:
+            await self.cache.set(cache_key, "".join(chunks))
+
+    def routes(self) -> dict:
+        """The routing table, with the current hedge delay and counters of hedged tasks."""
+        routes = self.router.describe()
+        for task, route in routes.items():
+            if route["hedge"] is not None:
+                route["hedge"] = {
+                    **route["hedge"],
+                    "delay": round(self._hedge_delay(self.router.route(task)), 3),
+                    "latency_samples": len(self._latencies[task]),
+                    **self._hedge_counters[task],
+                }
+        return routes
+
+    def _client_for(self, base_url: str, api_key: str) -> AsyncOpenAI:
+        """One client (and connection pool) per endpoint and key, created on first use."""
+        client = self._clients.get((base_url, api_key))
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                # Retries are handled below so they go through the rate limiter
+                max_retries=0
+            )
+            self._clients[(base_url, api_key)] = client
+        return client
+
+    @staticmethod
+    def _cache_key(route: LLMRoute, prompt: str, max_tokens: int) -> str:
+        # Extra route parameters change the output, so they are part of the key
+        model = route.model + (repr(sorted(route.params.items())) if route.params else "")
+        return LLMCache.make_key(model, prompt, max_tokens, route.temperature)
+
+    async def _complete(self, client: AsyncOpenAI, priority: int, estimated_tokens: int, request: dict, admitted: asyncio.Event = None) -> str:
+        async with self._completion(priority, estimated_tokens, client, admitted, **request) as response:
+            return response.choices[0].message.content
+
+    async def _hedged(self, route: LLMRoute, priority: int, estimated_tokens: int, request: dict) -> str:
+        """
+        Send the request to the route's endpoint and, if it hasn't answered
+        within the task's hedge delay, a backup to the hedge endpoint. The first
+        successful answer is returned and the other call cancelled; an error
+        from one only counts if the other fails too. The delay runs from the
+        primary's admission by the rate limiter, so time spent queueing behind
+        other calls never triggers a hedge.
+        """
+        hedge = route.hedge
+        admitted = asyncio.Event()
+        primary = asyncio.create_task(
+            self._complete(self._client_for(route.base_url, route.api_key), priority, estimated_tokens, request, admitted)
+        )
+        primary_finished = []
+        primary.add_done_callback(lambda _: primary_finished.append(time.monotonic()))
+        admission = asyncio.create_task(admitted.wait())
+        calls = {primary}
+        started = None
+        try:
+            await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            if primary.done():
+                return primary.result()
+            started = time.monotonic()
+
+            done, _ = await asyncio.wait(calls, timeout=self._hedge_delay(route))
+            if done:
+                return primary.result()
+
+            self.logger.info(f"Hedging {route.task} call to {hedge['endpoint']} after {time.monotonic() - started:.2f}s")
+            self._hedge_counters[route.task]["hedged"] += 1
+            backup = asyncio.create_task(
+                self._complete(
+                    self._client_for(hedge["endpoint"], hedge["api_key"]),
+                    priority,
+                    estimated_tokens,
+                    {**request, "model": hedge["model"]}
+                )
+            )
+            calls.add(backup)
+
+            error = None
+            pending = set(calls)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for call in done:
+                    if call.exception() is None:
+                        winner = "primary" if call is primary else "backup"
+                        self._hedge_counters[route.task][f"{winner}_won"] += 1
+                        LLM_HEDGED_REQUESTS.inc(task=route.task, winner=winner)
+                        return call.result()
+                    error = error or call.exception()
+            LLM_HEDGED_REQUESTS.inc(task=route.task, winner="none")
+            raise error
+        finally:
+            for call in (*calls, admission):
+                call.cancel()
+            await asyncio.gather(*calls, admission, return_exceptions=True)
+            # A primary cancelled by a faster backup took at least this long, so
+            # it still counts, keeping the delay from drifting down as hedges win
+            if started is not None:
+                self._latencies[route.task].append((primary_finished[0] if primary_finished else time.monotonic()) - started)
+
+    def _hedge_delay(self, route: LLMRoute) -> float:
+        """Seconds to wait for the primary call: the configured percentile of its recent latencies."""
+        hedge = route.hedge
+        samples = sorted(self._latencies[route.task])
+        if len(samples) < self.hedge_min_samples:
+            return hedge["initial_delay"]
+        index = min(len(samples) - 1, int(round((len(samples) - 1) * hedge["percentile"] / 100)))
+        return max(hedge["min_delay"], samples[index])
+
+    @asynccontextmanager
+    async def _completion(self, priority: int, estimated_tokens: int, client: AsyncOpenAI = None, admitted: asyncio.Event = None, **request):
+        """
+        Create a completion inside a rate limiter slot, retrying 429s, timeouts,
+        connection errors and 5xx responses with jittered exponential backoff
+        (or the server's Retry-After). The slot is held while the caller uses
+        the response, which matters for streams. `admitted` is set once the
+        first slot is granted.
+        """
+        client = client or self.client
+        model = request.get("model", self.model)
+        attempt = 0
+        while True:
+            async with self.rate_limiter.slot(estimated_tokens, priority):
+                if admitted is not None:
+                    admitted.set()
+                started = time.monotonic()
+                LLM_IN_FLIGHT.inc(model=model)
+                try:
+                    response = await client.chat.completions.create(**request)
+                except OpenAIError as e:
+                    LLM_IN_FLIGHT.dec(model=model)
+                    LLM_REQUESTS.inc(model=model, outcome="throttled" if isinstance(e, RateLimitError) else "error")
+                    error = e
+                    delay = self._retry_delay(attempt, error)
+                    if delay is None:
+                        raise
+                except BaseException:
+                    LLM_IN_FLIGHT.dec(model=model)
+                    raise
+                else:
+                    usage = getattr(response, "usage", None)
+                    self.rate_limiter.record_success(
+                        time.monotonic() - started,
+                        estimated_tokens,
+                        getattr(usage, "total_tokens", None)
+                    )
+                    self._record_usage(usage, model)
+                    try:
+                        yield response
+                    finally:
+                        # Streams are timed until the caller has read them
+                        LLM_IN_FLIGHT.dec(model=model)
+                        LLM_REQUEST_LATENCY.observe(
+                            time.monotonic() - started,
+                            model=model,
+                            mode="stream" if request.get("stream") else "complete"
+                        )
+                    LLM_REQUESTS.inc(model=model, outcome="success")
+                    return
+
+            attempt += 1
+            self.logger.warning(f"LLM call failed ({type(error).__name__}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _record_usage(self, usage, model: str):
+        """Count prompt and completion tokens from a response's usage block."""
+        if usage is None:
+            return
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, type="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, type="completion")
+
+    def _retry_delay(self, attempt: int, error: OpenAIError):
+        """Seconds to wait before retrying `error`, or None if it should not be retried."""
+        retry_after = None
+        if isinstance(error, RateLimitError):
+            retry_after = self._retry_after(error)
+            self.rate_limiter.record_throttle(retry_after)
+        elif not isinstance(error, (APIConnectionError, InternalServerError)):
+            return None
+
+        if attempt >= self.max_retries:
+            return None
+        if retry_after is not None:
+            # Small jitter so throttled callers don't all return at once
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(error: OpenAIError):
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            value = headers.get("retry-after")
+            if value:
+                try:
+                    return float(value)
+                except ValueError:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    @staticmethod
+    def _estimate_tokens(prompt: str, max_tokens: int) -> int:
+        # Rough prompt size plus the completion ceiling; corrected from usage afterwards
+        return len(prompt) // 4 + max_tokens
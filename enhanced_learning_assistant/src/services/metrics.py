@@ -0,0 +1,166 @@
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self):
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # Per-bucket counts (last slot is +Inf), then sum
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self):
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry rendered in the Prometheus text
+    exposition format. Metrics are per process, so with several uvicorn
+    workers each one is scraped separately.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        # Re-registering returns the existing metric so module reloads are harmless
+        return self._metrics.setdefault(metric.name, metric)
+
+registry = MetricsRegistry()
+
+# Pipeline stages (research query generation, each source, synthesis, report generation, ...)
+STAGE_LATENCY = registry.histogram("pipeline_stage_duration_seconds", "Duration of report pipeline stages", ("component", "stage"))
+STAGE_IN_FLIGHT = registry.gauge("pipeline_stage_in_flight", "Pipeline stages currently running", ("component", "stage"))
+STAGE_ERRORS = registry.counter("pipeline_stage_errors_total", "Pipeline stages that failed", ("component", "stage"))
+
+# Research queries answered from the local corpus vs. the external sources
+RESEARCH_CORPUS_QUERIES = registry.counter("research_corpus_queries_total", "Research queries by where they were answered", ("source", "served_from"))
+
+# LLM calls
+LLM_REQUEST_LATENCY = registry.histogram("llm_request_duration_seconds", "Duration of upstream LLM calls", ("model", "mode"))
+LLM_IN_FLIGHT = registry.gauge("llm_requests_in_flight", "Upstream LLM calls in progress", ("model",))
+LLM_REQUESTS = registry.counter("llm_requests_total", "Upstream LLM calls by outcome", ("model", "outcome"))
+LLM_TOKENS = registry.counter("llm_tokens_total", "LLM tokens reported in response usage", ("model", "type"))
+LLM_CACHE_HITS = registry.counter("llm_cache_hits_total", "LLM calls served from the response cache", ("model",))
+LLM_HEDGED_REQUESTS = registry.counter("llm_hedged_requests_total", "LLM calls that sent a backup request, by which answered first", ("task", "winner"))
+
+# HTTP API
+HTTP_REQUEST_LATENCY = registry.histogram("http_request_duration_seconds", "API request duration (to first byte for streams)", ("method", "path"))
+HTTP_REQUESTS = registry.counter("http_requests_total", "API requests by status code", ("method", "path", "status"))
+
+@contextmanager
+def track_stage(component: str, stage: str):
+    """Time a pipeline stage, tracking it as in flight and counting it as failed if it raises."""
+    STAGE_IN_FLIGHT.inc(component=component, stage=stage)
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(component=component, stage=stage)
+        raise
+    finally:
+        STAGE_IN_FLIGHT.dec(component=component, stage=stage)
+        STAGE_LATENCY.observe(time.perf_counter() - started, component=component, stage=stage)
+
+def record_stage_error(component: str, stage: str):
+    """Count a stage failure that was handled without raising."""
+    STAGE_ERRORS.inc(component=component, stage=stage)
@@ -0,0 +1,183 @@
+import os
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
+
+# Priority lanes: lower numbers are admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 10
+
+class TokenBucket:
+    """Continuously refilling bucket; a rate of 0 means unlimited."""
+
+    def __init__(self, per_minute: float, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        # A request larger than the whole bucket is admitted once it is full
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        if self.rate > 0:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class AdaptiveRateLimiter:
+    """
+    Client-side admission control for LLM calls.
+
+    Requests are admitted in priority order once a concurrency slot is free
+    and both the requests/min and tokens/min buckets allow them. The
+    concurrency limit adapts AIMD-style: it grows by one slot per window of
+    successful calls, halves on a 429, and shrinks gently when latency per
+    token climbs well above the recent best. A Retry-After from the server
+    pauses all admissions until it has passed.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_concurrency=None, min_concurrency=1):
+        self.logger = logging.getLogger(__name__)
+
+        self.requests = TokenBucket(requests_per_minute if requests_per_minute is not None else float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")))
+        self.tokens = TokenBucket(tokens_per_minute if tokens_per_minute is not None else float(os.getenv("LLM_TOKENS_PER_MINUTE", "0")))
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.min_concurrency = min_concurrency
+        self.latency_factor = float(os.getenv("LLM_LATENCY_BACKOFF_FACTOR", "3"))
+        # How fast the latency baseline forgets an unusually fast call, per success
+        self.baseline_drift = float(os.getenv("LLM_LATENCY_BASELINE_DRIFT", "0.02"))
+
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._timer = None
+        self._avg_latency = None
+        self._baseline = None
+        self._avg_per_token = None
+        self._counters = {"admitted": 0, "throttled": 0, "latency_backoffs": 0}
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int, priority: int = PRIORITY_DEFAULT):
+        """Hold an admission slot for one upstream call."""
+        await self._acquire(estimated_tokens, priority)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake()
+
+    def record_success(self, latency: float, estimated_tokens: int = 0, used_tokens=None):
+        if used_tokens is not None and estimated_tokens > used_tokens:
+            self.tokens.refund(estimated_tokens - used_tokens)
+
+        self._avg_latency = latency if self._avg_latency is None else 0.8 * self._avg_latency + 0.2 * latency
+
+        # Compare seconds per token, so a long report call isn't mistaken for
+        # congestion next to a short question call
+        tokens = used_tokens or estimated_tokens
+        per_token = latency / max(tokens, 1)
+        if self._baseline is None:
+            self._baseline = self._avg_per_token = per_token
+        else:
+            # A decaying minimum: one fast outlier can't anchor the baseline forever
+            self._baseline = min(per_token, self._baseline * (1 + self.baseline_drift))
+            self._avg_per_token = 0.8 * self._avg_per_token + 0.2 * per_token
+
+        if self._avg_per_token > self.latency_factor * self._baseline:
+            self.limit = max(self.min_concurrency, self.limit * 0.9)
+            self._counters["latency_backoffs"] += 1
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def record_throttle(self, retry_after=None):
+        """Register a 429: halve concurrency and honour Retry-After for everyone."""
+        now = time.monotonic()
+        self._counters["throttled"] += 1
+        # One wave of 429s from the same burst should only halve the limit once
+        if now - self._last_decrease > 1.0:
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self._last_decrease = now
+            self.logger.warning(f"LLM rate limited; concurrency limit now {int(self.limit)}")
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": int(self.limit),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "avg_latency": self._avg_latency,
+            **self._counters,
+        }
+
+    async def _acquire(self, estimated_tokens, priority):
+        future = asyncio.get_running_loop().create_future()
+        waiter = (priority, next(self._sequence), future, estimated_tokens)
+        heapq.heappush(self._waiters, waiter)
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled; hand the slot back
+                self.in_flight -= 1
+            elif waiter in self._waiters:
+                # Drop it now rather than when it reaches the head of the heap
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            self._wake()
+            raise
+
+    def _wake(self):
+        while self._waiters:
+            priority, _, future, estimated_tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= int(self.limit):
+                return
+
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(estimated_tokens)
+            )
+            if wait > 0:
+                self._schedule_wake(wait)
+                return
+
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self.in_flight += 1
+            self._counters["admitted"] += 1
+            future.set_result(None)
+
+    def _schedule_wake(self, delay):
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
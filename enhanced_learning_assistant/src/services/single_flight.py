@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight task.
+
+    The first caller for a key starts the work; callers that arrive while it
+    is running await the same task instead of repeating it. Each caller waits
+    through asyncio.shield, so a caller being cancelled (e.g. a client
+    disconnecting) leaves the shared work running for everyone else. The work
+    itself is only cancelled once every caller waiting on it has gone away.
+    """
+
+    def __init__(self, name: str = "single-flight"):
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+        self._inflight = {}
+        self._counters = {"executions": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = {"task": asyncio.create_task(factory()), "waiters": 0}
+            self._inflight[key] = flight
+            flight["task"].add_done_callback(lambda task: self._forget(key, task))
+            self._counters["executions"] += 1
+        else:
+            self._counters["coalesced"] += 1
+            self.logger.debug(f"{self.name}: joining in-flight call")
+
+        flight["waiters"] += 1
+        try:
+            return await asyncio.shield(flight["task"])
+        except asyncio.CancelledError:
+            if flight["waiters"] == 1 and not flight["task"].done():
+                self.logger.debug(f"{self.name}: last waiter cancelled, cancelling shared call")
+                flight["task"].cancel()
+                # A caller arriving before the cancellation lands starts afresh
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            raise
+        finally:
+            flight["waiters"] -= 1
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._inflight), **self._counters}
+
+    def _forget(self, key, task):
+        flight = self._inflight.get(key)
+        if flight is not None and flight["task"] is task:
+            del self._inflight[key]
+        # Retrieve the exception so an abandoned failure is not reported as unhandled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,29 @@
+import uuid
+import logging
+from contextvars import ContextVar
+
+# Request-scoped trace id; asyncio tasks inherit it from the request that created them
+trace_id_var: ContextVar[str] = ContextVar("trace_id", default="-")
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+def get_trace_id() -> str:
+    return trace_id_var.get()
+
+def set_trace_id(trace_id: str):
+    """Set the current trace id; returns a token for trace_id_var.reset()."""
+    return trace_id_var.set(trace_id)
+
+class TraceIdFilter(logging.Filter):
+    """Adds the current trace id to every log record as `trace_id`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get()
+        return True
+
+def install_log_filter():
+    """Attach TraceIdFilter to the root handlers so %(trace_id)s works in any format."""
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(f, TraceIdFilter) for f in handler.filters):
+            handler.addFilter(TraceIdFilter())
@@ -0,0 +1,44 @@
+import pytest
+from src.services.context_packer import ContextPacker, ContextOverflowError
+
+def make_packer(context_window=1000):
+    return ContextPacker("test-model", context_window=context_window)
+
+def test_completion_budget_caps_at_desired():
+    packer = make_packer()
+    assert packer.completion_budget("short prompt", 300, margin=0) == 300
+
+def test_completion_budget_shrinks_to_what_fits():
+    packer = make_packer()
+    prompt = "word " * 500
+    available = packer.context_window - packer.counter.count(prompt) - 64
+    assert 256 <= available < 800
+    assert packer.completion_budget(prompt, 800) == available
+
+def test_completion_budget_never_exceeds_the_window():
+    packer = make_packer()
+    prompt = "word " * 800
+    # Fewer than `minimum` tokens are left: asking for 256 would overflow the window
+    assert packer.context_window - packer.counter.count(prompt) - 64 < 256
+    with pytest.raises(ContextOverflowError):
+        packer.completion_budget(prompt, 800)
+
+def test_completion_budget_at_the_minimum_boundary():
+    packer = make_packer()
+    prompt = "word " * 100
+    prompt_tokens = packer.counter.count(prompt)
+    packer.context_window = prompt_tokens + 64 + 256
+    assert packer.completion_budget(prompt, 800) == 256
+    packer.context_window -= 1
+    with pytest.raises(ContextOverflowError):
+        packer.completion_budget(prompt, 800)
+
+def test_completion_budget_small_desired_is_not_raised_to_minimum():
+    packer = make_packer()
+    assert packer.completion_budget("short prompt", 100) == 100
+
+def test_empty_context_window_setting_uses_the_model_window(monkeypatch):
+    monkeypatch.setenv("LLM_CONTEXT_WINDOW", "")
+    assert ContextPacker("mixtral-8x7b-32768").context_window == 32768
+    monkeypatch.setenv("LLM_CONTEXT_WINDOW", "4096")
+    assert ContextPacker("mixtral-8x7b-32768").context_window == 4096
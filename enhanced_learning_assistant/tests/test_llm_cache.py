@@ -0,0 +1,23 @@
+import asyncio
+import sqlite3
+from src.services.llm_cache import LLMCache
+
+def test_disk_entries_survive_a_new_cache(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+
+    async def scenario():
+        await LLMCache(db_path=path).set("key", "value")
+        cache = LLMCache(db_path=path)
+        return await cache.get("key"), cache.stats()["disk_hits"]
+
+    assert asyncio.run(scenario()) == ("value", 1)
+
+def test_disk_read_error_counts_as_a_miss(tmp_path, monkeypatch):
+    cache = LLMCache(db_path=str(tmp_path / "llm_cache.db"))
+
+    def locked(key, now):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "_db_get", locked)
+    assert asyncio.run(cache.get("missing")) is None
+    assert cache.stats()["misses"] == 1
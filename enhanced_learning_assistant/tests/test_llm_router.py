@@ -0,0 +1,52 @@
+import json
+from src.services.llm_router import LLMRouter, TASK_DEFAULT, TASK_QUESTIONS, TASK_REPORT, TASK_SYNTHESIS
+
+def make_router(table=None):
+    return LLMRouter("base-model", "http://base.test/v1", "base-key", 0.7, table)
+
+def test_tasks_inherit_default_entry_then_base():
+    router = make_router({
+        "default": {"temperature": 0.3},
+        "report": {"model": "big-model", "endpoint": "http://big.test/v1", "params": {"top_p": 0.9}},
+    })
+    report = router.route(TASK_REPORT)
+    assert (report.model, report.base_url, report.temperature, report.params) == ("big-model", "http://big.test/v1", 0.3, {"top_p": 0.9})
+    synthesis = router.route(TASK_SYNTHESIS)
+    assert (synthesis.model, synthesis.base_url, synthesis.temperature) == ("base-model", "http://base.test/v1", 0.3)
+    # Unknown or missing task types use the default route
+    assert router.route(None) is router.route(TASK_DEFAULT)
+    assert router.route("nonsense") is router.route(TASK_DEFAULT)
+
+def test_hedge_true_uses_the_route_endpoint_and_defaults():
+    hedge = make_router({"questions": {"hedge": True}}).route(TASK_QUESTIONS).hedge
+    assert hedge == {
+        "endpoint": "http://base.test/v1",
+        "model": "base-model",
+        "api_key": "base-key",
+        "percentile": 95.0,
+        "initial_delay": 2.0,
+        "min_delay": 0.25,
+    }
+    assert make_router().route(TASK_QUESTIONS).hedge is None
+
+def test_api_keys_come_from_named_variables(monkeypatch):
+    monkeypatch.setenv("BACKUP_KEY", "backup-secret")
+    monkeypatch.delenv("MISSING_KEY", raising=False)
+    router = make_router({
+        "questions": {"api_key_env": "MISSING_KEY", "hedge": {"endpoint": "http://backup.test/v1", "api_key_env": "BACKUP_KEY"}},
+    })
+    route = router.route(TASK_QUESTIONS)
+    # An unset variable falls back to the base key
+    assert route.api_key == "base-key"
+    assert route.hedge["api_key"] == "backup-secret"
+    assert "backup-secret" not in json.dumps(router.describe())
+
+def test_routes_load_from_a_file(tmp_path, monkeypatch):
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps({"report": {"model": "big-model"}}))
+    monkeypatch.setenv("LLM_ROUTES", str(path))
+    assert LLMRouter.from_env("base-model", "http://base.test/v1", "base-key", 0.7).route(TASK_REPORT).model == "big-model"
+
+def test_unreadable_routes_are_ignored(monkeypatch):
+    monkeypatch.setenv("LLM_ROUTES", "{not json")
+    assert LLMRouter.from_env("base-model", "http://base.test/v1", "base-key", 0.7).route(TASK_REPORT).model == "base-model"
@@ -0,0 +1,78 @@
+import json
+import asyncio
+from types import SimpleNamespace
+import pytest
+from src.services.llm_service import LLMService
+from src.services.llm_router import TASK_QUESTIONS, TASK_REPORT
+
+PRIMARY = "http://primary.test/v1"
+BACKUP = "http://backup.test/v1"
+
+class FakeClient:
+    """Stands in for AsyncOpenAI: answers with its name after `delay` seconds."""
+
+    def __init__(self, name, delay):
+        self.name = name
+        self.delay = delay
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request):
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.name))], usage=None)
+
+@pytest.fixture
+def make_service(monkeypatch):
+    def make(routes, clients, max_concurrency=8):
+        monkeypatch.setenv("GROQ_API_KEY", "key")
+        monkeypatch.setenv("GROQ_BASE_URL", PRIMARY)
+        monkeypatch.setenv("LLM_ROUTES", json.dumps(routes))
+        monkeypatch.setenv("LLM_MAX_CONCURRENCY", str(max_concurrency))
+        service = LLMService()
+        for base_url, client in clients.items():
+            service._clients[(base_url, "key")] = client
+        return service
+    return make
+
+HEDGED = {"questions": {"hedge": {"endpoint": BACKUP, "initial_delay": 0.1}}}
+
+def test_tasks_are_sent_to_their_routed_model_and_endpoint(make_service):
+    primary, backup = FakeClient("primary", 0), FakeClient("backup", 0)
+    routes = {"report": {"model": "big-model", "endpoint": BACKUP, "temperature": 0.2, "params": {"top_p": 0.9}}}
+    service = make_service(routes, {PRIMARY: primary, BACKUP: backup})
+
+    async def scenario():
+        return await service.generate_content("r", task=TASK_REPORT), await service.generate_content("q", task=TASK_QUESTIONS)
+
+    assert asyncio.run(scenario()) == ("backup", "primary")
+    request = backup.requests[0]
+    assert (request["model"], request["temperature"], request["top_p"]) == ("big-model", 0.2, 0.9)
+    assert primary.requests[0]["model"] == service.model
+
+def test_slow_primary_is_hedged(make_service):
+    primary, backup = FakeClient("primary", 1.0), FakeClient("backup", 0.01)
+    service = make_service(HEDGED, {PRIMARY: primary, BACKUP: backup})
+
+    result = asyncio.run(service.generate_content("q", task=TASK_QUESTIONS))
+
+    assert result == "backup"
+    counters = service.routes()[TASK_QUESTIONS]["hedge"]
+    assert counters["hedged"] == 1 and counters["backup_won"] == 1
+
+def test_queueing_for_admission_does_not_trigger_a_hedge(make_service):
+    primary, backup = FakeClient("primary", 0.05), FakeClient("backup", 0.01)
+    service = make_service(HEDGED, {PRIMARY: primary, BACKUP: backup}, max_concurrency=1)
+
+    async def scenario():
+        # Another call holds the only slot for longer than the hedge delay
+        async with service.rate_limiter.slot(10):
+            call = asyncio.create_task(service.generate_content("q", task=TASK_QUESTIONS))
+            await asyncio.sleep(0.3)
+        return await call
+
+    assert asyncio.run(scenario()) == "primary"
+    assert backup.requests == []
+    assert service.routes()[TASK_QUESTIONS]["hedge"]["hedged"] == 0
+    # Latency samples start at admission, not at the queue
+    assert max(service._latencies[TASK_QUESTIONS]) < 0.2
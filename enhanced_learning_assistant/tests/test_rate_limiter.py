@@ -0,0 +1,131 @@
+import time
+import asyncio
+from src.services.rate_limiter import AdaptiveRateLimiter, TokenBucket, PRIORITY_BULK, PRIORITY_INTERACTIVE
+
+def make_limiter(max_concurrency=1, **kwargs):
+    return AdaptiveRateLimiter(requests_per_minute=0, tokens_per_minute=0, max_concurrency=max_concurrency, **kwargs)
+
+async def _queue(limiter, admitted, name, priority):
+    async with limiter.slot(10, priority):
+        admitted.append(name)
+
+def test_waiters_are_admitted_in_priority_order():
+    async def scenario():
+        limiter = make_limiter()
+        admitted = []
+        async with limiter.slot(10, PRIORITY_BULK):
+            tasks = [asyncio.create_task(_queue(limiter, admitted, "bulk-1", PRIORITY_BULK))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(_queue(limiter, admitted, "interactive", PRIORITY_INTERACTIVE)))
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(_queue(limiter, admitted, "bulk-2", PRIORITY_BULK)))
+            await asyncio.sleep(0)
+            assert limiter.stats()["waiting"] == 3
+        await asyncio.gather(*tasks)
+        return admitted
+
+    # Interactive jumps the queue; equal priorities keep arrival order
+    assert asyncio.run(scenario()) == ["interactive", "bulk-1", "bulk-2"]
+
+def test_throttle_halves_limit_once_per_burst():
+    limiter = make_limiter(max_concurrency=8)
+    limiter.record_throttle()
+    assert limiter.limit == 4
+    limiter.record_throttle()
+    assert limiter.limit == 4
+    limiter._last_decrease -= 2
+    limiter.record_throttle()
+    assert limiter.limit == 2
+    assert limiter.stats()["throttled"] == 3
+
+def test_throttle_never_goes_below_min_concurrency():
+    limiter = make_limiter(max_concurrency=2)
+    for _ in range(5):
+        limiter._last_decrease = 0.0
+        limiter.record_throttle()
+    assert limiter.limit == limiter.min_concurrency
+
+def test_retry_after_pauses_admission():
+    async def scenario():
+        limiter = make_limiter(max_concurrency=4)
+        limiter.record_throttle(retry_after=0.2)
+        started = time.monotonic()
+        async with limiter.slot(10):
+            return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.19
+
+def test_successes_recover_limit_additively():
+    limiter = make_limiter(max_concurrency=8)
+    limiter.record_throttle()
+    assert limiter.limit == 4
+    limiter.record_success(0.1)
+    assert limiter.limit == 4.25
+    # Roughly one slot per window of `limit` successful calls, capped at the maximum
+    for _ in range(4):
+        limiter.record_success(0.1)
+    assert 5 <= limiter.limit < 5.5
+    for _ in range(200):
+        limiter.record_success(0.1)
+    assert limiter.limit == 8
+
+def test_latency_growth_shrinks_limit():
+    limiter = make_limiter(max_concurrency=8)
+    limiter.record_success(0.1)
+    for _ in range(10):
+        limiter.record_success(1.0)
+    assert limiter.limit < 8
+    assert limiter.stats()["latency_backoffs"] > 0
+
+def test_mixed_call_sizes_keep_limit_at_max():
+    limiter = make_limiter(max_concurrency=8)
+    # Question, analysis and report calls: latency tracks the token count
+    calls = [(0.4, 300), (0.5, 350), (2.0, 1200), (6.0, 4000), (0.45, 300)]
+    for _ in range(40):
+        for latency, tokens in calls:
+            limiter.record_success(latency, tokens, tokens)
+    assert limiter.limit == 8
+    assert limiter.stats()["latency_backoffs"] == 0
+
+def test_latency_baseline_forgets_fast_outlier():
+    limiter = make_limiter(max_concurrency=8)
+    limiter.record_success(0.01, 100, 100)
+    for _ in range(400):
+        limiter.record_success(1.0, 100, 100)
+    # Backs off at first, then the baseline catches up and the limit recovers
+    assert limiter.stats()["latency_backoffs"] > 0
+    assert limiter.limit == 8
+
+def test_cancelled_waiter_is_removed_from_heap():
+    async def scenario():
+        limiter = make_limiter()
+        admitted = []
+        async with limiter.slot(10):
+            first = asyncio.create_task(_queue(limiter, admitted, "first", PRIORITY_BULK))
+            second = asyncio.create_task(_queue(limiter, admitted, "second", PRIORITY_BULK))
+            await asyncio.sleep(0)
+            assert len(limiter._waiters) == 2
+
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+            assert len(limiter._waiters) == 1
+            assert limiter.stats()["waiting"] == 1
+        await second
+        assert limiter.in_flight == 0
+        assert limiter._waiters == []
+        return admitted
+
+    assert asyncio.run(scenario()) == ["second"]
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60, capacity=1)
+    assert bucket.wait_time(1) == 0
+    bucket.take(1)
+    assert 0.9 < bucket.wait_time(1) <= 1.0
+    bucket.refund(1)
+    assert bucket.wait_time(1) == 0
+
+def test_token_bucket_zero_rate_is_unlimited():
+    bucket = TokenBucket(0)
+    bucket.take(1000)
+    assert bucket.wait_time(10 ** 6) == 0
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from src.core.report_generator import ReportGenerator
+from src.core.report_sections import parse_sections, walk_sections
+from src.services.citation_registry import CitationRegistry
+from src.services.citation_service import CitationService
+from src.services.llm_router import LLMRouter
+
+OUTLINE = '[{"title": "Intro", "focus": "a"}, {"title": "Broken", "focus": "b"}, {"title": "Slow", "focus": "c"}]'
+
+REPORT = """# Photosynthesis
+
+Overview.
+
+## Light Reactions
+
+Text.
+
+## Calvin Cycle
+
+Text.
+
+## References
+
+1. Source
+"""
+
+class FakeLLM:
+    """Returns the outline, fails the "Broken" section and stalls the "Slow" one."""
+
+    model = "llama3-8b-8192"
+    router = LLMRouter(model, "http://llm.test/v1", "key", 0.7)
+
+    def __init__(self):
+        self.cancelled = []
+
+    async def generate_content(self, prompt, max_tokens=300, **kwargs):
+        if "Plan an educational report" in prompt:
+            return OUTLINE
+        if "Which sections must change" in prompt:
+            return '{"sections": ["1.1", "1.2"], "insert_after": null}'
+        if 'Write only the section "Broken"' in prompt:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("section failed")
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            self.cancelled.append(prompt)
+            raise
+        return "## Section\n\ntext"
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setenv("REPORT_GENERATION_MODE", "sections")
+    llm = FakeLLM()
+    return ReportGenerator(llm, CitationService(CitationRegistry())), llm
+
+def test_failed_section_cancels_the_others(generator):
+    report_generator, llm = generator
+
+    async def scenario():
+        report = await asyncio.wait_for(report_generator.generate_report("Topic", "Objectives", [], {}), 5)
+        # Checked before asyncio.run cancels whatever is left at shutdown
+        await asyncio.sleep(0)
+        return report, len(llm.cancelled)
+
+    assert asyncio.run(scenario()) == ("Content generation failed internally", 2)
+
+def test_budgets_use_the_model_report_calls_are_routed_to(monkeypatch):
+    monkeypatch.delenv("LLM_CONTEXT_WINDOW", raising=False)
+    llm = FakeLLM()
+    # The default model has a 128k window; report calls go to an 8k one
+    llm.model = "llama-3.1-8b-instant"
+    llm.router = LLMRouter("llama-3.1-8b-instant", "http://llm.test/v1", "key", 0.7, {"report": {"model": "llama3-8b-8192"}})
+    assert ReportGenerator(llm, CitationService(CitationRegistry())).packer.context_window == 8192
+
+def test_feedback_naming_the_topic_still_asks_for_sections(generator):
+    report_generator, _ = generator
+    editable = [s for s in walk_sections(parse_sections(REPORT)) if s["title"] != "References"]
+
+    async def select(feedback):
+        return await report_generator._select_sections(editable, feedback)
+
+    # Mentioning the topic (the H1 title) doesn't pin the rewrite to the title section
+    assert asyncio.run(select("Make the photosynthesis report easier for beginners")) == (["1.1", "1.2"], None)
+    # A subsection named explicitly is still used directly
+    assert asyncio.run(select("Photosynthesis: expand the calvin cycle part")) == (["1.2"], None)
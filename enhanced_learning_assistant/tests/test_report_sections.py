@@ -0,0 +1,103 @@
+import pytest
+from src.core.report_sections import (
+    parse_sections, render_sections, walk_sections, find_section,
+    contains_references, replace_section, insert_section_after
+)
+
+REPORT = """Intro text before any heading.
+
+# Photosynthesis
+
+Why it matters.
+
+## Light reactions
+
+Thylakoids.
+
+### Photosystem II
+
+Water splitting.
+
+## Calvin cycle
+
+Carbon fixation.
+
+```python
+# not a heading
+```
+
+## References
+
+1. Source one
+"""
+
+@pytest.mark.parametrize("markdown", [
+    REPORT,
+    REPORT.replace("\n", "\r\n"),
+    "# Only heading",
+    "no headings at all\n",
+    "",
+    "## Closing hashes ##\nbody\n#### Skipped levels\ntext",
+    "# Title\n\n\n\n## Trailing blank lines\n\n\n",
+])
+def test_parse_then_render_round_trips(markdown):
+    assert render_sections(parse_sections(markdown)) == markdown
+
+def test_nested_headings_build_a_tree():
+    sections = parse_sections(REPORT)
+    outline = [(s["id"], s["level"], s["title"]) for s in walk_sections(sections)]
+    assert outline == [
+        ("1", 0, ""),
+        ("2", 1, "Photosynthesis"),
+        ("2.1", 2, "Light reactions"),
+        ("2.1.1", 3, "Photosystem II"),
+        ("2.2", 2, "Calvin cycle"),
+        ("2.3", 2, "References"),
+    ]
+    assert "# not a heading" in find_section(sections, "2.2")["body"]
+    assert contains_references(find_section(sections, "2"))
+
+def test_preamble_becomes_a_level_zero_section():
+    preamble = parse_sections(REPORT)[0]
+    assert preamble["heading"] == ""
+    assert preamble["body"] == "Intro text before any heading.\n\n"
+
+def test_replace_keeps_sibling_order():
+    sections = parse_sections(REPORT)
+    assert replace_section(sections, "2.1", "## Light reactions\n\nRewritten.\n\n")
+    rendered = render_sections(sections)
+
+    assert "Rewritten." in rendered
+    # Subsections are replaced along with the section unless asked to keep them
+    assert "Photosystem II" not in rendered
+    assert rendered.index("Rewritten.") < rendered.index("## Calvin cycle") < rendered.index("## References")
+    assert rendered.startswith("Intro text before any heading.\n\n# Photosynthesis\n\nWhy it matters.\n\n")
+
+def test_replace_can_keep_children():
+    sections = parse_sections(REPORT)
+    assert replace_section(sections, "2.1", "## Light reactions\n\nRewritten.\n\n", keep_children=True)
+    rendered = render_sections(sections)
+    assert rendered.index("Rewritten.") < rendered.index("### Photosystem II") < rendered.index("## Calvin cycle")
+
+def test_insert_goes_after_the_section_and_its_subsections():
+    sections = parse_sections(REPORT)
+    assert insert_section_after(sections, "2.1", "## Dark side\n\nNew.\n\n")
+    rendered = render_sections(sections)
+    assert rendered.index("Water splitting.") < rendered.index("## Dark side") < rendered.index("## Calvin cycle")
+    assert [s["id"] for s in find_section(sections, "2")["children"]] == ["2.1", "2.1+", "2.2", "2.3"]
+
+def test_edits_leave_the_rest_unchanged():
+    sections = parse_sections(REPORT)
+    replace_section(sections, "2.2", "## Calvin cycle\n\nNew body.\n\n")
+    insert_section_after(sections, "2.2", "## Extra\n\nMore.\n\n")
+    expected = REPORT.replace(
+        "## Calvin cycle\n\nCarbon fixation.\n\n```python\n# not a heading\n```\n\n",
+        "## Calvin cycle\n\nNew body.\n\n## Extra\n\nMore.\n\n",
+    )
+    assert render_sections(sections) == expected
+
+def test_unknown_section_id_changes_nothing():
+    sections = parse_sections(REPORT)
+    assert not replace_section(sections, "9", "x")
+    assert not insert_section_after(sections, "2.9", "x")
+    assert render_sections(sections) == REPORT
@@ -0,0 +1,22 @@
+import asyncio
+import pytest
+from src.data.report_store import ReportStore, SQLiteReportStore, CachedReportStore
+
+def test_report_store_is_abstract():
+    with pytest.raises(TypeError):
+        ReportStore()
+
+def test_every_store_has_async_stats(tmp_path):
+    async def scenario():
+        backend = SQLiteReportStore(str(tmp_path / "reports.db"))
+        store = CachedReportStore(backend, max_entries=4)
+        await store.put("r1", {"content": "text"})
+        await store.get("r1")
+        try:
+            return await backend.stats(), await store.stats()
+        finally:
+            await store.close()
+
+    backend_stats, stats = asyncio.run(scenario())
+    assert backend_stats["reports"] == 1
+    assert stats["reports"] == 1 and stats["hot_entries"] == 1
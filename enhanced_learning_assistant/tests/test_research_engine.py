@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from src.core.research_engine import ResearchEngine
+from src.services.llm_router import LLMRouter
+
+QUERIES = {
+    "Photosynthesis": ["1. Light reactions in plants", "2. Calvin cycle steps"],
+    "Plant biology": ["1.  light reactions IN plants", "- Calvin cycle steps", "3. Plant cell structure"],
+}
+
+class FakeLLM:
+    model = "llama3-8b-8192"
+    router = LLMRouter(model, "http://llm.test/v1", "key", 0.7)
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setenv("RESEARCH_CORPUS_PATH", "")
+    monkeypatch.setenv("RESEARCH_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RESEARCH_RANKING_ENABLED", "false")
+    engine = ResearchEngine(FakeLLM())
+    engine.fetched = []
+
+    async def generate_queries(topic, learning_objectives):
+        return QUERIES[topic]
+
+    async def gather_sources(queries):
+        engine.fetched.extend(queries)
+        return engine._combine_research_data([{"query": q, "title": q} for q in queries], [], [])
+
+    async def synthesize(combined, topic, learning_objectives):
+        return {"titles": [item["title"] for item in combined["web_data"]]}
+
+    engine._generate_research_queries = generate_queries
+    engine._gather_sources = gather_sources
+    engine._synthesize_research = synthesize
+    return engine
+
+def test_batch_fetches_queries_once_despite_numbering_case_and_spacing(engine):
+    async def scenario():
+        topics = [("Photosynthesis", "a"), ("Plant biology", "b")]
+        return dict([result async for result in engine.research_topics(topics)])
+
+    results = asyncio.run(scenario())
+    assert engine.fetched == ["1. Light reactions in plants", "2. Calvin cycle steps", "3. Plant cell structure"]
+    # Each topic still gets the results of its duplicate queries
+    assert results[1]["titles"] == engine.fetched
+    assert results[0]["titles"] == engine.fetched[:2]
@@ -0,0 +1,69 @@
+import asyncio
+from src.core.research_prefetch import ResearchPrefetcher
+
+class SlowEngine:
+    """research_topic that runs until cancelled, or returns after `delay`."""
+
+    def __init__(self, delay=30.0):
+        self.delay = delay
+        self.cancelled = 0
+
+    async def research_topic(self, topic, learning_objectives):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"topic": topic, "synthesized_content": "research"}
+
+def test_unclaimed_prefetch_is_cancelled_at_ttl_without_further_calls():
+    async def scenario():
+        engine = SlowEngine()
+        prefetcher = ResearchPrefetcher(engine, ttl=0.05)
+        assert prefetcher.start("session", "Topic", "Objectives")
+        await asyncio.sleep(0.15)
+        return engine.cancelled, prefetcher.stats()
+
+    cancelled, stats = asyncio.run(scenario())
+    assert cancelled == 1
+    assert stats["sessions"] == 0
+    assert stats["expired"] == 1
+
+def test_finished_prefetch_is_dropped_at_ttl():
+    async def scenario():
+        prefetcher = ResearchPrefetcher(SlowEngine(delay=0), ttl=0.05)
+        prefetcher.start("session", "Topic", "Objectives")
+        await asyncio.sleep(0.01)
+        assert prefetcher.peek("session") is not None
+        await asyncio.sleep(0.1)
+        return prefetcher.peek("session"), await prefetcher.take("session", "Topic", "Objectives")
+
+    assert asyncio.run(scenario()) == (None, None)
+
+def test_taken_prefetch_is_not_expired():
+    async def scenario():
+        engine = SlowEngine(delay=0.01)
+        prefetcher = ResearchPrefetcher(engine, ttl=0.05)
+        prefetcher.start("session", "Topic", "Objectives")
+        result = await prefetcher.take("session", "Topic", "Objectives")
+        # A new prefetch for the same session gets its own expiry
+        prefetcher.start("session", "Other topic", "Objectives")
+        await asyncio.sleep(0.03)
+        return result, prefetcher.stats()
+
+    result, stats = asyncio.run(scenario())
+    assert result["topic"] == "Topic"
+    assert stats["sessions"] == 1
+    assert stats["expired"] == 0
+
+def test_close_cancels_running_prefetches():
+    async def scenario():
+        engine = SlowEngine()
+        prefetcher = ResearchPrefetcher(engine, ttl=60)
+        prefetcher.start("a", "Topic A", "Objectives")
+        prefetcher.start("b", "Topic B", "Objectives")
+        await asyncio.sleep(0)
+        await prefetcher.close()
+        return engine.cancelled, prefetcher.stats()["sessions"]
+
+    assert asyncio.run(scenario()) == (2, 0)
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from src.services.single_flight import SingleFlight
+
+class Work:
+    """A factory whose calls block until released, counting how often it ran."""
+
+    def __init__(self, result="done"):
+        self.result = result
+        self.calls = 0
+        self.cancelled = False
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flight, work = SingleFlight(), Work()
+        work.release = asyncio.Event()
+        callers = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        work.release.set()
+        return await asyncio.gather(*callers), work.calls, flight.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == ["done"] * 3
+    assert calls == 1
+    assert stats == {"in_flight": 0, "executions": 1, "coalesced": 2}
+
+def test_cancelled_waiter_leaves_result_for_the_others():
+    async def scenario():
+        flight, work = SingleFlight(), Work()
+        work.release = asyncio.Event()
+        leaving = asyncio.create_task(flight.do("key", work))
+        staying = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        leaving.cancel()
+        await asyncio.gather(leaving, return_exceptions=True)
+        assert leaving.cancelled()
+        assert not work.cancelled
+
+        work.release.set()
+        return await staying
+
+    assert asyncio.run(scenario()) == "done"
+
+def test_last_waiter_cancelling_cancels_the_shared_call():
+    async def scenario():
+        flight, work = SingleFlight(), Work()
+        work.release = asyncio.Event()
+        callers = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        for caller in callers:
+            caller.cancel()
+            await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0)
+        return work.cancelled, flight.stats()["in_flight"]
+
+    cancelled, in_flight = asyncio.run(scenario())
+    assert cancelled
+    assert in_flight == 0
+
+def test_caller_after_last_cancellation_starts_a_new_call():
+    async def scenario():
+        flight, work = SingleFlight(), Work()
+        work.release = asyncio.Event()
+        first = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        assert first.done()
+
+        # The shared call is still unwinding its cancellation; joining it would
+        # hand this caller a CancelledError it never asked for
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        work.release.set()
+        return await second, work.calls
+
+    assert asyncio.run(scenario()) == ("done", 2)
+
+def test_exception_reaches_every_waiter():
+    async def scenario():
+        flight, work = SingleFlight(), Work(ValueError("upstream failed"))
+        work.release = asyncio.Event()
+        callers = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        work.release.set()
+        return await asyncio.gather(*callers, return_exceptions=True), work.calls
+
+    results, calls = asyncio.run(scenario())
+    assert calls == 1
+    assert len(results) == 3
+    assert all(isinstance(result, ValueError) and str(result) == "upstream failed" for result in results)
+
+def test_key_is_released_after_completion_and_failure():
+    async def scenario():
+        flight = SingleFlight()
+        ok, failing = Work(), Work(RuntimeError("boom"))
+        ok.release = asyncio.Event()
+        failing.release = asyncio.Event()
+        ok.release.set()
+        failing.release.set()
+
+        assert await flight.do("key", ok) == "done"
+        assert flight.stats()["in_flight"] == 0
+        with pytest.raises(RuntimeError):
+            await flight.do("key", failing)
+        assert flight.stats()["in_flight"] == 0
+
+        # Nothing is cached: the next call runs the factory again
+        assert await flight.do("key", ok) == "done"
+        return ok.calls
+
+    assert asyncio.run(scenario()) == 2